@@ -0,0 +1,89 @@
+"""Benchmark: coste por movimiento de la entidad `Movement` y del listado en JSON.
+
+1. Construcción: la clase anterior (con `__dict__` y `strptime`) frente a la actual
+   (`__slots__` y validación de fecha sin `strptime`), en objetos/s y en memoria
+   retenida por `--rows` objetos vivos (tracemalloc).
+2. Listado: filas como dict + `json.dumps` frente a JSON armado por SQLite
+   (`iter_json_by_criteria`), en filas/s.
+
+    python -m benchmarks.bench_entities --rows 200000
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.datagen import fill, generate
+from src.core.domain.entities import Movement
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+
+
+class LegacyMovement:
+    """La entidad antes de `__slots__`: dict por instancia y `strptime` en cada fecha."""
+
+    def __init__(self, date, type, amount, category, description=None, currency='COP', fx_rate=None):
+        datetime.strptime(date, "%Y-%m-%d")
+        value = float(amount)
+        if value <= 0:
+            raise ValueError
+        if type not in ("Ingreso", "Gasto"):
+            raise ValueError
+        self.date = date
+        self.type = type
+        self.amount = value
+        self.category = category
+        self.description = description
+        self.currency = currency or 'COP'
+        self.fx_rate = float(fx_rate) if fx_rate is not None else None
+
+
+def construct(cls, rows):
+    t0 = time.perf_counter()
+    objs = [cls(date=d, type=t, amount=a, category=cat, description=desc, currency=c, fx_rate=r)
+            for d, t, a, c, r, cat, desc in rows]
+    elapsed = time.perf_counter() - t0
+    return objs, elapsed
+
+
+def retained_bytes(cls, rows):
+    tracemalloc.start()
+    objs, _ = construct(cls, rows)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objs
+    return size
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--rows", type=int, default=200000)
+    args = p.parse_args(argv)
+
+    rows = list(generate(args.rows))
+    print(f"{'ENTITY':<16}  {'OBJ/S':>10}  {'RETAINED (MB)':>13}")
+    for cls in (LegacyMovement, Movement):
+        construct(cls, rows[:1000])  # calentar cachés
+        _, elapsed = construct(cls, rows)
+        size = retained_bytes(cls, rows)
+        print(f"{cls.__name__:<16}  {args.rows / elapsed:>10.0f}  {size / 1e6:>13.1f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = SQLiteMovementRepository(db_path=Path(tmp) / "entities.db")
+        fill(repo, args.rows)
+        cases = [
+            ("dict+json.dumps", lambda: [json.dumps(r, ensure_ascii=False) for r in repo.iter_by_criteria()]),
+            ("sqlite json", lambda: list(repo.iter_json_by_criteria())),
+        ]
+        print(f"\n{'LISTING':<16}  {'ROWS/S':>10}")
+        for name, fn in cases:
+            t0 = time.perf_counter()
+            n = len(fn())
+            print(f"{name:<16}  {n / (time.perf_counter() - t0):>10.0f}")
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
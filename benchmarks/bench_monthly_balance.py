@@ -0,0 +1,73 @@
+"""Benchmark: el balance mensual debe mantenerse plano al crecer la tabla.
+
+El mes consultado (2024-06) tiene siempre `--month-rows` movimientos; el resto de
+filas es historia de otros meses. Compara la consulta actual (rango de fechas +
+índice cubriente) con la versión anterior basada en strftime por fila.
+
+    python -m benchmarks.bench_monthly_balance --sizes 10000,100000,1000000
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from src.core.domain.entities import Movement
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+
+LEGACY_MONTHLY_SQL = "SELECT type, SUM(amount) as total FROM movements WHERE strftime('%m', date) = ? AND strftime('%Y', date) = ? GROUP BY type"
+CATEGORIES = ["Super", "Transporte", "Arriendo", "Salud", "Ocio", "Sueldo", "Servicios", "Educación"]
+
+
+def fill(repo, rows, month_rows, years=20, seed=42):
+    rnd = random.Random(seed)
+    start = date(2024 - years + 1, 1, 1)
+    span = years * 365
+
+    def gen():
+        for i in range(rows):
+            if i < month_rows:
+                d = date(2024, 6, 1 + rnd.randrange(30))
+            else:
+                d = start + timedelta(days=rnd.randrange(span))
+                if d.year == 2024 and d.month == 6:
+                    d = d.replace(month=7)
+            t = "Ingreso" if rnd.random() < 0.2 else "Gasto"
+            yield Movement(date=d.isoformat(), type=t, amount=round(rnd.uniform(1, 500000), 2), category=rnd.choice(CATEGORIES))
+
+    repo.save_many(gen(), batch_size=50000)
+    repo.conn.execute("ANALYZE")
+
+
+def timeit(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sizes", default="10000,100000,1000000")
+    p.add_argument("--month-rows", type=int, default=2000)
+    p.add_argument("--repeat", type=int, default=20)
+    args = p.parse_args(argv)
+
+    print(f"{'ROWS':>10}  {'RANGE (ms)':>10}  {'STRFTIME (ms)':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in [int(x) for x in args.sizes.split(",")]:
+            repo = SQLiteMovementRepository(db_path=Path(tmp) / f"bench_{size}.db")
+            fill(repo, size, min(size, args.month_rows))
+            fast = timeit(lambda: repo.get_monthly_aggregates("06", "2024"), args.repeat)
+            slow = timeit(lambda: repo.conn.execute(LEGACY_MONTHLY_SQL, ("06", "2024")).fetchall(), max(1, args.repeat // 4))
+            print(f"{size:>10}  {fast:10.3f}  {slow:13.3f}")
+            repo.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
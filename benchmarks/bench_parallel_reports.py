@@ -0,0 +1,65 @@
+"""Benchmark: `dashboard` y `yearly_summary` en serie frente a repartidos en hilos.
+
+Para cada tamaño crea una base sintética (`benchmarks/datagen.py`) y mide la mediana
+de cada reporte con `ReportService` sin executor (todas las consultas en serie sobre
+una conexión) y con un `ThreadPoolExecutor` de `--threads` hilos, cada uno con su
+conexión del pool 'reports' (SQLite libera el GIL mientras ejecuta la consulta).
+
+    python -m benchmarks.bench_parallel_reports --sizes 100000,1000000 --threads 4
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.datagen import fill
+from src.core.services.report_service import ReportService
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository, get_pool
+
+MONTH, YEAR = "06", "2024"
+
+
+def timeit(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sizes", default="100000,1000000")
+    p.add_argument("--threads", type=int, default=4)
+    p.add_argument("--repeat", type=int, default=20)
+    args = p.parse_args(argv)
+
+    print(f"{'ROWS':>10}  {'REPORT':<15}  {'SERIAL (ms)':>11}  {'PARALLEL (ms)':>13}  {'SPEEDUP':>7}")
+    with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(max_workers=args.threads) as executor:
+        for size in [int(x) for x in args.sizes.split(",")]:
+            db_file = Path(tmp) / f"parallel_{size}.db"
+            repo = SQLiteMovementRepository(db_path=db_file)
+            fill(repo, size)
+
+            pool = get_pool(db_file, "reports", args.threads)
+            serial = ReportService(repo)
+            parallel = ReportService(repo, executor=executor,
+                                     repository_factory=lambda: SQLiteMovementRepository(pool=pool))
+            cases = [
+                ("dashboard", lambda rs: rs.dashboard(MONTH, YEAR)),
+                ("yearly_summary", lambda rs: rs.yearly_summary(YEAR)),
+            ]
+            for name, call in cases:
+                assert call(serial) == call(parallel)
+                t_serial = timeit(lambda: call(serial), args.repeat)
+                t_parallel = timeit(lambda: call(parallel), args.repeat)
+                print(f"{size:>10}  {name:<15}  {t_serial:>11.2f}  {t_parallel:>13.2f}  {t_serial / t_parallel:>6.2f}x")
+            pool.close()
+            repo.close()
+
+
+if __name__ == "__main__":
+    main()
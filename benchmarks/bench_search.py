@@ -0,0 +1,61 @@
+"""Benchmark: búsqueda FTS5 frente a LIKE '%texto%' sobre description y category.
+
+    python -m benchmarks.bench_search --rows 1000000 --term farmacia
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.datagen import fill
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+
+LIKE_SQL = (
+    "SELECT m.id, m.date, m.type, m.amount, m.currency, m.fx_rate, c.name, m.description "
+    "FROM movements m JOIN categories c ON c.id = m.category_id "
+    "WHERE m.description LIKE ? OR c.name LIKE ? ORDER BY m.date DESC LIMIT ?"
+)
+LIKE_COUNT_SQL = (
+    "SELECT COUNT(*) FROM movements m JOIN categories c ON c.id = m.category_id "
+    "WHERE m.description LIKE ? OR c.name LIKE ?"
+)
+
+
+def timeit(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--rows", type=int, default=200000)
+    p.add_argument("--term", default="farmacia")
+    p.add_argument("--limit", type=int, default=50)
+    p.add_argument("--repeat", type=int, default=10)
+    args = p.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = SQLiteMovementRepository(db_path=Path(tmp) / "bench_search.db")
+        fill(repo, args.rows, seed=7)
+        like = f"%{args.term}%"
+        like_ms = timeit(lambda: repo.conn.execute(LIKE_SQL, (like, like, args.limit)).fetchall(), args.repeat)
+        fts_ms = timeit(lambda: repo.find_by_criteria(q=args.term, limit=args.limit), args.repeat)
+        # Sin LIMIT: cuenta todas las coincidencias
+        like_all = timeit(lambda: repo.conn.execute(LIKE_COUNT_SQL, (like, like)).fetchone(), args.repeat)
+        fts_all = timeit(lambda: repo.conn.execute("SELECT COUNT(*) FROM movements_fts WHERE movements_fts MATCH ?", (f'"{args.term}"*',)).fetchone(), args.repeat)
+        repo.close()
+
+    print(f"rows={args.rows} term={args.term!r}")
+    print(f"{'QUERY':24}  {'LIKE (ms)':>10}  {'FTS5 (ms)':>10}")
+    print(f"{'top ' + str(args.limit) + ' (ordenado)':24}  {like_ms:10.3f}  {fts_ms:10.3f}")
+    print(f"{'contar coincidencias':24}  {like_all:10.3f}  {fts_all:10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,49 @@
+"""Generador reproducible de movimientos sintéticos para los benchmarks.
+
+Reparte las filas entre `years` años (terminando en `end_year`), con categorías de
+ingreso y gasto, descripciones para la búsqueda y un porcentaje de movimientos en
+USD/EUR con su `fx_rate`. Con la misma semilla produce siempre los mismos datos.
+"""
+import random
+from datetime import date, timedelta
+
+from src.core.domain.entities import Movement
+
+INCOME_CATEGORIES = ["Sueldo", "Honorarios", "Intereses"]
+EXPENSE_CATEGORIES = ["Super", "Transporte", "Arriendo", "Salud", "Ocio", "Servicios", "Educación", "Comida"]
+WORDS = ["mercado", "arriendo", "gasolina", "farmacia", "almuerzo", "cine", "internet", "luz", "agua", "taxi",
+         "bus", "libros", "ropa", "regalo", "café", "panadería", "gimnasio", "seguro", "médico", "viaje"]
+# Moneda -> (probabilidad acumulada, COP por unidad)
+CURRENCIES = [("COP", 0.85, None), ("USD", 0.95, 4000.0), ("EUR", 1.0, 4400.0)]
+
+
+def generate(rows: int, years: int = 10, end_year: int = 2024, seed: int = 42, income_ratio: float = 0.2):
+    """Genera tuplas (date, type, amount, currency, fx_rate, category, description)."""
+    rnd = random.Random(seed)
+    start = date(end_year - years + 1, 1, 1)
+    span = (date(end_year + 1, 1, 1) - start).days
+    for _ in range(rows):
+        d = start + timedelta(days=rnd.randrange(span))
+        if rnd.random() < income_ratio:
+            type_, category = "Ingreso", rnd.choice(INCOME_CATEGORIES)
+        else:
+            type_, category = "Gasto", rnd.choice(EXPENSE_CATEGORIES)
+        pick = rnd.random()
+        currency, fx_rate = next((c, r) for c, p, r in CURRENCIES if pick < p)
+        amount = round(rnd.uniform(1, 500000 if currency == "COP" else 200), 2)
+        description = " ".join(rnd.sample(WORDS, 3)) + f" #{rnd.randrange(100000)}"
+        yield d.isoformat(), type_, amount, currency, fx_rate, category, description
+
+
+def movements(rows: int, **kwargs):
+    """Los mismos datos que `generate`, como objetos Movement."""
+    for d, t, amount, currency, fx_rate, category, description in generate(rows, **kwargs):
+        yield Movement(date=d, type=t, amount=amount, category=category, description=description,
+                       currency=currency, fx_rate=fx_rate)
+
+
+def fill(repo, rows: int, batch_size: int = 50000, **kwargs):
+    """Carga `rows` movimientos en `repo` por el camino de importación masiva y ejecuta ANALYZE."""
+    inserted = repo.save_many(movements(rows, **kwargs), batch_size=batch_size)
+    repo.conn.execute("ANALYZE")
+    return inserted
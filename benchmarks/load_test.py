@@ -0,0 +1,138 @@
+"""Prueba de carga HTTP: rendimiento de la API con 50–200 clientes concurrentes.
+
+Cada cliente abre una conexión keep-alive y repite las peticiones de `--paths`
+durante `--duration` segundos. Sólo usa la biblioteca estándar (asyncio), así que
+sirve igual contra el servidor WSGI y el ASGI:
+
+    gunicorn "src.app:app" --bind 127.0.0.1:8000 --workers 2
+    uvicorn src.asgi:app --port 8001 --workers 2
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --concurrency 50,100,200
+    python -m benchmarks.load_test --url http://127.0.0.1:8001 --concurrency 50,100,200
+
+El resultado es un JSON con peticiones/s, latencia (p50/p95/p99 en ms) y errores
+por nivel de concurrencia.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = [
+    "/reports/dashboard?month=06&year=2024",
+    "/reports/balance?month=06&year=2024",
+    "/reports/series?from=2015-01&to=2024-12&granularity=month",
+    "/fx/latest?base=COP&symbols=USD,EUR",
+]
+
+
+async def _read_response(reader):
+    """Lee una respuesta HTTP/1.1 completa; devuelve (status, keep_alive)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("conexión cerrada por el servidor")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif status not in (204, 304):
+        await reader.read()  # sin longitud: hasta que el servidor cierre
+        return status, False
+    connection = headers.get("connection", "").lower()
+    if status_line.startswith(b"HTTP/1.0"):
+        return status, connection == "keep-alive"
+    return status, connection != "close"
+
+
+async def _client(host, port, paths, deadline, latencies, errors, offset):
+    reader = writer = None
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nAccept: application/json\r\n\r\n".encode())
+            await writer.drain()
+            status, keep_alive = await _read_response(reader)
+            if status >= 500:
+                errors.append(status)
+            else:
+                latencies.append(time.perf_counter() - t0)
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+            errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def run_level(url: str, concurrency: int, duration: float, paths):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(_client(host, port, paths, deadline, latencies, errors, n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 2) if latencies else None
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--url", default="http://127.0.0.1:8000", help="servidor ya en marcha")
+    p.add_argument("--concurrency", default="50,100,200", help="niveles de clientes concurrentes, separados por coma")
+    p.add_argument("--duration", type=float, default=10.0, help="segundos por nivel")
+    p.add_argument("--paths", default=",".join(DEFAULT_PATHS), help="rutas separadas por coma (se reparten en turno)")
+    p.add_argument("--out", help="archivo JSON de resultados (por defecto stdout)")
+    args = p.parse_args(argv)
+
+    # Las rutas llevan comas en la query: se separan sólo antes de cada '/'
+    paths = [x for x in args.paths.replace(",/", "\n/").split("\n") if x]
+    results = [asyncio.run(run_level(args.url, int(c), args.duration, paths)) for c in args.concurrency.split(",")]
+    report = {"url": args.url, "duration_s": args.duration, "paths": paths, "results": results}
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fp:
+            fp.write(text + "\n")
+    else:
+        print(text)
+    return 1 if any(r["requests"] == 0 for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
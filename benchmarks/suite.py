@@ -0,0 +1,204 @@
+"""Suite de benchmarks de los caminos calientes: repositorio, importación y rutas /reports/*.
+
+Para cada tamaño crea una base con datos sintéticos (`benchmarks/datagen.py`) y mide:
+
+- `save` de un movimiento y la importación masiva (`ImportService`, filas/s, en una base vacía
+  y sobre una ya poblada);
+- `find_by_criteria` (rango de un mes, categoría, búsqueda de texto, página keyset);
+- cada método `get_*` de agregados del adaptador SQLite;
+- cada ruta `/reports/*` con el cliente de pruebas de Flask, con la caché de reportes
+  vaciada antes de cada llamada (y aparte, el acierto de caché y el 304 por ETag).
+
+El resultado es un JSON (mediana y p95 en ms por caso) para comparar entre commits:
+
+    python -m benchmarks.suite --sizes 10000,100000 --out bench.json
+    python -m benchmarks.suite --sizes 10000,100000 --compare bench.json --threshold 1.25
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.datagen import fill, generate
+from src.core.domain.entities import Movement
+from src.core.services.import_service import ImportService
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+
+MONTH, YEAR = "06", "2024"
+
+
+def measure(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "repeat": repeat,
+    }
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def repository_cases(repo):
+    """(nombre, función) de las operaciones de lectura del adaptador."""
+    return [
+        ("find_by_criteria.month", lambda: repo.find_by_criteria(date_from=f"{YEAR}-{MONTH}-01", date_to=f"{YEAR}-{MONTH}-30")),
+        ("find_by_criteria.category", lambda: repo.find_by_criteria(category="Salud", limit=100)),
+        ("find_by_criteria.search", lambda: repo.find_by_criteria(q="farmacia", limit=50)),
+        ("find_by_criteria.page", lambda: repo.find_by_criteria(after=(f"{YEAR}-{MONTH}-15", 10 ** 9), limit=50)),
+        ("get_monthly_aggregates", lambda: repo.get_monthly_aggregates(MONTH, YEAR)),
+        ("get_monthly_carryover", lambda: repo.get_monthly_carryover(MONTH, YEAR)),
+        ("get_expenses_by_category.month", lambda: repo.get_expenses_by_category(YEAR, MONTH)),
+        ("get_expenses_by_category.year", lambda: repo.get_expenses_by_category(YEAR)),
+        ("get_yearly_aggregates", lambda: repo.get_yearly_aggregates(YEAR)),
+        ("get_daily_aggregates", lambda: repo.get_daily_aggregates(MONTH, YEAR)),
+        ("get_years", repo.get_years),
+        ("get_top_expenses", lambda: repo.get_top_expenses(MONTH, YEAR, 5)),
+        ("get_series.month.10y", lambda: repo.get_series("2015-01-01", "2025-01-01", "month")),
+    ]
+
+
+REPORT_ROUTES = [
+    ("route.balance", f"/reports/balance?month={MONTH}&year={YEAR}"),
+    ("route.categories", f"/reports/categories?month={MONTH}&year={YEAR}"),
+    ("route.top_expenses", f"/reports/top-expenses?month={MONTH}&year={YEAR}"),
+    ("route.years", "/reports/years"),
+    ("route.yearly", f"/reports/yearly?year={YEAR}"),
+    ("route.daily", f"/reports/daily?month={MONTH}&year={YEAR}"),
+    ("route.dashboard", f"/reports/dashboard?month={MONTH}&year={YEAR}"),
+    ("route.series", "/reports/series?from=2015-01&to=2024-12&granularity=month"),
+    ("route.trends", "/reports/trends?from=2015-01&to=2024-12&granularity=month"),
+]
+
+
+def route_cases(db_file):
+    from src.app import app, _report_cache
+
+    app.config["DB_PATH"] = db_file
+    client = app.test_client()
+
+    def cold(url):
+        def call():
+            _report_cache.clear()
+            resp = client.get(url)
+            assert resp.status_code == 200, (url, resp.status_code)
+        return call
+
+    dashboard = REPORT_ROUTES[6][1]
+    etag = client.get(dashboard).headers.get("ETag")
+    cases = [(name, cold(url)) for name, url in REPORT_ROUTES]
+    cases.append(("route.dashboard.cached", lambda: client.get(dashboard)))
+    cases.append(("route.dashboard.304", lambda: client.get(dashboard, headers={"If-None-Match": etag})))
+    return cases
+
+
+def run_size(size: int, tmp: Path, repeat: int, import_rows: int, seed: int):
+    results = []
+
+    def record(name, stats, **extra):
+        results.append({"size": size, "name": name, **stats, **extra})
+
+    # Importación masiva en una base vacía y otra sobre esas filas (índice de búsqueda y
+    # rollups ya poblados): filas por segundo, con todo lo que se escribe en la transacción
+    import_repo = SQLiteMovementRepository(db_path=tmp / f"import_{size}.db")
+    for name, offset in (("import_rows", 1), ("import_rows.append", 2)):
+        rows = [(n, {"date": d, "type": t, "amount": a, "currency": c, "fx_rate": r, "category": cat, "description": desc})
+                for n, (d, t, a, c, r, cat, desc) in enumerate(generate(import_rows, seed=seed + offset), start=1)]
+        t0 = time.perf_counter()
+        result = ImportService(import_repo).import_rows(iter(rows))
+        elapsed = time.perf_counter() - t0
+        record(name, {"median_ms": round(elapsed * 1000, 4), "p95_ms": round(elapsed * 1000, 4), "repeat": 1},
+               rows=result.inserted, rows_per_s=round(result.inserted / elapsed))
+    import_repo.close()
+
+    db_file = tmp / f"bench_{size}.db"
+    repo = SQLiteMovementRepository(db_path=db_file)
+    fill(repo, size, seed=seed)
+
+    saves = iter(range(10 ** 9))
+    record("save", measure(lambda: repo.save(Movement(date=f"{YEAR}-{MONTH}-{1 + next(saves) % 28:02d}", type="Gasto",
+                                                      amount=1000, category="Super")), repeat))
+    for name, fn in repository_cases(repo):
+        record(name, measure(fn, repeat))
+    repo.close()
+
+    for name, fn in route_cases(db_file):
+        record(name, measure(fn, repeat))
+    return results
+
+
+def compare(results, baseline, threshold: float):
+    """Casos cuya mediana empeoró más de `threshold` veces respecto a `baseline`."""
+    old = {(r["size"], r["name"]): r["median_ms"] for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        before = old.get((r["size"], r["name"]))
+        if before and r["median_ms"] > before * threshold:
+            regressions.append({"size": r["size"], "name": r["name"], "before_ms": before,
+                                "after_ms": r["median_ms"], "ratio": round(r["median_ms"] / before, 2)})
+    return regressions
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sizes", default="10000,100000", help="tamaños separados por coma (10k–10M)")
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--import-rows", type=int, default=None, help="filas de la importación (por defecto min(tamaño, 100000))")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", help="archivo JSON de resultados (por defecto stdout)")
+    p.add_argument("--compare", help="JSON de una corrida anterior para detectar regresiones")
+    p.add_argument("--threshold", type=float, default=1.25)
+    args = p.parse_args(argv)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in [int(x) for x in args.sizes.split(",")]:
+            import_rows = args.import_rows or min(size, 100000)
+            report["results"].extend(run_size(size, Path(tmp), args.repeat, import_rows, args.seed))
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fp:
+            report["regressions"] = compare(report["results"], json.load(fp), args.threshold)
+        status = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    for r in report.get("regressions", []):
+        print(f"REGRESIÓN {r['name']} (size={r['size']}): {r['before_ms']} -> {r['after_ms']} ms (x{r['ratio']})", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
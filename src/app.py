@@ -1,5 +1,11 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+import hashlib
+import json
+import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from flask import render_template, redirect
 
@@ -9,35 +15,129 @@ if __package__ is None:
     project_root = Path(__file__).resolve().parent.parent
     sys.path.insert(0, str(project_root))
 
-from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository, get_pool
 from src.core.services.movement_service import MovementService
-from src.core.domain.exceptions import InvalidAmountError, InvalidDateFormatError, InvalidTypeError
+from src.core.services.report_cache import CachedReportService, ReportCache
+from src.core.services.fx_service import DEFAULT_TTL, FxService, FxUnavailableError
+from src.infrastructure.database.fx_store import FX_POOL_NAME, FX_POOL_SIZE, SQLiteFxRateStore
+from src.infrastructure.fx.providers import default_provider
+from src.infrastructure.analytics.columnar import get_snapshot
+from src.core.domain.entities import BASE_CURRENCY
+from src.core.domain.fx import SUPPORTED_CURRENCIES
+from src.infrastructure.metrics import http_request_duration, registry
 
 app = Flask(__name__, template_folder=str(Path(__file__).resolve().parent / 'templates'), static_folder=str(Path(__file__).resolve().parent / 'static'))
 
 
+_fx_services = {}
+_report_cache = ReportCache()
+_category_cache = ReportCache(max_size=64)
+_fx_lock = threading.Lock()
+_report_executors = {}
+_executors_lock = threading.Lock()
+
+# Threads (and read connections) used to fan out the independent queries of
+# /reports/dashboard and /reports/yearly; 0 runs them sequentially. A single CPU
+# gains nothing from the fan-out, so that is the default there.
+_CPUS = os.cpu_count() or 1
+REPORT_THREADS = int(os.environ.get('REPORT_THREADS', min(4, _CPUS) if _CPUS > 1 else 0))
+
+
+def _get_fx_service():
+    # One FxService per DB (its cache lives for the whole worker); tests can set
+    # app.config['FX_PROVIDER'] to a local stub.
+    db_path = app.config.get('DB_PATH')
+    with _fx_lock:
+        service = _fx_services.get(db_path)
+        if service is None:
+            provider = app.config.get('FX_PROVIDER') or default_provider()
+            # The rate store has its own pool: the request already holds a main-pool connection
+            store = SQLiteFxRateStore(get_pool(db_path, FX_POOL_NAME, FX_POOL_SIZE))
+            service = FxService(provider, store=store, ttl=app.config.get('FX_TTL', DEFAULT_TTL))
+            _fx_services[db_path] = service
+        return service
+
+
+def _report_rate():
+    # ?currency=USD reports in another currency: totals are stored in BASE_CURRENCY
+    # (amount_base) and scaled once by the cached FX rate.
+    currency = (request.args.get('currency') or BASE_CURRENCY).upper()
+    if currency == BASE_CURRENCY:
+        return 1.0
+    rates = _get_fx_service().latest(BASE_CURRENCY, [currency]).rates
+    if currency not in rates:
+        raise ValueError(f"Moneda no soportada: '{currency}'")
+    return rates[currency]
+
+
+def _parallel_reads():
+    # Each fanned-out query gets its own connection from a dedicated 'reports' pool,
+    # as large as the executor, so report threads never wait on the request pool.
+    threads = app.config.get('REPORT_THREADS', REPORT_THREADS)
+    if threads <= 0:
+        return {}
+    db_path = app.config.get('DB_PATH')
+    with _executors_lock:
+        executor = _report_executors.get(threads)
+        if executor is None:
+            executor = _report_executors[threads] = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='reports')
+    return {
+        'executor': executor,
+        'repository_factory': lambda: SQLiteMovementRepository(pool=get_pool(db_path, 'reports', threads)),
+    }
+
+
+def _cached_categories(repo):
+    # Category lists change rarely: cache them per process, keyed by the categories
+    # version stamp (bumped by triggers on any category write, in any worker).
+    version = repo.get_category_version()
+    namespace = None if version is None else (str(repo.db_path), 'categories', version)
+    return CachedReportService(repo, _category_cache, namespace)
+
+
+def _get_repository():
+    # Borrow a connection from this worker's pool; repo.close() returns it.
+    # Schema creation/migrations run once per process, when the pool opens its first connection.
+    return SQLiteMovementRepository(pool=get_pool(app.config.get('DB_PATH')))
+
+
+@app.before_request
+def _start_timer():
+    request.environ['finanzas.started'] = time.perf_counter()
+
+
+@app.after_request
+def _observe_request(response):
+    started = request.environ.get('finanzas.started')
+    if started is not None:
+        # Label by route template (/categories/<int:cat_id>), never by raw path
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        http_request_duration.observe((route, request.method, str(response.status_code)), time.perf_counter() - started)
+    return response
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route("/movements", methods=["POST"])
 def create_movement():
-    data = request.get_json() or {}
-    repo = SQLiteMovementRepository()
-    service = MovementService(repo)
+    # Accepts one movement (JSON object) or a batch (JSON array) inserted in a single
+    # transaction. Each movement may carry an `idempotency_key` (for a single object also
+    # the Idempotency-Key header): a retry with a stored key returns the existing id
+    # instead of inserting a duplicate.
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    single = not isinstance(data, list)
+    if single and isinstance(data, dict) and data.get("idempotency_key") is None and request.headers.get("Idempotency-Key"):
+        data = dict(data, idempotency_key=request.headers["Idempotency-Key"])
+    repo = _get_repository()
+    # Movements in another currency without fx_rate take the current rate
+    service = MovementService(repo, fx_service=_get_fx_service())
     try:
-        movement_id = service.create_movement(
-            date=data.get("date"),
-            type=data.get("type"),
-            amount=data.get("amount"),
-            category=data.get("category"),
-            description=data.get("description"),
-            currency=data.get("currency", 'COP'),
-            fx_rate=data.get("fx_rate", None),
-        )
-        return jsonify({"id": movement_id}), 201
-    except InvalidAmountError:
-        return jsonify({"error": "El monto debe ser un valor numérico mayor a cero"}), 400
-    except InvalidDateFormatError:
-        return jsonify({"error": "Formato de fecha incorrecto. Use AAAA-MM-DD"}), 400
-    except InvalidTypeError:
-        return jsonify({"error": "Tipo debe ser 'Ingreso' o 'Gasto'"}), 400
+        result = service.create_movements([data] if single else data)
     except Exception as e:
         return jsonify({"error": str(e)}), 400
     finally:
@@ -45,7 +145,54 @@ def create_movement():
             repo.close()
         except Exception:
             pass
+    if single:
+        item = result.items[0]
+        if item.error is not None:
+            return jsonify({"error": item.error}), 400
+        # 200 on a deduplicated retry: nothing new was created
+        return jsonify({"id": item.id, "status": item.status}), 201 if item.created else 200
+    body = result.to_dict()
+    return jsonify(body), 201 if body["created"] else (400 if body["errors"] else 200)
+
+
+@app.route("/movements/bulk", methods=["POST"])
+def create_movements_bulk():
+    # Accepts a JSON array of movements, a multipart 'file' upload (csv/json/ndjson/ofx, by extension
+    # or ?format=) or a raw CSV/NDJSON/OFX body with ?format=. Invalid rows are reported, not fatal.
+    import io
+    from src.core.services.import_service import ImportService
+    from src.infrastructure.importers.parsers import FIELDS, detect_format, get_parser
+
+    fmt = request.args.get('format')
+    try:
+        if 'file' in request.files:
+            upload = request.files['file']
+            parse = get_parser(fmt or detect_format(upload.filename or ''))
+            rows = parse(io.TextIOWrapper(upload.stream, encoding='utf-8', newline=''))
+        elif request.is_json:
+            data = request.get_json(silent=True)
+            if not isinstance(data, list):
+                return jsonify({'error': "Se esperaba un array JSON de movimientos"}), 400
+            rows = ((n, {k: (item.get(k) if isinstance(item, dict) else None) for k in FIELDS}) for n, item in enumerate(data, start=1))
+        elif fmt:
+            rows = get_parser(fmt)(io.StringIO(request.get_data(as_text=True), newline=''))
+        else:
+            return jsonify({'error': "Envíe un array JSON, un archivo en 'file' o el cuerpo con ?format=csv|json|ndjson|ofx"}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
+    repo = _get_repository()
+    try:
+        result = ImportService(repo, fx_service=_get_fx_service()).import_rows(rows)
+        status = 201 if result.inserted else 400
+        return jsonify(result.to_dict()), status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    finally:
+        try:
+            repo.close()
+        except Exception:
+            pass
 
 
 @app.route("/movements", methods=["GET"])
@@ -58,36 +205,85 @@ def list_movements():
         date_from = request.args.get("from")
         date_to = request.args.get("to")
     category = request.args.get("category")
-    repo = SQLiteMovementRepository()
+    q = request.args.get("q")  # full-text search over description and category, ranked by relevance
+    after = request.args.get("after")
+    limit = request.args.get("limit")
+    # ?format=ndjson (or Accept: application/x-ndjson) streams one JSON object per line
+    ndjson = request.args.get("format") == "ndjson" or "application/x-ndjson" in request.headers.get("Accept", "")
+    repo = _get_repository()
+    streaming = False
     try:
         from src.core.services.query_service import MovementQueryService
 
         qs = MovementQueryService(repo)
-        results = qs.find(date_from=date_from, date_to=date_to, category=category)
-        return jsonify(results), 200
+        if limit is not None and not ndjson:
+            # keyset page: {"items": [...], "next": "YYYY-MM-DD,ID" | null}
+            return jsonify(qs.page(date_from=date_from, date_to=date_to, category=category, after=after, limit=limit, q=q)), 200
+        # Rows arrive already encoded as JSON objects (built by SQLite, no per-row dict)
+        rows = qs.iter_json(date_from=date_from, date_to=date_to, category=category, after=after, limit=limit, q=q)
+        streaming = True
+        body = _stream_ndjson(repo, rows) if ndjson else _stream_json_array(repo, rows)
+        mimetype = "application/x-ndjson" if ndjson else "application/json"
+        return Response(body, mimetype=mimetype, status=200)
     except Exception as e:
         return jsonify({"error": str(e)}), 400
     finally:
-        try:
-            repo.close()
-        except Exception:
-            pass
+        # While streaming, the generator returns the connection once the last row is sent
+        if not streaming:
+            try:
+                repo.close()
+            except Exception:
+                pass
 
 
-@app.route("/reports/balance", methods=["GET"])
-def report_balance():
-    month = request.args.get("month")  # MM
-    year = request.args.get("year")    # YYYY
-    if not month or not year:
-        return jsonify({"error": "Parámetros 'month' y 'year' son requeridos (MM, YYYY)."}), 400
-    repo = SQLiteMovementRepository()
+def _stream_json_array(repo, rows):
+    # Same JSON array as before, row by row so memory stays bounded; `rows` are JSON texts
+    try:
+        yield "["
+        first = True
+        for row in rows:
+            yield row if first else "," + row
+            first = False
+        yield "]"
+    finally:
+        repo.close()
+
+
+def _stream_ndjson(repo, rows):
+    try:
+        for row in rows:
+            yield row + "\n"
+    finally:
+        repo.close()
+
+
+def _report_response(build):
+    # Shared by the /reports/* endpoints. The ETag is derived from the database's data
+    # version (bumped by every write, in any worker), the URL and the conversion rate,
+    # so a matching If-None-Match gets a 304 without touching the report queries.
+    # Otherwise results come from the per-process LRU keyed by the same data version.
+    repo = _get_repository()
     try:
+        version = repo.get_data_version()
+        rate = _report_rate()
+        namespace = None
+        if version is not None:
+            namespace = (str(repo.db_path), version, rate)
+            etag = hashlib.sha1(repr((namespace, request.full_path)).encode()).hexdigest()
+            if request.if_none_match.contains_weak(etag):
+                resp = Response(status=304)
+                resp.set_etag(etag)
+                return resp
         from src.core.services.report_service import ReportService
 
-        rs = ReportService(repo)
-        # include previous month's net and cumulative net for the year
-        bal = rs.monthly_with_carryover(month=month, year=year)
-        return jsonify(bal), 200
+        analytics = lambda: get_snapshot(repo.db_path).refresh(repo.conn)
+        rs = CachedReportService(ReportService(repo, rate=rate, analytics=analytics, **_parallel_reads()),
+                                 _report_cache, namespace)
+        resp = jsonify(build(rs))
+        if namespace is not None:
+            resp.set_etag(etag)
+            resp.headers['Cache-Control'] = 'no-cache'
+        return resp, 200
     except Exception as e:
         return jsonify({"error": str(e)}), 400
     finally:
@@ -97,24 +293,23 @@ def report_balance():
             pass
 
 
+@app.route("/reports/balance", methods=["GET"])
+def report_balance():
+    month = request.args.get("month")  # MM
+    year = request.args.get("year")    # YYYY
+    if not month or not year:
+        return jsonify({"error": "Parámetros 'month' y 'year' son requeridos (MM, YYYY)."}), 400
+    # include previous month's net and cumulative net for the year
+    return _report_response(lambda rs: rs.monthly_with_carryover(month=month, year=year))
+
+
 @app.route("/reports/categories", methods=["GET"])
 def report_categories():
     month = request.args.get('month')
     year = request.args.get('year')
-    repo = SQLiteMovementRepository()
-    try:
-        from src.core.services.report_service import ReportService
-
-        rs = ReportService(repo)
-        rows = rs.expenses_by_category(year=year, month=month)
-        return jsonify([{"category": r.category, "total": r.total} for r in rows]), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        try:
-            repo.close()
-        except Exception:
-            pass
+    return _report_response(
+        lambda rs: [{"category": r.category, "total": r.total} for r in rs.expenses_by_category(year=year, month=month)]
+    )
 
 
 @app.route("/reports/top-expenses", methods=["GET"])
@@ -125,37 +320,23 @@ def report_top_expenses():
         return jsonify({"error": "Parámetros 'month' y 'year' son requeridos (MM, YYYY)."}), 400
     limit = int(request.args.get("limit", 5))
     category = request.args.get("category")
-    repo = SQLiteMovementRepository()
-    try:
-        from src.core.services.report_service import ReportService
-
-        rs = ReportService(repo)
-        rows = rs.top_expenses(month=month, year=year, limit=limit, category=category)
-        return jsonify(rows), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        try:
-            repo.close()
-        except Exception:
-            pass
+    return _report_response(lambda rs: rs.top_expenses(month=month, year=year, limit=limit, category=category))
 
 @app.route('/reports/years', methods=['GET'])
 def report_years():
-    repo = SQLiteMovementRepository()
-    try:
-        cur = repo.conn.cursor()
-        cur.execute("SELECT DISTINCT strftime('%Y', date) as y FROM movements ORDER BY y DESC")
-        rows = cur.fetchall()
-        years = [r[0] for r in rows if r[0]]
-        return jsonify(years), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 400
-    finally:
-        try:
-            repo.close()
-        except Exception:
-            pass
+    return _report_response(lambda rs: rs.years())
+
+
+@app.route('/reports/dashboard', methods=['GET'])
+def report_dashboard():
+    # Whole reports page in one request: one connection, one consistent read snapshot
+    month = request.args.get('month')
+    year = request.args.get('year')
+    if not month:
+        return jsonify({'error': "Parámetro 'month' (MM) requerido; 'year' (YYYY) es opcional."}), 400
+    limit = int(request.args.get('limit', 5))
+    category = request.args.get('category') or None
+    return _report_response(lambda rs: rs.dashboard(month=month, year=year, category=category, limit=limit))
 
 
 @app.route('/reports/yearly', methods=['GET'])
@@ -163,19 +344,7 @@ def report_yearly():
     year = request.args.get('year')
     if not year:
         return jsonify({'error': "Parámetro 'year' requerido (YYYY)."}), 400
-    repo = SQLiteMovementRepository()
-    try:
-        from src.core.services.report_service import ReportService
-        rs = ReportService(repo)
-        summary = rs.yearly_summary(year)
-        return jsonify(summary), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 400
-    finally:
-        try:
-            repo.close()
-        except Exception:
-            pass
+    return _report_response(lambda rs: rs.yearly_summary(year))
 
 
 @app.route('/reports/daily', methods=['GET'])
@@ -184,52 +353,64 @@ def report_daily():
     year = request.args.get('year')
     if not month or not year:
         return jsonify({'error': "Parámetros 'month' (MM) y 'year' (YYYY) son requeridos."}), 400
-    repo = SQLiteMovementRepository()
-    try:
-        rows = repo.get_daily_aggregates(month, year)
-        return jsonify(rows), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 400
-    finally:
-        try:
-            repo.close()
-        except Exception:
-            pass
+    return _report_response(lambda rs: rs.daily_totals(month, year))
+
+
+@app.route('/reports/series', methods=['GET'])
+def report_series():
+    # ?from=YYYY-MM&to=YYYY-MM&granularity=day|week|month|year: the whole range in one grouped query
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    if not date_from or not date_to:
+        return jsonify({'error': "Parámetros 'from' y 'to' son requeridos (AAAA-MM)."}), 400
+    granularity = request.args.get('granularity', 'month')
+    return _report_response(lambda rs: rs.series(date_from, date_to, granularity))
+
+
+@app.route('/reports/balance-at', methods=['GET'])
+def report_balance_at():
+    # Whole-history balance up to ?date= (inclusive): one index seek on the balance ledger
+    day = request.args.get('date')
+    if not day:
+        return jsonify({'error': "Parámetro 'date' es requerido (AAAA-MM-DD)."}), 400
+    return _report_response(lambda rs: rs.balance_at(day))
+
+
+@app.route('/reports/balance-series', methods=['GET'])
+def report_balance_series():
+    # ?from=YYYY-MM&to=YYYY-MM (both optional: whole history by default)&granularity=day|week|month|year
+    granularity = request.args.get('granularity', 'month')
+    return _report_response(
+        lambda rs: rs.balance_series(request.args.get('from'), request.args.get('to'), granularity)
+    )
+
+
+@app.route('/reports/trends', methods=['GET'])
+def report_trends():
+    # Exploratory view (rolling mean, per-category series, percentiles) computed on the
+    # in-memory columnar copy of the movements instead of SQL.
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    if not date_from or not date_to:
+        return jsonify({'error': "Parámetros 'from' y 'to' son requeridos (AAAA-MM)."}), 400
+    granularity = request.args.get('granularity', 'month')
+    window = int(request.args.get('window', 3))
+    return _report_response(lambda rs: rs.trends(date_from, date_to, granularity, window))
 
 
 @app.route('/fx/latest', methods=['GET'])
 def fx_latest():
-    # Return latest exchange rates for COP to USD and EUR using exchangerate.host
-    import urllib.request, json
-    base = request.args.get('base', 'COP')
-    symbols = request.args.get('symbols', 'USD,EUR')
-    # First try exchangerate.host
-    url1 = f'https://api.exchangerate.host/latest?base={base}&symbols={symbols}'
-    try:
-        with urllib.request.urlopen(url1, timeout=5) as resp:
-            data = json.load(resp)
-        # exchangerate.host may return {'success': False, 'error': {...}}
-        if data.get('success', True) and 'rates' in data:
-            return jsonify({'base': data.get('base', base), 'date': data.get('date'), 'rates': data.get('rates', {})}), 200
-    except Exception:
-        data = None
-
-    # Fallback to open.er-api.com
+    # Served from the in-process cache; the provider is only called on a cold start
+    # or by the background refresh of a stale rate.
+    base = request.args.get('base', BASE_CURRENCY).strip().upper()
+    if base not in SUPPORTED_CURRENCIES:
+        return jsonify({'error': f"Moneda base no soportada: '{base}'"}), 400
+    symbols = [s.strip().upper() for s in request.args.get('symbols', 'USD,EUR').split(',') if s.strip()]
     try:
-        url2 = f'https://open.er-api.com/v6/latest/{base}'
-        with urllib.request.urlopen(url2, timeout=5) as resp:
-            data2 = json.load(resp)
-        # data2 example: {'result':'success', 'rates': {'USD':0.00026, 'EUR':0.00024}, ...}
-        rates2 = data2.get('rates', {})
-        if rates2:
-            # filter requested symbols
-            wanted = {}
-            for s in symbols.split(','):
-                if s in rates2:
-                    wanted[s] = rates2[s]
-            return jsonify({'base': base, 'date': data2.get('time_last_update_utc') or data2.get('time_last_update_iso'), 'rates': wanted}), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        quote = _get_fx_service().latest(base, symbols)
+        return jsonify(quote.to_dict()), 200
+    except FxUnavailableError as e:
+        return jsonify({'error': str(e)}), 503
 
 
 @app.route('/categories', methods=['GET'])
@@ -237,9 +418,9 @@ def get_categories():
     type_q = request.args.get('type')
     if type_q not in ('Ingreso', 'Gasto'):
         return jsonify({'error': "Parámetro 'type' requerido y debe ser 'Ingreso' o 'Gasto'"}), 400
-    repo = SQLiteMovementRepository()
+    repo = _get_repository()
     try:
-        cats = repo.get_categories_by_type(type_q)
+        cats = _cached_categories(repo).get_categories_by_type(type_q)
         return jsonify(cats), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -258,7 +439,7 @@ def post_category():
     icon = data.get('icon')
     if type_q not in ('Ingreso', 'Gasto') or not name:
         return jsonify({'error': "JSON debe contener 'type' ('Ingreso'|'Gasto') y 'name'"}), 400
-    repo = SQLiteMovementRepository()
+    repo = _get_repository()
     try:
         cid = repo.add_category(type_q, name, icon)
         return jsonify({'id': cid, 'name': name, 'icon': icon}), 201
@@ -280,9 +461,9 @@ def get_all_categories():
     if 'text/html' in accept_hdr and not is_ajax:
         return redirect('/ui/categories')
 
-    repo = SQLiteMovementRepository()
+    repo = _get_repository()
     try:
-        cats = repo.list_all_categories()
+        cats = _cached_categories(repo).list_all_categories()
         return jsonify(cats), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -295,7 +476,7 @@ def get_all_categories():
 
 @app.route('/categories/<int:cat_id>', methods=['DELETE'])
 def delete_category(cat_id):
-    repo = SQLiteMovementRepository()
+    repo = _get_repository()
     try:
         ok = repo.delete_category(cat_id)
         if ok:
@@ -317,14 +498,9 @@ def put_category(cat_id):
     icon = data.get('icon')
     if not new_name:
         return jsonify({'error': "'name' requerido"}), 400
-    repo = SQLiteMovementRepository()
+    repo = _get_repository()
     try:
-        ok = repo.update_category(cat_id, new_name)
-        # If icon provided, update separately
-        if ok and icon is not None:
-            cur = repo.conn.cursor()
-            cur.execute("UPDATE categories SET icon = ? WHERE id = ?", (icon, cat_id))
-            repo.conn.commit()
+        ok = repo.update_category(cat_id, new_name, icon)
         if ok:
             return jsonify({'updated': True}), 200
         return jsonify({'updated': False}), 404
@@ -342,7 +518,16 @@ from flask import render_template
 
 @app.route("/")
 def ui_index():
-    return render_template('index.html')
+    # Categories go inline in the page, so the form's first paint needs no extra fetch
+    repo = _get_repository()
+    try:
+        cats = _cached_categories(repo).list_all_categories()
+        return render_template('index.html', initial_categories=cats)
+    finally:
+        try:
+            repo.close()
+        except Exception:
+            pass
 
 
 @app.route("/ui/reports")
@@ -352,9 +537,9 @@ def ui_reports():
 
 @app.route('/ui/categories')
 def ui_categories():
-    repo = SQLiteMovementRepository()
+    repo = _get_repository()
     try:
-        cats = repo.list_all_categories()
+        cats = _cached_categories(repo).list_all_categories()
         return render_template('categories.html', initial_categories=cats)
     finally:
         try:
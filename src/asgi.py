@@ -0,0 +1,183 @@
+"""Punto de entrada ASGI de la API (`uvicorn src.asgi:app`).
+
+Sirve la misma app Flask, pero el bucle de eventos es quien mantiene las conexiones
+HTTP abiertas: una petición sólo ocupa un hilo mientras ejecuta la vista. Las vistas
+corren en dos pools de hilos acotados:
+
+- `db`: el resto de rutas (reportes, listados, escrituras). Tiene tantos hilos como
+  conexiones el pool de SQLite (`POOL_MAX_SIZE`), así que ninguna vista espera una
+  conexión; las peticiones que sobran esperan en el bucle sin bloquear a nadie.
+- `fx`: `/fx/*`. Una llamada lenta al proveedor de tasas se espera aquí y nunca
+  consume hilos (ni conexiones) de los reportes.
+
+Las respuestas en streaming (`GET /movements`) se envían por trozos con
+contrapresión: el hilo de la vista se detiene si el cliente lee más lento.
+El cuerpo de la petición se lee completo antes de llamar a la vista (en disco a
+partir de 1 MB).
+
+No se usa `asgiref.wsgi.WsgiToAsgi`: ejecuta todas las peticiones en un único hilo
+compartido (`sync_to_async` sensible al hilo), lo que serializaría las vistas y
+anularía los dos pools. Las llamadas al proveedor de tasas son bloqueantes (urllib)
+y el bucle las espera en el pool `fx`.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from src.app import app as flask_app
+from src.infrastructure.database.sqlite_adapter import POOL_MAX_SIZE
+
+DB_THREADS = int(os.environ.get("ASGI_DB_THREADS", POOL_MAX_SIZE))
+FX_THREADS = int(os.environ.get("ASGI_FX_THREADS", 4))
+_SPOOL_MAX = 1024 * 1024
+_PENDING_CHUNKS = 8  # trozos de respuesta en vuelo antes de frenar a la vista
+
+
+def _environ(scope, body):
+    """Entorno WSGI (PEP 3333) para una petición HTTP ASGI."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.input_terminated": True,  # cuerpo ya leído completo: vale aunque no haya Content-Length
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+            continue
+        key = "HTTP_" + name
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class ASGIApp:
+    """Adaptador ASGI de una app WSGI con un pool de hilos por grupo de rutas."""
+
+    def __init__(self, wsgi_app, db_threads: int = DB_THREADS, fx_threads: int = FX_THREADS):
+        self.wsgi_app = wsgi_app
+        self.executors = {
+            "db": ThreadPoolExecutor(max_workers=db_threads, thread_name_prefix="asgi-db"),
+            "fx": ThreadPoolExecutor(max_workers=fx_threads, thread_name_prefix="asgi-fx"),
+        }
+
+    def executor_for(self, path: str) -> ThreadPoolExecutor:
+        return self.executors["fx" if path.startswith("/fx/") else "db"]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def close(self):
+        for executor in self.executors.values():
+            executor.shutdown(wait=False)
+
+    async def _read_body(self, receive):
+        body = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX)
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                body.close()
+                return None
+            body.write(message.get("body", b""))
+            if not message.get("more_body", False):
+                body.seek(0)
+                return body
+
+    async def _http(self, scope, receive, send):
+        body = await self._read_body(receive)
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=_PENDING_CHUNKS)
+        cancelled = False
+
+        def put(item):
+            # Desde el hilo de la vista: espera si el cliente no ha consumido los trozos anteriores
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def run():
+            response = {}
+
+            def start_response(status, headers, exc_info=None):
+                response["status"] = int(status.split(" ", 1)[0])
+                response["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+                return lambda data: put(("body", data))
+
+            try:
+                result = self.wsgi_app(_environ(scope, body), start_response)
+                try:
+                    started = False
+                    for chunk in result:
+                        if not started:
+                            put(("start", response))
+                            started = True
+                        if cancelled:
+                            break
+                        if chunk:
+                            put(("body", chunk))
+                    if not started and not cancelled:
+                        put(("start", response))
+                finally:
+                    if hasattr(result, "close"):
+                        result.close()
+            finally:
+                body.close()
+                # El fin lo encola el propio hilo detrás del último trozo: no queda ninguna
+                # tarea del bucle esperando en la cola si la petición se cancela
+                put(("end", None))
+
+        future = loop.run_in_executor(self.executor_for(scope["path"]), run)
+        ended = False
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind == "start":
+                    await send({"type": "http.response.start", "status": value["status"], "headers": value["headers"]})
+                elif kind == "body":
+                    await send({"type": "http.response.body", "body": value, "more_body": True})
+                else:
+                    ended = True
+                    await future  # propaga un error de la vista
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+                    return
+        except BaseException:
+            cancelled = True
+            # Vaciar la cola hasta el fin para que el hilo de la vista no quede bloqueado en put()
+            while not ended:
+                kind, _ = await queue.get()
+                ended = kind == "end"
+            raise
+
+
+app = ASGIApp(flask_app)
@@ -12,16 +12,25 @@ def build_parser():
     p.add_argument("--category", required=True, help="Categoría (texto libre)")
     p.add_argument("--description", default="", help="Descripción (opcional)")
     p.add_argument("--currency", default="COP", help="Moneda (COP, USD, EUR)")
-    p.add_argument("--fx-rate", dest="fx_rate", type=float, help="Tasa FX (COP por 1 unidad de moneda seleccionada). Opcional")
+    p.add_argument("--fx-rate", dest="fx_rate", type=float, help="Tasa FX (COP por 1 unidad de moneda seleccionada). Por defecto, la tasa vigente")
     return p
 
 
+def _fx_service(db_path=None):
+    # Completa la tasa de los movimientos en otra moneda que no la traen (caché en la base y proveedor)
+    from .core.services.fx_service import FxService
+    from .infrastructure.database.fx_store import FX_POOL_NAME, FX_POOL_SIZE, SQLiteFxRateStore
+    from .infrastructure.database.sqlite_adapter import get_pool
+    from .infrastructure.fx.providers import default_provider
+    return FxService(default_provider(), store=SQLiteFxRateStore(get_pool(db_path, FX_POOL_NAME, FX_POOL_SIZE)))
+
+
 def main(argv=None):
     parser = build_parser()
     args = parser.parse_args(argv)
 
     repo = SQLiteMovementRepository()
-    service = MovementService(repo)
+    service = MovementService(repo, fx_service=_fx_service())
     try:
         movement_id = service.create_movement(
             date=args.date,
@@ -49,6 +58,206 @@ def main(argv=None):
         repo.close()
 
 
+def build_list_parser():
+    p = argparse.ArgumentParser(prog="finance list", description="Listar movimientos")
+    p.add_argument("--from", dest="date_from", help="Fecha desde AAAA-MM-DD")
+    p.add_argument("--to", dest="date_to", help="Fecha hasta AAAA-MM-DD")
+    p.add_argument("--category", dest="category", help="Filtro por categoría (coincidencia parcial)")
+    p.add_argument("--search", dest="search", help="Búsqueda de texto en descripción y categoría (ordenada por relevancia)")
+    p.add_argument("--limit", dest="limit", type=int, help="Máximo de movimientos a mostrar")
+    p.add_argument("--after", dest="after", help="Cursor AAAA-MM-DD,ID (r:RANK,ID con --search): continuar después de ese movimiento")
+    return p
+
+
+def list_main(argv=None):
+    parser = build_list_parser()
+    args = parser.parse_args(argv)
+    repo = SQLiteMovementRepository()
+    try:
+        from .core.services.query_service import MovementQueryService
+
+        qs = MovementQueryService(repo)
+        # Rows are streamed from the DB cursor; nothing is accumulated in memory
+        results = qs.iter(date_from=args.date_from, date_to=args.date_to, category=args.category, after=args.after, limit=args.limit, q=args.search)
+        last = None
+        for r in results:
+            if last is None:
+                # simple table
+                print(f"{'ID':>3}  {'DATE':10}  {'TYPE':7}  {'AMOUNT':8}  {'CATEGORY':15}  DESCRIPTION")
+            print(f"{r['id']:>3}  {r['date']:10}  {r['type']:7}  {r['amount']:8.2f}  {r['category'][:15]:15}  {r.get('description') or ''}")
+            last = r
+        if last is None:
+            print("No se encontraron movimientos para los criterios seleccionados")
+        elif args.limit:
+            print(f"Siguiente página: --after {qs.make_cursor(last)}")
+        return 0
+    finally:
+        repo.close()
+
+
+def build_migrate_parser():
+    p = argparse.ArgumentParser(prog="finance migrate", description="Aplicar migraciones pendientes del esquema")
+    p.add_argument("--db", dest="db_path", help="Ruta de la base de datos (por defecto finance_app.db)")
+    return p
+
+
+def migrate_main(argv=None):
+    import sqlite3
+    from .infrastructure.database.sqlite_adapter import DB_FILENAME
+    from .infrastructure.database.migrations import migrate, get_schema_version
+
+    parser = build_migrate_parser()
+    args = parser.parse_args(argv)
+    conn = sqlite3.connect(str(args.db_path or DB_FILENAME))
+    try:
+        applied = migrate(conn)
+        if applied:
+            print(f"Migraciones aplicadas: {', '.join(str(v) for v in applied)}")
+        print(f"Versión del esquema: {get_schema_version(conn)}")
+        return 0
+    finally:
+        conn.close()
+
+
+def build_rebuild_rollups_parser():
+    p = argparse.ArgumentParser(prog="finance rebuild-rollups", description="Recalcular los rollups de reportes desde los movimientos")
+    p.add_argument("--db", dest="db_path", help="Ruta de la base de datos (por defecto finance_app.db)")
+    return p
+
+
+def rebuild_rollups_main(argv=None):
+    parser = build_rebuild_rollups_parser()
+    args = parser.parse_args(argv)
+    repo = SQLiteMovementRepository(db_path=args.db_path)
+    try:
+        n = repo.rebuild_rollups()
+        print(f"Rollups recalculados: {n} filas")
+        return 0
+    finally:
+        repo.close()
+
+
+def build_archive_parser(prog="finance archive", description="Mover los movimientos de un año cerrado a su propio archivo"):
+    p = argparse.ArgumentParser(prog=prog, description=description)
+    p.add_argument("year", help="Año AAAA")
+    p.add_argument("--db", dest="db_path", help="Ruta de la base de datos (por defecto finance_app.db)")
+    return p
+
+
+def archive_main(argv=None):
+    args = build_archive_parser().parse_args(argv)
+    repo = SQLiteMovementRepository(db_path=args.db_path)
+    try:
+        n = repo.archive_year(args.year)
+        print(f"Año {args.year} archivado: {n} movimientos")
+        return 0
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        repo.close()
+
+
+def restore_main(argv=None):
+    args = build_archive_parser("finance restore", "Devolver a la base principal un año archivado").parse_args(argv)
+    repo = SQLiteMovementRepository(db_path=args.db_path)
+    try:
+        n = repo.restore_year(args.year)
+        print(f"Año {args.year} restaurado: {n} movimientos")
+        return 0
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        repo.close()
+
+
+def archives_main(argv=None):
+    p = argparse.ArgumentParser(prog="finance archives", description="Listar los años archivados")
+    p.add_argument("--db", dest="db_path", help="Ruta de la base de datos (por defecto finance_app.db)")
+    args = p.parse_args(argv)
+    repo = SQLiteMovementRepository(db_path=args.db_path)
+    try:
+        rows = repo.list_archived_years()
+        if not rows:
+            print("No hay años archivados")
+            return 0
+        print(f"{'YEAR':4}  {'ROWS':>8}  {'ARCHIVED AT':19}  FILE")
+        for r in rows:
+            print(f"{r['year']:4}  {r['rows']:>8}  {r['archived_at']:19}  {r['path']}")
+        return 0
+    finally:
+        repo.close()
+
+
+def fx_missing_main(argv=None):
+    p = argparse.ArgumentParser(prog="finance fx-missing", description="Listar los movimientos en otra moneda sin tasa de cambio, o asignarla")
+    p.add_argument("--set", nargs=2, metavar=("ID", "TASA"), help="Asignar la tasa (COP por 1 unidad de la moneda) al movimiento ID")
+    p.add_argument("--db", dest="db_path", help="Ruta de la base de datos (por defecto finance_app.db)")
+    args = p.parse_args(argv)
+    repo = SQLiteMovementRepository(db_path=args.db_path)
+    try:
+        if args.set:
+            movement_id, rate = args.set
+            repo.set_fx_rate(int(movement_id), rate)
+            print(f"Tasa asignada al movimiento {movement_id}")
+            return 0
+        rows = repo.list_missing_fx_rates()
+        if not rows:
+            print("No hay movimientos sin tasa de cambio")
+            return 0
+        print(f"{'ID':>6}  {'DATE':10}  {'TYPE':7}  {'AMOUNT':>12}  {'CUR':3}  CATEGORY")
+        for r in rows:
+            print(f"{r['id']:>6}  {r['date']:10}  {r['type']:7}  {r['amount']:12.2f}  {r['currency']:3}  {r['category']}")
+        return 0
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        repo.close()
+
+
+def build_import_parser():
+    p = argparse.ArgumentParser(prog="finance import", description="Importar movimientos desde CSV, JSON/NDJSON u OFX")
+    p.add_argument("file", help="Archivo a importar")
+    p.add_argument("--format", dest="fmt", choices=["csv", "json", "ndjson", "ofx"], help="Formato (por defecto según la extensión)")
+    p.add_argument("--category", help="Categoría para transacciones OFX (el formato no la incluye)")
+    p.add_argument("--batch-size", dest="batch_size", type=int, default=5000, help="Filas por executemany")
+    p.add_argument("--db", dest="db_path", help="Ruta de la base de datos (por defecto finance_app.db)")
+    return p
+
+
+def import_main(argv=None):
+    from .core.services.import_service import ImportService
+    from .infrastructure.importers.parsers import detect_format, get_parser, parse_ofx
+
+    parser = build_import_parser()
+    args = parser.parse_args(argv)
+    try:
+        fmt = args.fmt or detect_format(args.file)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    parse = get_parser(fmt)
+    repo = SQLiteMovementRepository(db_path=args.db_path)
+    try:
+        with open(args.file, newline="", encoding="utf-8") as fp:
+            if parse is parse_ofx and args.category:
+                rows = parse_ofx(fp, category=args.category)
+            else:
+                rows = parse(fp)
+            result = ImportService(repo, fx_service=_fx_service(args.db_path)).import_rows(rows, batch_size=args.batch_size)
+        for err in result.errors:
+            print(f"Fila {err.row}: {err.error}")
+        print(f"Movimientos importados: {result.inserted}  Filas con error: {len(result.errors)}")
+        return 0 if not result.errors else 1
+    except Exception as e:
+        print(f"Error: {e}")
+        return 2
+    finally:
+        repo.close()
+
+
 if __name__ == "__main__":
     import sys
 
@@ -57,6 +266,20 @@ if __name__ == "__main__":
     if len(argv) > 0 and argv[0] == "list":
         # call list_main with remaining args
         raise SystemExit(list_main(argv[1:]))
+    if len(argv) > 0 and argv[0] == "migrate":
+        raise SystemExit(migrate_main(argv[1:]))
+    if len(argv) > 0 and argv[0] == "import":
+        raise SystemExit(import_main(argv[1:]))
+    if len(argv) > 0 and argv[0] == "rebuild-rollups":
+        raise SystemExit(rebuild_rollups_main(argv[1:]))
+    if len(argv) > 0 and argv[0] == "archive":
+        raise SystemExit(archive_main(argv[1:]))
+    if len(argv) > 0 and argv[0] == "restore":
+        raise SystemExit(restore_main(argv[1:]))
+    if len(argv) > 0 and argv[0] == "archives":
+        raise SystemExit(archives_main(argv[1:]))
+    if len(argv) > 0 and argv[0] == "fx-missing":
+        raise SystemExit(fx_missing_main(argv[1:]))
     if len(argv) > 0 and argv[0] == "report":
         # report subcommands: balance | categories
         if len(argv) >= 2 and argv[1] == "balance":
@@ -96,39 +319,3 @@ if __name__ == "__main__":
             raise SystemExit(0)
     else:
         raise SystemExit(main(argv))
-
-
-
-
-
-
-
-
-def build_list_parser():
-    p = argparse.ArgumentParser(prog="finance list", description="Listar movimientos")
-    p.add_argument("--from", dest="date_from", help="Fecha desde AAAA-MM-DD")
-    p.add_argument("--to", dest="date_to", help="Fecha hasta AAAA-MM-DD")
-    p.add_argument("--category", dest="category", help="Filtro por categoría (coincidencia parcial)")
-    return p
-
-
-def list_main(argv=None):
-    parser = build_list_parser()
-    args = parser.parse_args(argv)
-    repo = SQLiteMovementRepository()
-    try:
-        from .core.services.query_service import MovementQueryService
-
-        qs = MovementQueryService(repo)
-        results = qs.find(date_from=args.date_from, date_to=args.date_to, category=args.category)
-        if not results:
-            print("No se encontraron movimientos para los criterios seleccionados")
-            return 0
-        # simple table
-        print(f"{'ID':>3}  {'DATE':10}  {'TYPE':7}  {'AMOUNT':8}  {'CATEGORY':15}  DESCRIPTION")
-        for r in results:
-            print(f"{r['id']:>3}  {r['date']:10}  {r['type']:7}  {r['amount']:8.2f}  {r['category'][:15]:15}  {r.get('description','')}")
-        return 0
-    finally:
-        repo.close()
-
@@ -0,0 +1,36 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class ItemResult:
+    id: Optional[int] = None
+    created: bool = False     # False con id: ya existía un movimiento con la misma idempotency_key
+    error: Optional[str] = None
+
+    @property
+    def status(self) -> str:
+        if self.error is not None:
+            return 'error'
+        return 'created' if self.created else 'duplicate'
+
+    def to_dict(self):
+        if self.error is not None:
+            return {'status': 'error', 'error': self.error}
+        return {'status': self.status, 'id': self.id}
+
+
+@dataclass
+class BatchResult:
+    items: List[ItemResult] = field(default_factory=list)
+
+    def count(self, status: str) -> int:
+        return sum(1 for item in self.items if item.status == status)
+
+    def to_dict(self):
+        return {
+            'items': [item.to_dict() for item in self.items],
+            'created': self.count('created'),
+            'duplicates': self.count('duplicate'),
+            'errors': self.count('error'),
+        }
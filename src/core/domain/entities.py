@@ -1,32 +1,105 @@
-from datetime import datetime
-from .exceptions import InvalidAmountError, InvalidDateFormatError, InvalidTypeError
+import math
+from functools import lru_cache
+
+from .exceptions import (
+    InvalidAmountError, InvalidCategoryError, InvalidCurrencyError, InvalidDateFormatError, InvalidDescriptionError,
+    InvalidFxRateError, InvalidIdempotencyKeyError, InvalidTypeError,
+)
+
+# Moneda en la que se guardan los montos normalizados (`amount_base`) y se calculan los reportes
+BASE_CURRENCY = 'COP'
+
+# Longitud máxima de la clave de idempotencia que envía un cliente con cada movimiento
+MAX_IDEMPOTENCY_KEY_LENGTH = 200
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+@lru_cache(maxsize=8192)
+def _check_date(value: str) -> bool:
+    if len(value) != 10 or value[4] != '-' or value[7] != '-':
+        return False
+    digits = value[:4] + value[5:7] + value[8:]
+    if not (digits.isascii() and digits.isdigit()):
+        return False
+    y, m, d = int(value[:4]), int(value[5:7]), int(value[8:])
+    if y < 1 or not 1 <= m <= 12 or d < 1:
+        return False
+    if m == 2 and d == 29:
+        return y % 4 == 0 and (y % 100 != 0 or y % 400 == 0)
+    return d <= _DAYS_IN_MONTH[m - 1]
+
+
+def is_valid_date(value) -> bool:
+    """True si `value` es una fecha real con el formato exacto 'AAAA-MM-DD'.
+
+    Compara caracteres en lugar de usar `strptime` y recuerda las fechas ya vistas:
+    en una importación las mismas fechas se repiten miles de veces.
+    """
+    return type(value) is str and _check_date(value)
 
 
 class Movement:
-    def __init__(self, date: str, type: str, amount, category: str, description: str | None = None, currency: str = 'COP', fx_rate: float | None = None):
-        # Fecha: YYYY-MM-DD
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-        except Exception:
+    __slots__ = ('date', 'type', 'amount', 'category', 'description', 'currency', 'fx_rate', 'idempotency_key')
+
+    def __init__(self, date: str, type: str, amount, category: str, description: str | None = None, currency: str = 'COP', fx_rate: float | None = None,
+                 idempotency_key: str | None = None):
+        # Fecha: YYYY-MM-DD (con ceros: las consultas por rango comparan el texto)
+        if not is_valid_date(date):
             raise InvalidDateFormatError("Formato de fecha incorrecto. Use AAAA-MM-DD")
 
-        # Monto: numérico > 0
+        # Monto: numérico, finito y > 0 (NaN/inf no se pueden guardar ni sumar)
         try:
             value = float(amount)
-        except Exception:
+        except (TypeError, ValueError):
             raise InvalidAmountError("El monto debe ser un valor numérico mayor a cero")
-        if value <= 0:
+        if not math.isfinite(value) or value <= 0:
             raise InvalidAmountError("El monto debe ser un valor numérico mayor a cero")
 
         # Tipo: Ingreso/Gasto
         if type not in ("Ingreso", "Gasto"):
             raise InvalidTypeError("Tipo debe ser 'Ingreso' o 'Gasto'")
 
+        if not isinstance(category, str) or not category.strip():
+            raise InvalidCategoryError("La categoría es requerida")
+        if description is not None and not isinstance(description, str):
+            raise InvalidDescriptionError("La descripción debe ser texto")
+        if currency is not None and not isinstance(currency, str):
+            raise InvalidCurrencyError("La moneda debe ser un código de texto (p. ej. COP, USD)")
+
+        currency = (currency or "").strip().upper() or BASE_CURRENCY
+
+        # Tasa FX: numérica, finita y > 0; obligatoria si la moneda no es la base (sin ella
+        # el monto no se puede llevar a BASE_CURRENCY)
+        rate = None
+        if fx_rate is not None:
+            try:
+                rate = float(fx_rate)
+            except (TypeError, ValueError):
+                raise InvalidFxRateError("La tasa de cambio debe ser un número mayor a cero")
+            if not math.isfinite(rate) or rate <= 0:
+                raise InvalidFxRateError("La tasa de cambio debe ser un número mayor a cero")
+        elif currency != BASE_CURRENCY:
+            raise InvalidFxRateError(f"La tasa de cambio es requerida para movimientos en {currency}")
+
+        # Clave de idempotencia (opcional): la elige el cliente para que un reintento no duplique
+        if idempotency_key is not None and (
+                not isinstance(idempotency_key, str) or not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH):
+            raise InvalidIdempotencyKeyError("La clave de idempotencia debe ser un texto de 1 a 200 caracteres")
+
         self.date = date
         self.type = type
         self.amount = value
         self.category = category
         self.description = description
-        # Currency and FX rate (optional). Stored as provided; default currency is COP
-        self.currency = currency or 'COP'
-        self.fx_rate = float(fx_rate) if fx_rate is not None else None
+        # Currency (upper-cased, default COP) and FX rate (required for non-base currencies)
+        self.currency = currency
+        self.fx_rate = rate
+        self.idempotency_key = idempotency_key
+
+    @property
+    def amount_base(self) -> float:
+        """Monto en BASE_CURRENCY. `fx_rate` son unidades de moneda base por unidad de `currency`."""
+        if self.currency == BASE_CURRENCY:
+            return self.amount
+        return self.amount * self.fx_rate
@@ -11,3 +11,33 @@ class InvalidDateFormatError(ValueError):
 class InvalidTypeError(ValueError):
     """Tipo inválido. Debe ser 'Ingreso' o 'Gasto'"""
     pass
+
+
+class InvalidCategoryError(ValueError):
+    """La categoría es requerida (texto no vacío)"""
+    pass
+
+
+class InvalidCurrencyError(ValueError):
+    """La moneda debe ser un código de texto (p. ej. COP, USD)"""
+    pass
+
+
+class InvalidFxRateError(ValueError):
+    """La tasa de cambio debe ser un número mayor a cero"""
+    pass
+
+
+class InvalidDescriptionError(ValueError):
+    """La descripción debe ser texto"""
+    pass
+
+
+class InvalidIdempotencyKeyError(ValueError):
+    """La clave de idempotencia debe ser un texto de 1 a 200 caracteres"""
+    pass
+
+
+class CategoryInUseError(ValueError):
+    """La categoría tiene movimientos asociados y no se puede eliminar"""
+    pass
@@ -0,0 +1,29 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+# Monedas base aceptadas por /fx/latest. Cada base tiene su propia entrada en la caché y
+# sus fallos cuentan en el circuit breaker compartido: no se aceptan códigos arbitrarios.
+SUPPORTED_CURRENCIES = frozenset({
+    "COP", "USD", "EUR", "GBP", "CHF", "CAD", "AUD", "JPY", "CNY",
+    "MXN", "BRL", "ARS", "CLP", "PEN", "UYU",
+})
+
+
+@dataclass
+class FxQuote:
+    """Tasas de cambio de `base` hacia cada moneda de `rates` (1 base = rate símbolo)."""
+    base: str
+    rates: Dict[str, float] = field(default_factory=dict)
+    date: Optional[str] = None   # fecha de la cotización según el proveedor
+    fetched_at: float = 0.0      # epoch (segundos) en que se obtuvo del proveedor
+    stale: bool = False          # True si se sirvió una tasa vencida mientras se refresca
+
+    def select(self, symbols) -> "FxQuote":
+        """Copia con sólo los símbolos pedidos (los desconocidos se omiten)."""
+        if not symbols:
+            return FxQuote(self.base, dict(self.rates), self.date, self.fetched_at, self.stale)
+        rates = {s: self.rates[s] for s in symbols if s in self.rates}
+        return FxQuote(self.base, rates, self.date, self.fetched_at, self.stale)
+
+    def to_dict(self):
+        return {"base": self.base, "date": self.date, "rates": self.rates, "stale": self.stale}
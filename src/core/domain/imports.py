@@ -0,0 +1,20 @@
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class RowError:
+    row: int     # número de fila/registro en el archivo de origen (1 = primer registro de datos)
+    error: str
+
+
+@dataclass
+class ImportResult:
+    inserted: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+    def to_dict(self):
+        return {
+            'inserted': self.inserted,
+            'errors': [{'row': e.row, 'error': e.error} for e in self.errors],
+        }
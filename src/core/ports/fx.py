@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+
+
+class FxProviderInterface(ABC):
+    """Fuente externa de tasas de cambio."""
+
+    @abstractmethod
+    def fetch_latest(self, base: str):
+        """Devuelve un FxQuote con todas las tasas conocidas para `base`.
+        Lanza una excepción si el proveedor no responde o la respuesta no es válida.
+        """
+        raise NotImplementedError
+
+
+class FxRateStoreInterface(ABC):
+    """Almacén persistente de la última cotización conocida por moneda base."""
+
+    @abstractmethod
+    def load(self, base: str):
+        """Devuelve el FxQuote guardado para `base` o None."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, quote):
+        """Guarda (reemplaza) las tasas de `quote`."""
+        raise NotImplementedError
@@ -1,4 +1,6 @@
+import json
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 
 
 class MovementRepositoryInterface(ABC):
@@ -7,13 +9,55 @@ class MovementRepositoryInterface(ABC):
         """Persiste un Movement y devuelve el id (int)."""
         raise NotImplementedError
 
+    def save_all(self, movements):
+        """Persiste una lista de Movement y devuelve, en el mismo orden, tuplas (id, creado).
+
+        Si un movimiento trae `idempotency_key` y ya hay uno guardado con esa clave no se
+        inserta otro: se devuelve el id existente con creado=False. Los adaptadores deberían
+        hacerlo en una sola transacción; la implementación por defecto llama a `save` uno a
+        uno y no deduplica.
+        """
+        return [(self.save(m), True) for m in movements]
+
+    def save_many(self, movements, batch_size: int = 5000):
+        """Persiste un iterable de Movement y devuelve cuántos se insertaron.
+
+        Los adaptadores deberían hacerlo en una sola transacción y por lotes; la
+        implementación por defecto llama a `save` uno a uno.
+        """
+        count = 0
+        for m in movements:
+            self.save(m)
+            count += 1
+        return count
+
     @abstractmethod
-    def find_by_criteria(self, date_from=None, date_to=None, category=None):
+    def find_by_criteria(self, date_from=None, date_to=None, category=None, after=None, limit=None, q=None):
         """Devuelve una lista de movimientos que cumplan los criterios (opcionalmente).
         Los parámetros son cadenas: date_from YYYY-MM-DD, date_to YYYY-MM-DD, category para búsqueda parcial.
+        Orden: date DESC, id DESC. `after` es un cursor (date, id) y `limit` el tamaño de página.
+        `q` es una búsqueda de texto en descripción y categoría: los resultados llevan `rank`,
+        se ordenan por relevancia (rank, id) y `after` pasa a ser (rank, id).
         """
         raise NotImplementedError
 
+    def iter_by_criteria(self, date_from=None, date_to=None, category=None, after=None, limit=None, q=None):
+        """Igual que `find_by_criteria` pero como generador (streaming).
+
+        La implementación por defecto delega en `find_by_criteria`; los adaptadores
+        deberían leer el cursor por bloques para acotar la memoria.
+        """
+        return iter(self.find_by_criteria(date_from=date_from, date_to=date_to, category=category, after=after, limit=limit, q=q))
+
+    def iter_json_by_criteria(self, date_from=None, date_to=None, category=None, after=None, limit=None, q=None):
+        """Igual que `iter_by_criteria`, pero cada movimiento como texto JSON (un objeto por fila).
+
+        La implementación por defecto serializa los dicts; un adaptador puede devolver
+        el JSON ya armado por la base de datos.
+        """
+        rows = self.iter_by_criteria(date_from=date_from, date_to=date_to, category=category, after=after, limit=limit, q=q)
+        return (json.dumps(row, ensure_ascii=False) for row in rows)
+
     @abstractmethod
     def get_monthly_aggregates(self, month: str, year: str):
         """Devuelve agregados por tipo para un mes y año dados. month debe ser 'MM', year 'YYYY'."""
@@ -53,12 +97,16 @@ class MovementRepositoryInterface(ABC):
 
     @abstractmethod
     def delete_category(self, category_id: int):
-        """Elimina una categoría por id. Devuelve True si se eliminó."""
+        """Elimina una categoría por id. Devuelve True si se eliminó.
+        Si algún movimiento la referencia lanza `CategoryInUseError`.
+        """
         raise NotImplementedError
 
     @abstractmethod
     def update_category(self, category_id: int, new_name: str, icon: str = None):
-        """Actualiza el nombre (y opcionalmente icon) de una categoría. Devuelve True si se actualizó."""
+        """Actualiza el nombre (y opcionalmente icon) de una categoría. Devuelve True si se actualizó.
+        Los movimientos referencian la categoría por id, así que reflejan el nombre nuevo.
+        """
         raise NotImplementedError
 
     @abstractmethod
@@ -68,9 +116,63 @@ class MovementRepositoryInterface(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def get_years(self):
+        """Devuelve los años ('YYYY') con movimientos, del más reciente al más antiguo."""
+        raise NotImplementedError
+
     @abstractmethod
     def get_daily_aggregates(self, month: str, year: str):
         """Devuelve totales por día para el mes y año dados.
         Retorna un dict con claves '01'..'31' -> {'Ingreso': total, 'Gasto': total}
         """
         raise NotImplementedError
+
+    def get_monthly_carryover(self, month: str, year: str):
+        """Opcional: totales del mes, neto del mes anterior y neto acumulado del año hasta el mes.
+        El adaptador SQLite los lee de los rollups y del saldo acumulado por día (`balance_ledger`).
+
+        Retorna un dict con 'ingresos', 'gastos', 'previous_net' y 'cumulative_net'.
+        Los adaptadores que no lo implementen dejan este NotImplementedError y
+        `ReportService` lo calcula con `get_monthly_aggregates`/`get_yearly_aggregates`.
+        """
+        raise NotImplementedError
+
+    def get_series(self, date_from: str, date_to: str, granularity: str = "month"):
+        """Opcional: lista de (periodo, ingresos, gastos) ordenada por periodo, para fechas en
+        [date_from, date_to) ('YYYY-MM-DD'). `granularity` es day|week|month|year y el periodo
+        es 'YYYY-MM-DD' (la semana se identifica por su lunes), 'YYYY-MM' o 'YYYY'.
+        Sólo se devuelven los periodos con movimientos.
+        """
+        raise NotImplementedError
+
+    def get_balance_at(self, date: str):
+        """Opcional: saldo acumulado (ingresos - gastos, moneda base) de todo el historial
+        hasta `date` ('YYYY-MM-DD') inclusive."""
+        raise NotImplementedError
+
+    def get_balance_series(self, date_from: str = None, date_to: str = None, granularity: str = "month"):
+        """Opcional: lista de (periodo, saldo acumulado al cierre del periodo) ordenada por
+        periodo, para fechas en [date_from, date_to) (None = sin límite). Los periodos son
+        los de `get_series` y sólo aparecen los que tienen movimientos.
+        """
+        raise NotImplementedError
+
+    def get_data_version(self):
+        """Entero que cambia con cada escritura de movimientos o categorías (en cualquier proceso).
+        Devuelve None si el adaptador no lo soporta: en ese caso no se cachean reportes.
+        """
+        return None
+
+    def get_category_version(self):
+        """Entero que cambia con cada alta, modificación o baja de categorías (en cualquier proceso).
+        Devuelve None si el adaptador no lo soporta: en ese caso no se cachean categorías.
+        """
+        return None
+
+    def snapshot(self):
+        """Opcional: context manager dentro del cual todas las lecturas ven la misma versión de los datos.
+
+        Por defecto no hace nada (cada consulta ve el último estado confirmado).
+        """
+        return nullcontext()
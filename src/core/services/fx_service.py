@@ -0,0 +1,192 @@
+import threading
+import time
+
+from ..domain.entities import BASE_CURRENCY
+from ..domain.fx import FxQuote
+
+DEFAULT_TTL = 3600.0
+
+
+class FxUnavailableError(RuntimeError):
+    """No hay tasa en caché ni en el almacén y el proveedor no respondió."""
+    pass
+
+
+class CircuitOpenError(RuntimeError):
+    """El circuito está abierto: no se llama al proveedor hasta que pase `reset_timeout`."""
+    pass
+
+
+class CircuitBreaker:
+    """Circuito clásico cerrado → abierto → semiabierto.
+
+    Tras `failure_threshold` fallos seguidos se abre y rechaza las llamadas durante
+    `reset_timeout` segundos; después deja pasar una sola llamada de prueba: si
+    funciona se cierra, si falla vuelve a abrirse.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def call(self, fn, *args, **kwargs):
+        with self._lock:
+            state = self._state()
+            if state == self.OPEN or (state == self.HALF_OPEN and self._trial_in_flight):
+                raise CircuitOpenError("Proveedor de tasas no disponible (circuito abierto)")
+            if state == self.HALF_OPEN:
+                self._trial_in_flight = True
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._trial_in_flight = False
+                self._failures += 1
+                if state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                    self._opened_at = self._clock()
+            raise
+        with self._lock:
+            self._trial_in_flight = False
+            self._failures = 0
+            self._opened_at = None
+        return result
+
+
+def fill_fx_rate(fx_service, currency, fx_rate):
+    """`fx_rate` tal cual si viene; si falta y `currency` no es la moneda base, la tasa vigente de
+    `fx_service`. Sin servicio o sin tasa devuelve None y `Movement` rechaza el movimiento."""
+    if fx_rate is not None or fx_service is None or not isinstance(currency, str):
+        return fx_rate
+    currency = currency.strip().upper()
+    if not currency or currency == BASE_CURRENCY:
+        return fx_rate
+    try:
+        return fx_service.rate_to_base(currency)
+    except FxUnavailableError:
+        return None
+
+
+def _spawn_thread(fn):
+    threading.Thread(target=fn, name="fx-refresh", daemon=True).start()
+
+
+class FxService:
+    """Tasas de cambio con caché en proceso, respaldo persistente y circuit breaker.
+
+    - Tasa vigente (edad < `ttl`) en caché: se devuelve sin E/S.
+    - Tasa vencida: se devuelve marcada `stale` y se refresca en segundo plano
+      (stale-while-revalidate), un solo refresco por moneda base a la vez.
+    - Sin tasa en memoria: se busca en `store` (sobrevive a reinicios) y, si
+      tampoco hay, se llama al proveedor en la petición.
+
+    Las llamadas al proveedor pasan por `breaker`, así un proveedor caído no
+    acumula timeouts. `spawn` ejecuta los refrescos en segundo plano (los tests
+    pueden pasar una función síncrona).
+    """
+
+    def __init__(self, provider, store=None, ttl: float = DEFAULT_TTL, breaker: CircuitBreaker = None,
+                 clock=time.time, spawn=_spawn_thread):
+        self.provider = provider
+        self.store = store
+        self.ttl = ttl
+        self.breaker = breaker or CircuitBreaker()
+        self._clock = clock
+        self._spawn = spawn
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def latest(self, base: str = "COP", symbols=None) -> FxQuote:
+        base = base.upper()
+        quote = self._cache.get(base)
+        if quote is None:
+            quote = self._load_stored(base)
+        if quote is None:
+            try:
+                quote = self._refresh(base)
+            except Exception as e:
+                raise FxUnavailableError(f"No hay tasas disponibles para {base}: {e}") from e
+        elif self._clock() - quote.fetched_at >= self.ttl:
+            self._schedule_refresh(base)
+            quote = quote.select(None)
+            quote.stale = True
+        return quote.select(symbols)
+
+    def rates_to_base(self, base: str = BASE_CURRENCY) -> dict:
+        """Todas las tasas de la cotización de `base` en la convención de `Movement.fx_rate`
+        (unidades de `base` por unidad de cada moneda), con una sola consulta."""
+        base = base.upper()
+        return {c: 1.0 / r for c, r in self.latest(base).rates.items() if r and c != base}
+
+    def rate_to_base(self, currency: str, base: str = BASE_CURRENCY) -> float:
+        """Unidades de `base` por unidad de `currency` (la convención de `Movement.fx_rate`).
+        Las cotizaciones están expresadas al revés (unidades de `currency` por unidad de `base`)."""
+        currency = currency.upper()
+        rate = self.latest(base, [currency]).rates.get(currency)
+        if not rate:
+            raise FxUnavailableError(f"No hay tasa para {currency}")
+        return 1.0 / rate
+
+    def _load_stored(self, base):
+        if self.store is None:
+            return None
+        try:
+            quote = self.store.load(base)
+        except Exception:
+            return None
+        if quote is not None:
+            with self._lock:
+                self._cache.setdefault(base, quote)
+        return quote
+
+    def _refresh(self, base) -> FxQuote:
+        quote = self.breaker.call(self.provider.fetch_latest, base)
+        quote.base = base
+        quote.fetched_at = self._clock()
+        quote.stale = False
+        if self.store is not None:
+            try:
+                self.store.save(quote)
+            except Exception:
+                pass  # la caché en memoria sigue sirviendo aunque no se pueda persistir
+        with self._lock:
+            self._cache[base] = quote
+        return quote
+
+    def _schedule_refresh(self, base):
+        with self._lock:
+            if base in self._refreshing:
+                return
+            self._refreshing.add(base)
+
+        def run():
+            try:
+                self._refresh(base)
+            except Exception:
+                pass  # se reintentará en la próxima petición (si el circuito lo permite)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(base)
+
+        self._spawn(run)
@@ -0,0 +1,64 @@
+from ..domain.entities import Movement
+from ..domain.imports import ImportResult, RowError
+from .fx_service import FxUnavailableError
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+class ImportService:
+    """Importa movimientos en bloque: valida cada fila con las reglas de `Movement`,
+    acumula los errores por fila sin abortar y persiste las válidas en lotes.
+    """
+
+    def __init__(self, repository, fx_service=None):
+        self.repository = repository
+        # Si está, completa `fx_rate` de las filas en otra moneda que no la traen
+        self.fx_service = fx_service
+
+    def import_rows(self, rows, batch_size: int = DEFAULT_BATCH_SIZE) -> ImportResult:
+        """`rows` es un iterable de (número_de_fila, dict) como los que producen los parsers de
+        `src/infrastructure/importers`. Se consume en streaming."""
+        result = ImportResult()
+        # Las tasas se resuelven antes de la transacción de escritura: consultar el proveedor o
+        # guardar la cotización dentro de ella bloquearía el archivo (o esperaría su propio lock)
+        rates = self._base_rates()
+
+        def valid_movements():
+            for row_number, data in rows:
+                if isinstance(data, RowError):
+                    # El parser no pudo decodificar el registro
+                    result.errors.append(data)
+                    continue
+                if not data.get("category"):
+                    # La columna es NOT NULL: una fila sin categoría abortaría todo el lote
+                    result.errors.append(RowError(row=row_number, error="La categoría es requerida"))
+                    continue
+                try:
+                    yield Movement(
+                        date=data.get("date"),
+                        type=data.get("type"),
+                        amount=data.get("amount"),
+                        category=data.get("category"),
+                        description=data.get("description") or None,
+                        currency=data.get("currency") or 'COP',
+                        fx_rate=data.get("fx_rate") or _rate_for(rates, data.get("currency")),
+                    )
+                except (TypeError, ValueError) as e:
+                    result.errors.append(RowError(row=row_number, error=str(e)))
+
+        result.inserted = self.repository.save_many(valid_movements(), batch_size=batch_size)
+        return result
+
+    def _base_rates(self) -> dict:
+        if self.fx_service is None:
+            return {}
+        try:
+            return self.fx_service.rates_to_base()
+        except FxUnavailableError:
+            return {}  # las filas en otra moneda sin tasa se rechazan una a una
+
+
+def _rate_for(rates, currency):
+    if not isinstance(currency, str):
+        return None
+    return rates.get(currency.strip().upper())
@@ -1,10 +1,53 @@
+from ..domain.batches import BatchResult, ItemResult
 from ..domain.entities import Movement
+from .fx_service import fill_fx_rate
+
+# Máximo de movimientos por envío (una sola transacción)
+MAX_BATCH_ITEMS = 1000
 
 
 class MovementService:
-    def __init__(self, repository):
+    def __init__(self, repository, fx_service=None):
         self.repository = repository
+        # Si está, completa `fx_rate` de los movimientos en otra moneda que no la traen
+        self.fx_service = fx_service
 
-    def create_movement(self, date, type, amount, category, description=None, currency: str = 'COP', fx_rate: float | None = None):
-        m = Movement(date=date, type=type, amount=amount, category=category, description=description, currency=currency, fx_rate=fx_rate)
+    def create_movement(self, date, type, amount, category, description=None, currency: str = 'COP', fx_rate: float | None = None,
+                        idempotency_key: str | None = None):
+        m = Movement(date=date, type=type, amount=amount, category=category, description=description, currency=currency,
+                     fx_rate=fill_fx_rate(self.fx_service, currency, fx_rate), idempotency_key=idempotency_key)
         return self.repository.save(m)
+
+    def create_movements(self, items) -> BatchResult:
+        """Valida cada dict de `items` con las reglas de `Movement` y guarda los válidos en una
+        sola transacción (`save_all`). El resultado va en el mismo orden que `items`: el id y si
+        se creó o ya existía (misma `idempotency_key`), o el error de validación del elemento.
+        """
+        if len(items) > MAX_BATCH_ITEMS:
+            raise ValueError(f"Se admiten como máximo {MAX_BATCH_ITEMS} movimientos por envío")
+        result = BatchResult(items=[ItemResult() for _ in items])
+        valid, positions = [], []
+        for i, data in enumerate(items):
+            if not isinstance(data, dict):
+                result.items[i].error = "Cada movimiento debe ser un objeto JSON"
+                continue
+            try:
+                valid.append(Movement(
+                    date=data.get("date"),
+                    type=data.get("type"),
+                    amount=data.get("amount"),
+                    category=data.get("category"),
+                    description=data.get("description"),
+                    currency=data.get("currency") or 'COP',
+                    fx_rate=fill_fx_rate(self.fx_service, data.get("currency"), data.get("fx_rate")),
+                    idempotency_key=data.get("idempotency_key"),
+                ))
+                positions.append(i)
+            except (TypeError, ValueError) as e:
+                # Un elemento inválido se reporta en su posición; el resto del lote se guarda
+                result.items[i].error = str(e)
+        if valid:
+            for i, (movement_id, created) in zip(positions, self.repository.save_all(valid)):
+                result.items[i].id = movement_id
+                result.items[i].created = created
+        return result
@@ -1,4 +1,4 @@
-from datetime import datetime
+from ..domain.entities import is_valid_date
 from ..domain.exceptions import InvalidDateFormatError
 
 
@@ -7,18 +7,78 @@ class MovementQueryService:
         self.repository = repository
 
     def _validate_date(self, date_str):
-        try:
-            datetime.strptime(date_str, "%Y-%m-%d")
-            return date_str
-        except Exception:
+        if not is_valid_date(date_str):
             raise InvalidDateFormatError("Formato de fecha incorrecto. Use AAAA-MM-DD")
+        return date_str
 
-    def find(self, date_from=None, date_to=None, category=None):
+    def _validate_range(self, date_from, date_to):
         if date_from:
             date_from = self._validate_date(date_from)
         if date_to:
             date_to = self._validate_date(date_to)
         if date_from and date_to and date_to < date_from:
             raise ValueError("La fecha 'to' no puede ser anterior a 'from'.")
+        return date_from, date_to
+
+    def parse_cursor(self, cursor, search: bool = False):
+        """Convierte 'YYYY-MM-DD,ID' en (date, id); en búsquedas, 'r:RANK,ID' en (rank, id). None/'' -> None."""
+        if not cursor:
+            return None
+        try:
+            key, id_str = cursor.split(",", 1)
+            if search:
+                if not key.startswith("r:"):
+                    raise ValueError
+                return float(key[2:]), int(id_str)
+            return self._validate_date(key.strip()), int(id_str)
+        except (ValueError, InvalidDateFormatError):
+            expected = "r:RANK,ID" if search else "AAAA-MM-DD,ID"
+            raise ValueError(f"Cursor inválido. Use '{expected}'")
+
+    @staticmethod
+    def make_cursor(row):
+        if "rank" in row:
+            return f"r:{row['rank']!r},{row['id']}"
+        return f"{row['date']},{row['id']}"
+
+    def find(self, date_from=None, date_to=None, category=None, q=None):
+        date_from, date_to = self._validate_range(date_from, date_to)
+        return self.repository.find_by_criteria(date_from=date_from, date_to=date_to, category=category, q=q or None)
+
+    def iter(self, date_from=None, date_to=None, category=None, after=None, limit=None, q=None):
+        """Generador de movimientos (date DESC, id DESC); `after` es un cursor 'YYYY-MM-DD,ID'.
+
+        Con `q` (búsqueda de texto) el orden es por relevancia y el cursor 'r:RANK,ID'.
+        """
+        date_from, date_to = self._validate_range(date_from, date_to)
+        if limit is not None:
+            limit = int(limit)
+            if limit <= 0:
+                raise ValueError("'limit' debe ser un entero positivo")
+        q = q or None
+        return self.repository.iter_by_criteria(
+            date_from=date_from, date_to=date_to, category=category, after=self.parse_cursor(after, search=bool(q)), limit=limit, q=q
+        )
+
+    def iter_json(self, date_from=None, date_to=None, category=None, after=None, limit=None, q=None):
+        """Como `iter`, pero cada movimiento ya serializado como objeto JSON (texto)."""
+        date_from, date_to = self._validate_range(date_from, date_to)
+        if limit is not None:
+            limit = int(limit)
+            if limit <= 0:
+                raise ValueError("'limit' debe ser un entero positivo")
+        q = q or None
+        return self.repository.iter_json_by_criteria(
+            date_from=date_from, date_to=date_to, category=category, after=self.parse_cursor(after, search=bool(q)), limit=limit, q=q
+        )
 
-        return self.repository.find_by_criteria(date_from=date_from, date_to=date_to, category=category)
+    def page(self, date_from=None, date_to=None, category=None, after=None, limit=50, q=None):
+        """Una página de resultados y el cursor para la siguiente (None si no hay más)."""
+        limit = int(limit)
+        if limit <= 0:
+            raise ValueError("'limit' debe ser un entero positivo")
+        # Pedimos una fila extra para saber si hay página siguiente
+        rows = list(self.iter(date_from=date_from, date_to=date_to, category=category, after=after, limit=limit + 1, q=q))
+        items = rows[:limit]
+        next_cursor = self.make_cursor(items[-1]) if len(rows) > len(items) else None
+        return {"items": items, "next": next_cursor}
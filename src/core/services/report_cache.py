@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_SIZE = 512
+
+
+class ReportCache:
+    """LRU acotado y seguro entre hilos. Las claves incluyen la versión de los datos,
+    así que una escritura deja obsoletas todas las entradas anteriores sin borrarlas:
+    simplemente dejan de pedirse y el LRU las expulsa."""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_MISSING = object()
+
+
+class CachedReportService:
+    """Envuelve un ReportService: cada método público se cachea por (namespace, método, argumentos).
+
+    `namespace` identifica la base de datos, la versión de los datos y la tasa de
+    conversión; si es None (repositorio sin versión) no se cachea nada. Los resultados
+    se comparten entre peticiones, así que no deben modificarse. Sirve igual para
+    cualquier objeto con métodos de sólo lectura (p. ej. el repositorio, para categorías).
+    """
+
+    def __init__(self, service, cache: ReportCache, namespace=None):
+        self._service = service
+        self._cache = cache
+        self._namespace = namespace
+
+    def __getattr__(self, name):
+        attr = getattr(self._service, name)
+        if name.startswith('_') or not callable(attr) or self._namespace is None:
+            return attr
+
+        def cached(*args, **kwargs):
+            key = (self._namespace, name, args, tuple(sorted(kwargs.items())))
+            value = self._cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = attr(*args, **kwargs)
+                self._cache.put(key, value)
+            return value
+
+        return cached
@@ -1,22 +1,156 @@
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+
+from ..domain.entities import is_valid_date
 from ..domain.reports import MonthlyBalance, CategorySummary
 
 
+GRANULARITIES = ("day", "week", "month", "year")
+
+# Tope de puntos por serie (≈ 27 años diarios)
+MAX_SERIES_POINTS = 10000
+
+
+def _parse_month(value: str, name: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Parámetro '{name}' inválido. Use AAAA-MM")
+
+
+def _next_month(d: date) -> date:
+    return date(d.year + 1, 1, 1) if d.month == 12 else date(d.year, d.month + 1, 1)
+
+
+def _period_start(period: str) -> date:
+    """Primer día de un periodo 'YYYY', 'YYYY-MM' o 'YYYY-MM-DD'."""
+    return date.fromisoformat((period + "-01-01")[:10])
+
+
+def _percentile(sorted_values, q: float) -> float:
+    # Interpolación lineal entre los dos valores más cercanos (como numpy.percentile por defecto)
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def _rolling_mean(values, window: int):
+    """Media móvil de `window` periodos; los primeros promedian los que haya."""
+    out, acc = [], 0.0
+    for i, v in enumerate(values):
+        acc += v
+        if i >= window:
+            acc -= values[i - window]
+        out.append(acc / min(i + 1, window))
+    return out
+
+
+def _periods(start: date, end: date, granularity: str):
+    """Claves de todos los periodos que cubren [start, end), en orden."""
+    if granularity == "day":
+        step, d = timedelta(days=1), start
+        while d < end:
+            yield d.isoformat()
+            d += step
+    elif granularity == "week":
+        step, d = timedelta(days=7), start - timedelta(days=start.weekday())
+        while d < end:
+            yield d.isoformat()
+            d += step
+    elif granularity == "month":
+        d = start
+        while d < end:
+            yield d.isoformat()[:7]
+            d = _next_month(d)
+    else:
+        for y in range(start.year, end.year + (1 if end > date(end.year, 1, 1) else 0)):
+            yield f"{y:04d}"
+
+
 class ReportService:
-    def __init__(self, repository):
+    def __init__(self, repository, rate: float = 1.0, analytics=None, executor=None, repository_factory=None):
+        """Los repositorios devuelven montos en la moneda base (`amount_base`).
+        `rate` (unidades de la moneda de reporte por unidad de moneda base) convierte
+        los resultados a otra moneda; con 1.0 se reporta en la moneda base.
+        `analytics` es una función sin argumentos que devuelve la copia columnar de los
+        movimientos ya actualizada (ver `infrastructure/analytics`); la usa `trends`.
+        Con `executor` (un `concurrent.futures.Executor`) y `repository_factory` (función
+        sin argumentos que abre un repositorio de lectura; se cierra con `close()`),
+        `yearly_summary` y `dashboard` reparten sus agregados independientes en paralelo.
+        """
         self.repository = repository
+        self.rate = rate
+        self.analytics = analytics
+        self.executor = executor
+        self.repository_factory = repository_factory
+
+    def _gather(self, **tasks):
+        """Ejecuta `tasks` (nombre -> función(ReportService)) y devuelve {nombre: resultado}.
+
+        En paralelo, cada tarea usa su propio repositorio dentro de una transacción de
+        lectura y anota la `data_version` que vio; si una escritura se coló entre ellas,
+        se repite todo en serie en una sola transacción para no mezclar versiones.
+        """
+        if self.executor is not None and self.repository_factory is not None and len(tasks) > 1:
+            futures = {name: self.executor.submit(self._run_isolated, fn) for name, fn in tasks.items()}
+            results = {name: f.result() for name, f in futures.items()}
+            if len({version for version, _ in results.values()}) == 1:
+                return {name: value for name, (_, value) in results.items()}
+        snapshot = getattr(self.repository, 'snapshot', None)
+        with (snapshot() if snapshot else nullcontext()):
+            return {name: fn(self) for name, fn in tasks.items()}
+
+    def _run_isolated(self, fn):
+        repo = self.repository_factory()
+        try:
+            snapshot = getattr(repo, 'snapshot', None)
+            with (snapshot() if snapshot else nullcontext()):
+                get_version = getattr(repo, 'get_data_version', None)
+                version = get_version() if get_version else None
+                return version, fn(ReportService(repo, rate=self.rate))
+        finally:
+            repo.close()
+
+    def _amount(self, value) -> float:
+        return float(value or 0.0) * self.rate
 
     def monthly_balance(self, month: str, year: str) -> MonthlyBalance:
         data = self.repository.get_monthly_aggregates(month, year)
-        ingresos = float(data.get("Ingreso", 0.0))
-        gastos = float(data.get("Gasto", 0.0))
+        ingresos = self._amount(data.get("Ingreso", 0.0))
+        gastos = self._amount(data.get("Gasto", 0.0))
         return MonthlyBalance(month=month, year=year, total_ingresos=ingresos, total_gastos=gastos)
 
     def monthly_with_carryover(self, month: str, year: str):
         """Return monthly totals plus previous month's net and cumulative net for the year."""
+        get_carryover = getattr(self.repository, 'get_monthly_carryover', None)
+        try:
+            if get_carryover is None:
+                raise NotImplementedError
+            data = get_carryover(month, year)
+        except NotImplementedError:
+            # Repository without the single-query capability
+            return self._monthly_with_carryover_fallback(month, year)
+        ingresos = self._amount(data.get('ingresos', 0.0))
+        gastos = self._amount(data.get('gastos', 0.0))
+        return {
+            'month': month,
+            'year': year,
+            'ingresos': ingresos,
+            'gastos': gastos,
+            'neto': ingresos - gastos,
+            'previous_net': self._amount(data.get('previous_net', 0.0)),
+            'cumulative_net': self._amount(data.get('cumulative_net', 0.0)),
+        }
+
+    def _monthly_with_carryover_fallback(self, month: str, year: str):
+        """Same as monthly_with_carryover, composed from get_monthly_aggregates/get_yearly_aggregates."""
         # current month totals
         data = self.repository.get_monthly_aggregates(month, year)
-        ingresos = float(data.get("Ingreso", 0.0))
-        gastos = float(data.get("Gasto", 0.0))
+        ingresos = self._amount(data.get("Ingreso", 0.0))
+        gastos = self._amount(data.get("Gasto", 0.0))
         net = ingresos - gastos
 
         # previous month (may be in previous year)
@@ -34,8 +168,8 @@ class ReportService:
         prev_m_s = str(prev_m).zfill(2)
         prev_y_s = str(prev_y)
         prev_data = self.repository.get_monthly_aggregates(prev_m_s, prev_y_s)
-        prev_ing = float(prev_data.get('Ingreso', 0.0))
-        prev_gas = float(prev_data.get('Gasto', 0.0))
+        prev_ing = self._amount(prev_data.get('Ingreso', 0.0))
+        prev_gas = self._amount(prev_data.get('Gasto', 0.0))
         prev_net = prev_ing - prev_gas
 
         # cumulative for year up to current month
@@ -43,8 +177,8 @@ class ReportService:
         months = [str(i).zfill(2) for i in range(1, 13)]
         cumulative = 0.0
         for mon in months:
-            ing = float(yearly.get(mon, {}).get('Ingreso', 0.0))
-            gas = float(yearly.get(mon, {}).get('Gasto', 0.0))
+            ing = self._amount(yearly.get(mon, {}).get('Ingreso', 0.0))
+            gas = self._amount(yearly.get(mon, {}).get('Gasto', 0.0))
             cumulative += (ing - gas)
             if mon == month:
                 break
@@ -75,28 +209,43 @@ class ReportService:
                     rows = self.repository.get_expenses_by_category()
         # Filter out zero totals
         filtered = [r for r in rows if float(r.get('total', 0)) != 0]
-        return [CategorySummary(category=r["category"], total=float(r["total"])) for r in filtered]
+        return [CategorySummary(category=r["category"], total=self._amount(r["total"])) for r in filtered]
 
     def top_expenses(self, month: str, year: str, limit: int = 5, category: str = None):
         rows = self.repository.get_top_expenses(month, year, limit, category)
         # rows are dicts with category, description, amount, date
         return [
-            {"category": r["category"], "description": r["description"], "amount": float(r["amount"]), "date": r["date"]}
+            {"category": r["category"], "description": r["description"], "amount": self._amount(r["amount"]), "date": r["date"]}
             for r in rows
         ]
 
     def yearly_series(self, year: str):
         """Return a dict with months '01'..'12' each containing totals per type."""
-        data = self.repository.get_yearly_aggregates(year)
+        return self._series_from_yearly(self.repository.get_yearly_aggregates(year))
+
+    def _series_from_yearly(self, data):
         # Ensure months sorted
         months = [str(i).zfill(2) for i in range(1,13)]
-        ingresos = [float(data[m].get('Ingreso', 0.0)) for m in months]
-        gastos = [float(data[m].get('Gasto', 0.0)) for m in months]
+        ingresos = [self._amount(data[m].get('Ingreso', 0.0)) for m in months]
+        gastos = [self._amount(data[m].get('Gasto', 0.0)) for m in months]
         return { 'months': months, 'ingresos': ingresos, 'gastos': gastos }
 
     def yearly_summary(self, year: str):
         """Return monthly ingresos/gastos lists, monthly net, yearly totals and expenses by category for the year."""
-        series = self.yearly_series(year)
+        r = self._gather(
+            series=lambda rs: rs.yearly_series(year),
+            categories=lambda rs: rs._year_categories(year),
+        )
+        return self._summary_from_series(year, r['series'], r['categories'])
+
+    def _year_categories(self, year: str):
+        # expenses by category for the year (use wrapper to apply zero filtering)
+        try:
+            return [{'category': c.category, 'total': float(c.total)} for c in self.expenses_by_category(year=year)]
+        except Exception:
+            return []
+
+    def _summary_from_series(self, year: str, series, categories=None):
         months = series['months']
         ingresos = series['ingresos']
         gastos = series['gastos']
@@ -106,12 +255,8 @@ class ReportService:
         total_gastos = sum(gastos)
         total_neto = total_ingresos - total_gastos
 
-        # expenses by category for the year (use wrapper to apply zero filtering)
-        try:
-            cats = self.expenses_by_category(year=year)
-            categories = [ { 'category': c.category, 'total': float(c.total) } for c in cats ]
-        except Exception:
-            categories = []
+        if categories is None:
+            categories = self._year_categories(year)
 
         return {
             'months': months,
@@ -128,6 +273,168 @@ class ReportService:
         data = self.repository.get_daily_aggregates(month, year)
         # days sorted
         days = sorted(data.keys())
-        ingresos = [float(data[d].get('Ingreso', 0.0)) for d in days]
-        gastos = [float(data[d].get('Gasto', 0.0)) for d in days]
+        ingresos = [self._amount(data[d].get('Ingreso', 0.0)) for d in days]
+        gastos = [self._amount(data[d].get('Gasto', 0.0)) for d in days]
         return { 'days': days, 'ingresos': ingresos, 'gastos': gastos }
+
+    def _range_bounds(self, date_from: str, date_to: str, granularity: str):
+        if granularity not in GRANULARITIES:
+            raise ValueError("Parámetro 'granularity' debe ser day, week, month o year")
+        start = _parse_month(date_from, "from")
+        end = _next_month(_parse_month(date_to, "to"))
+        if end <= start:
+            raise ValueError("El mes 'to' no puede ser anterior a 'from'.")
+        if granularity == "day" and (end - start).days > MAX_SERIES_POINTS:
+            raise ValueError(f"El rango supera el máximo de {MAX_SERIES_POINTS} puntos")
+        return start, end
+
+    def series(self, date_from: str, date_to: str, granularity: str = "month"):
+        """Serie densa de ingresos/gastos entre los meses `date_from` y `date_to` (AAAA-MM, ambos
+        incluidos), agrupada por día, semana (lunes), mes o año.
+
+        El repositorio devuelve sólo los periodos con datos, ordenados; aquí se recorren una
+        vez junto con la lista completa de periodos para rellenar con ceros.
+        """
+        start, end = self._range_bounds(date_from, date_to, granularity)
+        rows = self.repository.get_series(start.isoformat(), end.isoformat(), granularity)
+        periods, ingresos, gastos = [], [], []
+        i, n = 0, len(rows)
+        for p in _periods(start, end, granularity):
+            periods.append(p)
+            if i < n and rows[i][0] == p:
+                ingresos.append(self._amount(rows[i][1]))
+                gastos.append(self._amount(rows[i][2]))
+                i += 1
+            else:
+                ingresos.append(0.0)
+                gastos.append(0.0)
+        return {
+            'granularity': granularity,
+            'periods': periods,
+            'ingresos': ingresos,
+            'gastos': gastos,
+            'netos': [a - b for a, b in zip(ingresos, gastos)],
+        }
+
+    def balance_at(self, day: str):
+        """Saldo acumulado de todo el historial hasta `day` (AAAA-MM-DD, inclusive)."""
+        if not is_valid_date(day):
+            raise ValueError("Parámetro 'date' inválido. Use AAAA-MM-DD")
+        return {'date': day, 'balance': self._amount(self.repository.get_balance_at(day))}
+
+    def balance_series(self, date_from: str = None, date_to: str = None, granularity: str = "month"):
+        """Saldo acumulado de todo el historial al cierre de cada periodo entre los meses
+        `date_from` y `date_to` (AAAA-MM, ambos incluidos). Sin `date_from` la serie empieza
+        en el primer periodo con movimientos y sin `date_to` termina en el último.
+
+        El repositorio devuelve sólo los periodos con movimientos; los demás repiten el
+        saldo anterior (el primero parte del saldo previo a `date_from`).
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError("Parámetro 'granularity' debe ser day, week, month o year")
+        start = _parse_month(date_from, "from") if date_from else None
+        end = _next_month(_parse_month(date_to, "to")) if date_to else None
+        rows = self.repository.get_balance_series(start and start.isoformat(), end and end.isoformat(), granularity)
+        if not rows and (start is None or end is None):
+            return {'granularity': granularity, 'periods': [], 'balances': []}
+        if start is None:
+            start = _period_start(rows[0][0])
+        if end is None:
+            end = max(_period_start(rows[-1][0]) + timedelta(days=1), start + timedelta(days=1))
+        if end <= start:
+            raise ValueError("El mes 'to' no puede ser anterior a 'from'.")
+        if granularity == "day" and (end - start).days > MAX_SERIES_POINTS:
+            raise ValueError(f"El rango supera el máximo de {MAX_SERIES_POINTS} puntos")
+        balance = self.repository.get_balance_at((start - timedelta(days=1)).isoformat())
+        periods, balances = [], []
+        i, n = 0, len(rows)
+        for p in _periods(start, end, granularity):
+            if i < n and rows[i][0] == p:
+                balance = rows[i][1]
+                i += 1
+            periods.append(p)
+            balances.append(self._amount(balance))
+        return {'granularity': granularity, 'periods': periods, 'balances': balances}
+
+    def trends(self, date_from: str, date_to: str, granularity: str = "month", window: int = 3,
+               percentiles=(50, 90, 99)):
+        """Vista exploratoria de gastos entre los meses `date_from` y `date_to` (AAAA-MM):
+        serie por periodo con su media móvil de `window` periodos, serie por categoría y
+        percentiles del importe de los gastos individuales.
+
+        Se calcula sobre la copia columnar en memoria, no con SQL.
+        """
+        if self.analytics is None:
+            raise NotImplementedError("trends requiere la copia columnar (analytics)")
+        if window < 1:
+            raise ValueError("Parámetro 'window' debe ser mayor a cero")
+        start, end = self._range_bounds(date_from, date_to, granularity)
+        snapshot = self.analytics()
+        lo, hi = start.isoformat(), end.isoformat()
+
+        periods = list(_periods(start, end, granularity))
+        totals = snapshot.group_sum(lo, hi, granularity)
+        gastos = [self._amount(totals.get(p)) for p in periods]
+
+        by_category = {}
+        for (p, name), total in snapshot.group_sum(lo, hi, granularity, by_category=True).items():
+            by_category.setdefault(name, {})[p] = total
+        categories = {
+            name: [self._amount(values.get(p)) for p in periods]
+            for name, values in sorted(by_category.items(), key=lambda kv: -sum(kv[1].values()))
+        }
+
+        amounts = sorted(snapshot.values(lo, hi))
+        return {
+            'granularity': granularity,
+            'periods': periods,
+            'gastos': gastos,
+            'rolling_gastos': _rolling_mean(gastos, window),
+            'categories': categories,
+            'percentiles': {f"p{q:g}": self._amount(_percentile(amounts, q)) for q in percentiles},
+            'count': len(amounts),
+        }
+
+    def daily_totals(self, month: str, year: str):
+        """Totales por día y tipo ({'01': {'Ingreso': x, 'Gasto': y}, ...}), como el repositorio."""
+        data = self.repository.get_daily_aggregates(month, year)
+        return {d: {t: self._amount(v) for t, v in totals.items()} for d, totals in data.items()}
+
+    def years(self):
+        return self.repository.get_years()
+
+    def dashboard(self, month: str, year: str = None, category: str = None, limit: int = 5):
+        """Everything the reports page shows, from one consistent version of the data.
+
+        The monthly balance comes from `monthly_with_carryover`, the same ledger-backed
+        source as /reports/balance and /reports/balance-at. If `year` is empty the most
+        recent year with data is used. The independent reads go through `_gather` (in
+        parallel when an executor is configured).
+        """
+        if not year:
+            years = self.repository.get_years()
+            year = years[0] if years else str(date.today().year)
+        tasks = dict(
+            balance=lambda rs: rs.monthly_with_carryover(month, year),
+            years=lambda rs: rs.repository.get_years(),
+            yearly=lambda rs: rs.repository.get_yearly_aggregates(year),
+            categories=lambda rs: rs.repository.get_categories_by_type('Gasto'),
+            month_expenses=lambda rs: rs.expenses_by_category(year=year, month=month),
+            year_expenses=lambda rs: rs._year_categories(year),
+            top_expenses=lambda rs: rs.top_expenses(month, year, limit, category),
+            daily=lambda rs: rs.daily_series(month, year),
+        )
+        r = self._gather(**tasks)
+        series = self._series_from_yearly(r['yearly'])
+
+        return {
+            'month': month,
+            'year': year,
+            'years': r['years'],
+            'categories': r['categories'],
+            'balance': r['balance'],
+            'expenses_by_category': [{'category': c.category, 'total': c.total} for c in r['month_expenses']],
+            'top_expenses': r['top_expenses'],
+            'daily': r['daily'],
+            'yearly': self._summary_from_series(year, series, r['year_expenses']),
+        }
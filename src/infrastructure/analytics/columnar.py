@@ -0,0 +1,196 @@
+"""Copia columnar en memoria de los movimientos para `/reports/trends`.
+
+Cada columna es un `array` empaquetado (8 bytes por valor para fechas, categorías e
+importes, 1 byte para el tipo), ordenado por (fecha, id). Un rango de fechas son dos
+búsquedas binarias y, como las filas están ordenadas, cada periodo también es una
+rebanada contigua: la suma por periodo es un `sum(compress(...))` por rebanada. La
+suma por (periodo, categoría) sí recorre las filas en Python.
+
+La copia se carga una vez por proceso y se actualiza según `data_version`: si
+desde la última carga sólo hubo inserciones (`rewrites` no cambió) y las filas
+nuevas no son anteriores a la última fecha cargada, se añaden al final; en
+cualquier otro caso se recarga entera.
+
+Lee de `movements_all` (la vista temporal que deja `SQLiteMovementRepository` en su
+conexión), así que incluye los años archivados.
+"""
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import date
+from itertools import compress
+
+INGRESO, GASTO = 1, 0
+_KINDS = {"Ingreso": INGRESO, "Gasto": GASTO}
+# Invierte una máscara de tipos (bytes 0/1) en C: INGRESO -> GASTO
+_INVERT = bytes.maketrans(b"\x00\x01", b"\x01\x00")
+
+def _ordinal(iso: str) -> int:
+    return date.fromisoformat(iso).toordinal()
+
+
+def _period_key(granularity: str):
+    """(ordinal -> clave entera, clave entera -> etiqueta, clave entera -> ordinal de su primer
+    día) con las etiquetas de /reports/series."""
+    if granularity == "day":
+        return (lambda o: o), (lambda k: date.fromordinal(k).isoformat()), (lambda k: k)
+    if granularity == "week":
+        # El ordinal 1 (0001-01-01) es lunes: (o - 1) // 7 agrupa semanas de lunes a domingo
+        return (lambda o: (o - 1) // 7), (lambda k: date.fromordinal(k * 7 + 1).isoformat()), (lambda k: k * 7 + 1)
+    if granularity == "month":
+        def month(o):
+            d = date.fromordinal(o)
+            return d.year * 12 + d.month - 1
+        return (month, (lambda k: f"{k // 12:04d}-{k % 12 + 1:02d}"),
+                (lambda k: date(k // 12, k % 12 + 1, 1).toordinal()))
+    if granularity == "year":
+        return (lambda o: date.fromordinal(o).year), (lambda k: f"{k:04d}"), (lambda k: date(k, 1, 1).toordinal())
+    raise ValueError("Parámetro 'granularity' debe ser day, week, month o year")
+
+
+def _locked(method):
+    # Las consultas no deben ver columnas a medio actualizar por un refresh de otro hilo
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    wrapper.__name__, wrapper.__doc__ = method.__name__, method.__doc__
+    return wrapper
+
+
+class ColumnarSnapshot:
+    """Movimientos en columnas, ordenados por (fecha, id). Seguro entre hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+        self.version = None
+        self.rewrites = None
+        self.reloads = 0
+
+    def _clear(self):
+        self.ids = array("q")
+        self.days = array("l")      # date.toordinal()
+        self.kinds = array("b")     # INGRESO / GASTO
+        self.categories = array("q")
+        self.amounts = array("d")   # amount_base
+        self.category_names = {}
+        self._max_id = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ------------------------------------------------------------------ carga
+
+    def refresh(self, conn):
+        """Pone la copia al día con `conn` y la devuelve. Sin escrituras nuevas cuesta una consulta."""
+        version, rewrites = conn.execute("SELECT version, rewrites FROM data_version WHERE id = 1").fetchone()
+        if version == self.version and rewrites == self.rewrites:
+            return self
+        with self._lock:
+            started = not conn.in_transaction
+            if started:
+                conn.execute("BEGIN")  # versión y filas leídas de la misma foto
+            try:
+                version, rewrites = conn.execute("SELECT version, rewrites FROM data_version WHERE id = 1").fetchone()
+                if version != self.version or rewrites != self.rewrites:
+                    if rewrites != self.rewrites or not self._append(conn):
+                        self._reload(conn)
+                    self.category_names = dict(conn.execute("SELECT id, name FROM categories"))
+                    self.version, self.rewrites = version, rewrites
+            finally:
+                if started:
+                    conn.commit()
+        return self
+
+    def _rows(self, conn, after_id: int):
+        return conn.execute(
+            "SELECT id, date, type, category_id, amount_base FROM movements_all WHERE id > ? ORDER BY date, id",
+            (after_id,),
+        )
+
+    def _reload(self, conn):
+        self._clear()
+        self._extend(self._rows(conn, 0))
+        self.reloads += 1
+
+    def _append(self, conn) -> bool:
+        rows = self._rows(conn, self._max_id).fetchall()
+        if rows and self.days and _ordinal(rows[0][1]) < self.days[-1]:
+            return False  # filas con fecha anterior: romperían el orden, se recarga
+        self._extend(rows)
+        return True
+
+    def _extend(self, rows):
+        ids, days, kinds, cats, amounts = self.ids, self.days, self.kinds, self.categories, self.amounts
+        for id_, day, type_, category_id, amount in rows:
+            ids.append(id_)
+            days.append(_ordinal(day))
+            kinds.append(_KINDS[type_])
+            cats.append(category_id)
+            amounts.append(amount)
+            if id_ > self._max_id:
+                self._max_id = id_
+
+    # -------------------------------------------------------------- consultas
+
+    def _range(self, date_from: str, date_to: str):
+        """Índices [lo, hi) de las filas con fecha en [date_from, date_to)."""
+        return bisect_left(self.days, _ordinal(date_from)), bisect_left(self.days, _ordinal(date_to))
+
+    def _mask(self, lo: int, hi: int, kind: int) -> bytes:
+        mask = bytes(self.kinds[lo:hi])
+        return mask if kind == INGRESO else mask.translate(_INVERT)
+
+    @_locked
+    def values(self, date_from: str, date_to: str, kind: int = GASTO):
+        """Importes del tipo `kind` en el rango, en orden de fecha."""
+        lo, hi = self._range(date_from, date_to)
+        return list(compress(self.amounts[lo:hi], self._mask(lo, hi, kind)))
+
+    @_locked
+    def group_sum(self, date_from: str, date_to: str, granularity: str = "month", kind: int = GASTO,
+                  by_category: bool = False):
+        """Suma por periodo (o por (periodo, categoría)) de los movimientos de tipo `kind`.
+        Devuelve {etiqueta: total} o {(etiqueta, nombre_categoría): total}; los periodos sin
+        movimientos de ese tipo no aparecen."""
+        key_of, label_of, start_of = _period_key(granularity)
+        lo, hi = self._range(date_from, date_to)
+        days, amounts = self.days, self.amounts
+        mask = self._mask(lo, hi, kind)
+        if by_category:
+            cats, names = self.categories, self.category_names
+            sums = {}
+            last_day, last_key = None, None
+            for i in compress(range(lo, hi), mask):
+                day = days[i]
+                if day != last_day:  # filas ordenadas por fecha: una conversión por día distinto
+                    last_day, last_key = day, key_of(day)
+                k = (last_key, cats[i])
+                sums[k] = sums.get(k, 0.0) + amounts[i]
+            return {(label_of(p), names.get(c, str(c))): v for (p, c), v in sums.items()}
+        sums = {}
+        i = lo
+        while i < hi:
+            key = key_of(days[i])
+            # Fin del periodo: primera fila del siguiente (las filas están ordenadas por fecha)
+            j = bisect_left(days, start_of(key + 1), i, hi)
+            part = mask[i - lo:j - lo]
+            if part.count(1):
+                sums[label_of(key)] = sum(compress(amounts[i:j], part))
+            i = j
+        return sums
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_snapshot(db_path) -> ColumnarSnapshot:
+    """Copia columnar de este proceso para `db_path` (vacía hasta el primer `refresh`)."""
+    key = (os.getpid(), str(db_path))
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None:
+            snapshot = _snapshots[key] = ColumnarSnapshot()
+        return snapshot
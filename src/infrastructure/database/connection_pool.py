@@ -0,0 +1,154 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+
+class PoolTimeoutError(RuntimeError):
+    """No se pudo obtener una conexión del pool dentro del tiempo de espera."""
+    pass
+
+
+class ConnectionPool:
+    """Pool de conexiones SQLite seguro para hilos, pensado para uno por proceso (worker).
+
+    - `acquire()` entrega una conexión en uso exclusivo; `release()` la devuelve.
+    - Nunca hay más de `max_size` conexiones abiertas; si se agotan, `acquire()` espera
+      hasta `acquire_timeout` segundos y luego lanza `PoolTimeoutError`.
+    - Las conexiones ociosas más de `idle_timeout` segundos se cierran.
+    - `initializer(conn)` se ejecuta una sola vez, con la primera conexión abierta
+      (creación de esquema / migraciones).
+    - `on_connect(conn)` se ejecuta con cada conexión nueva (p. ej. PRAGMA por conexión).
+    - `factory` es la clase de conexión que recibe `sqlite3.connect` (p. ej. una instrumentada).
+    - `on_acquire(segundos)` recibe la espera de cada `acquire()` (métricas).
+    """
+
+    def __init__(
+        self,
+        db_path,
+        max_size: int = 5,
+        idle_timeout: float = 300.0,
+        acquire_timeout: float = 30.0,
+        initializer: Optional[Callable[[sqlite3.Connection], None]] = None,
+        on_connect: Optional[Callable[[sqlite3.Connection], None]] = None,
+        factory: type = sqlite3.Connection,
+        on_acquire: Optional[Callable[[float], None]] = None,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size debe ser >= 1")
+        self.db_path = Path(db_path)
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self._initializer = initializer
+        self._on_connect = on_connect
+        self._factory = factory
+        self._on_acquire = on_acquire
+        self._initialized = False
+        self._idle = deque()  # (conn, last_used) — el más reciente a la derecha
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+    def _connect(self):
+        # Una conexión del pool sólo la usa un hilo a la vez, pero puede pasar
+        # de un hilo a otro entre checkouts.
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, factory=self._factory)
+        if self._on_connect is not None:
+            self._on_connect(conn)
+        if not self._initialized and self._initializer is not None:
+            self._initializer(conn)
+        self._initialized = True
+        return conn
+
+    def _evict_idle(self, now):
+        # Los más antiguos están a la izquierda
+        while self._idle and now - self._idle[0][1] >= self.idle_timeout:
+            conn, _ = self._idle.popleft()
+            self._open -= 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def acquire(self) -> sqlite3.Connection:
+        started = time.monotonic()
+        conn = self._acquire(started + self.acquire_timeout)
+        if self._on_acquire is not None:
+            self._on_acquire(time.monotonic() - started)
+        return conn
+
+    def _acquire(self, deadline: float) -> sqlite3.Connection:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("El pool de conexiones está cerrado")
+                now = time.monotonic()
+                self._evict_idle(now)
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    return conn
+                if self._open < self.max_size:
+                    # Reservamos el hueco y conectamos (la primera vez también
+                    # inicializa el esquema, por eso se mantiene el lock).
+                    conn = self._connect()
+                    self._open += 1
+                    return conn
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise PoolTimeoutError("No hay conexiones disponibles en el pool")
+                self._cond.wait(remaining)
+
+    def release(self, conn: sqlite3.Connection):
+        # Devolver siempre una conexión limpia (sin transacción a medias)
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                conn.close()
+                return
+            self._idle.append((conn, time.monotonic()))
+            self._evict_idle(time.monotonic())
+            self._cond.notify()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        with self._cond:
+            return {"open": self._open, "idle": len(self._idle), "in_use": self._open - len(self._idle), "max_size": self.max_size}
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                self._open -= 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._cond.notify_all()
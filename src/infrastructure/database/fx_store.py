@@ -0,0 +1,42 @@
+from src.core.domain.fx import FxQuote
+from src.core.ports.fx import FxRateStoreInterface
+from src.infrastructure.database.connection_pool import ConnectionPool
+
+# El almacén usa su propio pool (`get_pool(db_path, "fx", FX_POOL_SIZE)`): una petición que ya
+# tiene una conexión del pool principal no espera por otra para leer o guardar tasas
+FX_POOL_NAME = "fx"
+FX_POOL_SIZE = 1
+
+
+class SQLiteFxRateStore(FxRateStoreInterface):
+    """Tabla `fx_rates` (migración 7). Toma una conexión del pool por operación."""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    def load(self, base: str):
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT symbol, rate, as_of, fetched_at FROM fx_rates WHERE base = ?", (base,)
+            ).fetchall()
+        if not rows:
+            return None
+        return FxQuote(
+            base=base,
+            rates={r[0]: r[1] for r in rows},
+            date=rows[0][2],
+            fetched_at=min(r[3] for r in rows),
+        )
+
+    def save(self, quote: FxQuote):
+        with self.pool.connection() as conn:
+            try:
+                conn.executemany(
+                    "INSERT INTO fx_rates (base, symbol, rate, as_of, fetched_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(base, symbol) DO UPDATE SET rate = excluded.rate, as_of = excluded.as_of, fetched_at = excluded.fetched_at",
+                    [(quote.base, s, r, quote.date, quote.fetched_at) for s, r in quote.rates.items()],
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
@@ -0,0 +1,109 @@
+"""Conexión/cursor SQLite instrumentados: tiempo y filas por sentencia, y log de consultas lentas.
+
+Se activan pasando `factory=InstrumentedConnection` a `sqlite3.connect` (lo hace el pool
+de la API). Cada sentencia se identifica por su texto normalizado: las consultas usan
+parámetros, así que el número de sentencias distintas es pequeño y acotado.
+
+`execute()` mide hasta la primera fila en un SELECT (SQLite evalúa de forma perezosa);
+el resto de la lectura se suma en `sqlite_query_fetch_seconds_total`.
+"""
+import logging
+import os
+import re
+import sqlite3
+import time
+
+from src.infrastructure.metrics import sql_fetch_seconds, sql_query_duration, sql_rows, sql_slow_queries
+
+logger = logging.getLogger("finanzas.sql")
+
+# Umbral de consulta lenta en segundos; None lo desactiva
+SLOW_QUERY_SECONDS = None
+
+
+def set_slow_query_threshold(ms):
+    """Registra en el log `finanzas.sql` las sentencias que tarden `ms` o más; 0/None lo desactiva."""
+    global SLOW_QUERY_SECONDS
+    SLOW_QUERY_SECONDS = float(ms) / 1000.0 if ms else None
+
+
+set_slow_query_threshold(float(os.environ.get("SLOW_QUERY_MS", "100")))
+
+_WHITESPACE = re.compile(r"\s+")
+_labels_cache = {}
+
+
+def _label(sql: str) -> str:
+    label = _labels_cache.get(sql)
+    if label is None:
+        label = _WHITESPACE.sub(" ", sql).strip()[:160]
+        if len(_labels_cache) < 2048:
+            _labels_cache[sql] = label
+    return label
+
+
+def _record(label, seconds, sql=None):
+    sql_query_duration.observe((label,), seconds)
+    if SLOW_QUERY_SECONDS is not None and seconds >= SLOW_QUERY_SECONDS:
+        sql_slow_queries.inc((label,))
+        logger.warning("Consulta lenta (%.1f ms): %s", seconds * 1000, label)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    _label = None
+
+    def execute(self, sql, parameters=()):
+        self._label = label = _label(sql)
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record(label, time.perf_counter() - t0)
+            if self.rowcount > 0:
+                sql_rows.inc((label,), self.rowcount)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._label = label = _label(sql)
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record(label, time.perf_counter() - t0)
+            if self.rowcount > 0:
+                sql_rows.inc((label,), self.rowcount)
+
+    def _fetched(self, t0, n):
+        if self._label is not None:
+            sql_fetch_seconds.inc((self._label,), time.perf_counter() - t0)
+            if n:
+                sql_rows.inc((self._label,), n)
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(t0, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        t0 = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(t0, len(rows))
+        return rows
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(t0, len(rows))
+        return rows
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute crea su cursor internamente sin pasar por cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,683 @@
+"""Migraciones versionadas del esquema SQLite.
+
+La versión aplicada se guarda en `PRAGMA user_version`. Cada paso de `MIGRATIONS`
+se ejecuta una sola vez, en orden, dentro de una transacción junto con la
+actualización de la versión. Si el esquema ya está al día, `migrate()` sólo lee
+un entero.
+
+Cada paso lleva su propio SQL: un paso publicado describe el esquema de su
+versión y no debe cambiar aunque el esquema actual evolucione. El esquema
+vigente de las estructuras derivadas (rollups, FTS) está en las constantes
+del final del archivo.
+"""
+import sqlite3
+
+
+def _columns(cur, table):
+    cur.execute(f"PRAGMA table_info({table})")
+    return [r[1] for r in cur.fetchall()]
+
+
+def _m001_base_schema(cur):
+    """Tablas base. Las DBs creadas antes del versionado pueden no tener icon/currency/fx_rate."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS movements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            type TEXT NOT NULL CHECK(type IN ('Ingreso','Gasto')),
+            amount REAL NOT NULL,
+            currency TEXT NOT NULL DEFAULT 'COP',
+            fx_rate REAL,
+            category TEXT NOT NULL,
+            description TEXT
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL CHECK(type IN ('Ingreso','Gasto')),
+            name TEXT NOT NULL UNIQUE,
+            icon TEXT
+        )
+    """)
+    if 'icon' not in _columns(cur, 'categories'):
+        cur.execute("ALTER TABLE categories ADD COLUMN icon TEXT")
+    mcols = _columns(cur, 'movements')
+    if 'currency' not in mcols:
+        cur.execute("ALTER TABLE movements ADD COLUMN currency TEXT NOT NULL DEFAULT 'COP'")
+    if 'fx_rate' not in mcols:
+        cur.execute("ALTER TABLE movements ADD COLUMN fx_rate REAL")
+
+
+def _m002_report_indexes(cur):
+    """Índices para los reportes: todos filtran por rango de fechas y tipo y suman amount."""
+    # Cubre los agregados mensual/anual/diario (rango de fechas -> type, amount sin tocar la tabla)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_movements_date_type_amount ON movements(date, type, amount)")
+    # Cubre gastos por categoría: type = 'Gasto' agrupado por categoría y filtrado por fecha
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_movements_type_category_date ON movements(type, category, date, amount)")
+
+
+def _m003_rollups(cur):
+    """Rollups diarios (día x tipo x categoría x moneda) mantenidos por triggers, con backfill."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS movement_rollups (
+            day TEXT NOT NULL,
+            type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            currency TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, type, category, currency)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_movements_rollup_insert AFTER INSERT ON movements
+        BEGIN
+            INSERT INTO movement_rollups (day, type, category, currency, total, count)
+            VALUES (NEW.date, NEW.type, NEW.category, NEW.currency, NEW.amount, 1)
+            ON CONFLICT(day, type, category, currency) DO UPDATE SET total = total + excluded.total, count = count + 1;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_movements_rollup_delete AFTER DELETE ON movements
+        BEGIN
+            UPDATE movement_rollups SET total = total - OLD.amount, count = count - 1
+            WHERE day = OLD.date AND type = OLD.type AND category = OLD.category AND currency = OLD.currency;
+            DELETE FROM movement_rollups
+            WHERE day = OLD.date AND type = OLD.type AND category = OLD.category AND currency = OLD.currency AND count <= 0;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_movements_rollup_update AFTER UPDATE OF date, type, amount, category, currency ON movements
+        BEGIN
+            UPDATE movement_rollups SET total = total - OLD.amount, count = count - 1
+            WHERE day = OLD.date AND type = OLD.type AND category = OLD.category AND currency = OLD.currency;
+            DELETE FROM movement_rollups
+            WHERE day = OLD.date AND type = OLD.type AND category = OLD.category AND currency = OLD.currency AND count <= 0;
+            INSERT INTO movement_rollups (day, type, category, currency, total, count)
+            VALUES (NEW.date, NEW.type, NEW.category, NEW.currency, NEW.amount, 1)
+            ON CONFLICT(day, type, category, currency) DO UPDATE SET total = total + excluded.total, count = count + 1;
+        END
+    """)
+    cur.execute("DELETE FROM movement_rollups")
+    cur.execute("""
+        INSERT INTO movement_rollups (day, type, category, currency, total, count)
+        SELECT date, type, category, currency, SUM(amount), COUNT(*)
+        FROM movements GROUP BY date, type, category, currency
+    """)
+
+
+def _m004_listing_index(cur):
+    """Índice para listar movimientos por (date DESC, id DESC) y paginar por cursor (keyset)."""
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_movements_date_id ON movements(date, id)")
+
+
+def _m005_fulltext_search(cur):
+    """FTS5 sobre description/category, sincronizado por triggers, con backfill."""
+    # Contenido externo (content='movements'): no duplica el texto, sólo guarda el índice invertido.
+    cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS movements_fts USING fts5(
+            description, category,
+            content='movements', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_movements_fts_insert AFTER INSERT ON movements
+        BEGIN
+            INSERT INTO movements_fts (rowid, description, category) VALUES (NEW.id, NEW.description, NEW.category);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_movements_fts_delete AFTER DELETE ON movements
+        BEGIN
+            INSERT INTO movements_fts (movements_fts, rowid, description, category) VALUES ('delete', OLD.id, OLD.description, OLD.category);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_movements_fts_update AFTER UPDATE OF description, category ON movements
+        BEGIN
+            INSERT INTO movements_fts (movements_fts, rowid, description, category) VALUES ('delete', OLD.id, OLD.description, OLD.category);
+            INSERT INTO movements_fts (rowid, description, category) VALUES (NEW.id, NEW.description, NEW.category);
+        END
+    """)
+    cur.execute("INSERT INTO movements_fts (movements_fts) VALUES ('rebuild')")
+
+
+# Rollups por category_id tal como los dejó la migración 6 (congelados).
+_V6_ROLLUPS_SQL = """
+CREATE TABLE IF NOT EXISTS movement_rollups (
+    day TEXT NOT NULL,
+    type TEXT NOT NULL,
+    category_id INTEGER NOT NULL,
+    currency TEXT NOT NULL,
+    total REAL NOT NULL DEFAULT 0,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, type, category_id, currency)
+) WITHOUT ROWID;
+"""
+
+_V6_ROLLUP_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_movements_rollup_insert AFTER INSERT ON movements
+    BEGIN
+        INSERT INTO movement_rollups (day, type, category_id, currency, total, count)
+        VALUES (NEW.date, NEW.type, NEW.category_id, NEW.currency, NEW.amount, 1)
+        ON CONFLICT(day, type, category_id, currency) DO UPDATE SET total = total + excluded.total, count = count + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_movements_rollup_delete AFTER DELETE ON movements
+    BEGIN
+        UPDATE movement_rollups SET total = total - OLD.amount, count = count - 1
+        WHERE day = OLD.date AND type = OLD.type AND category_id = OLD.category_id AND currency = OLD.currency;
+        DELETE FROM movement_rollups
+        WHERE day = OLD.date AND type = OLD.type AND category_id = OLD.category_id AND currency = OLD.currency AND count <= 0;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_movements_rollup_update AFTER UPDATE OF date, type, amount, category_id, currency ON movements
+    BEGIN
+        UPDATE movement_rollups SET total = total - OLD.amount, count = count - 1
+        WHERE day = OLD.date AND type = OLD.type AND category_id = OLD.category_id AND currency = OLD.currency;
+        DELETE FROM movement_rollups
+        WHERE day = OLD.date AND type = OLD.type AND category_id = OLD.category_id AND currency = OLD.currency AND count <= 0;
+        INSERT INTO movement_rollups (day, type, category_id, currency, total, count)
+        VALUES (NEW.date, NEW.type, NEW.category_id, NEW.currency, NEW.amount, 1)
+        ON CONFLICT(day, type, category_id, currency) DO UPDATE SET total = total + excluded.total, count = count + 1;
+    END;
+    """,
+]
+
+_V6_REBUILD_ROLLUPS_SQL = [
+    "DELETE FROM movement_rollups",
+    """
+    INSERT INTO movement_rollups (day, type, category_id, currency, total, count)
+    SELECT date, type, category_id, currency, SUM(amount), COUNT(*)
+    FROM movements GROUP BY date, type, category_id, currency
+    """,
+]
+
+
+def _m006_category_foreign_key(cur):
+    """movements.category (texto) -> movements.category_id (FK a categories.id).
+
+    Crea las categorías que sólo existían como texto en movimientos (con el tipo más
+    usado para ese nombre), reconstruye la tabla sin la columna de texto y rehace
+    índices, rollups y FTS sobre el id.
+    """
+    cur.execute("""
+        INSERT OR IGNORE INTO categories (type, name)
+        SELECT type, category FROM (
+            SELECT category, type, COUNT(*) AS n FROM movements GROUP BY category, type ORDER BY n DESC
+        )
+    """)
+    for name in ("trg_movements_rollup_insert", "trg_movements_rollup_delete", "trg_movements_rollup_update",
+                 "trg_movements_fts_insert", "trg_movements_fts_delete", "trg_movements_fts_update"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {name}")
+    cur.execute("DROP TABLE IF EXISTS movements_fts")
+    cur.execute("DROP TABLE IF EXISTS movement_rollups")
+
+    cur.execute("""
+        CREATE TABLE movements_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            type TEXT NOT NULL CHECK(type IN ('Ingreso','Gasto')),
+            amount REAL NOT NULL,
+            currency TEXT NOT NULL DEFAULT 'COP',
+            fx_rate REAL,
+            category_id INTEGER NOT NULL REFERENCES categories(id),
+            description TEXT
+        )
+    """)
+    cur.execute("""
+        INSERT INTO movements_new (id, date, type, amount, currency, fx_rate, category_id, description)
+        SELECT m.id, m.date, m.type, m.amount, m.currency, m.fx_rate, c.id, m.description
+        FROM movements m JOIN categories c ON c.name = m.category
+    """)
+    cur.execute("SELECT seq FROM sqlite_sequence WHERE name = 'movements'")
+    seq = cur.fetchone()
+    cur.execute("DROP TABLE movements")
+    cur.execute("ALTER TABLE movements_new RENAME TO movements")
+    if seq:
+        # Conserva el máximo histórico de AUTOINCREMENT: los ids borrados no se reutilizan
+        cur.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'movements'", (seq[0],))
+        if cur.rowcount == 0:
+            cur.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('movements', ?)", seq)
+    # idx_movements_type_category_date (paso 2) no se rehace a propósito: los gastos por
+    # categoría se leen de movement_rollups, que ya los busca por su clave (day, type, ...).
+    cur.execute("CREATE INDEX idx_movements_date_type_amount ON movements(date, type, amount)")
+    cur.execute("CREATE INDEX idx_movements_date_id ON movements(date, id)")
+    cur.execute("CREATE INDEX idx_movements_category_id ON movements(category_id)")
+
+    cur.execute(_V6_ROLLUPS_SQL)
+    for sql in _V6_ROLLUP_TRIGGERS_SQL:
+        cur.execute(sql)
+    for sql in _V6_REBUILD_ROLLUPS_SQL:
+        cur.execute(sql)
+
+    cur.execute(CREATE_SEARCH_VIEW_SQL)
+    cur.execute(CREATE_FTS_SQL)
+    for sql in FTS_TRIGGERS_SQL:
+        cur.execute(sql)
+    cur.execute("INSERT INTO movements_fts (movements_fts) VALUES ('rebuild')")
+
+
+def _m007_fx_rates(cur):
+    """Última tasa conocida por par de monedas: sobrevive a reinicios y sirve de respaldo
+    cuando el proveedor externo no responde."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS fx_rates (
+            base TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            rate REAL NOT NULL,
+            as_of TEXT,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (base, symbol)
+        ) WITHOUT ROWID
+    """)
+
+
+def _m008_amount_base(cur):
+    """Monto convertido a la moneda base (COP) precalculado por movimiento, y su suma en los
+    rollups, para que los reportes no mezclen monedas ni conviertan en cada consulta."""
+    if "amount_base" not in _columns(cur, "movements"):
+        cur.execute("ALTER TABLE movements ADD COLUMN amount_base REAL NOT NULL DEFAULT 0")
+    # Misma regla que Movement.amount_base: fx_rate son unidades de COP por unidad de `currency`
+    cur.execute("""
+        UPDATE movements SET amount_base = CASE
+            WHEN currency = 'COP' OR fx_rate IS NULL THEN amount
+            ELSE amount * fx_rate
+        END
+    """)
+    for name in ("trg_movements_rollup_insert", "trg_movements_rollup_delete", "trg_movements_rollup_update"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {name}")
+    if "total_base" not in _columns(cur, "movement_rollups"):
+        cur.execute("ALTER TABLE movement_rollups ADD COLUMN total_base REAL NOT NULL DEFAULT 0")
+    for sql in ROLLUP_TRIGGERS_SQL:
+        cur.execute(sql)
+    rebuild_rollups(cur)
+
+
+def _m009_data_version(cur):
+    """Contador que se incrementa en cada escritura (movimientos, categorías, importaciones).
+    Las cachés de reportes de todos los procesos que comparten el archivo lo usan para
+    saber si sus resultados siguen vigentes."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    cur.execute("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)")
+
+
+def _m010_rewrite_counter(cur):
+    """`data_version.rewrites` cuenta las modificaciones y borrados de movimientos (no las
+    inserciones). Quien mantenga una copia de los movimientos (ver `analytics/columnar.py`)
+    puede añadir sólo las filas nuevas mientras este contador no cambie."""
+    if "rewrites" not in _columns(cur, "data_version"):
+        cur.execute("ALTER TABLE data_version ADD COLUMN rewrites INTEGER NOT NULL DEFAULT 0")
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_movements_rewrite_update
+        AFTER UPDATE OF date, type, category_id, amount_base ON movements
+        BEGIN
+            UPDATE data_version SET rewrites = rewrites + 1 WHERE id = 1;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_movements_rewrite_delete AFTER DELETE ON movements
+        BEGIN
+            UPDATE data_version SET rewrites = rewrites + 1 WHERE id = 1;
+        END
+    """)
+
+
+def _m011_category_version(cur):
+    """`data_version.categories` cambia con cada alta, modificación o baja de categorías
+    (también las que crea una importación). Las cachés de categorías se invalidan con él
+    sin depender de las escrituras de movimientos."""
+    if "categories" not in _columns(cur, "data_version"):
+        cur.execute("ALTER TABLE data_version ADD COLUMN categories INTEGER NOT NULL DEFAULT 0")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_categories_version_{event.lower()} AFTER {event} ON categories
+            BEGIN
+                UPDATE data_version SET categories = categories + 1 WHERE id = 1;
+            END
+        """)
+
+
+def _m012_archived_years(cur):
+    """Catálogo de años archivados. Los movimientos de cada año cerrado pueden vivir en su
+    propio archivo SQLite (`path`, relativo al directorio de la DB principal); sus rollups
+    se quedan en `movement_rollups` como resumen congelado del año."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS archived_years (
+            year TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            archived_at TEXT NOT NULL
+        )
+    """)
+
+
+def _m013_balance_ledger(cur):
+    """Saldo acumulado por día (`balance_ledger`) para consultar el saldo a una fecha con
+    una búsqueda en el índice. Los triggers de `movement_rollups` anotan en
+    `data_version.ledger_from` el primer día cambiado y el adaptador rehace el ledger
+    desde ese día en la misma transacción de la escritura."""
+    if "ledger_from" not in _columns(cur, "data_version"):
+        cur.execute("ALTER TABLE data_version ADD COLUMN ledger_from TEXT")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS balance_ledger (
+            day TEXT PRIMARY KEY,
+            net REAL NOT NULL,
+            balance REAL NOT NULL
+        ) WITHOUT ROWID
+    """)
+    for sql in LEDGER_TRIGGERS_SQL:
+        cur.execute(sql)
+    cur.execute("DELETE FROM balance_ledger")
+    cur.execute("UPDATE data_version SET ledger_from = (SELECT MIN(day) FROM movement_rollups) WHERE id = 1")
+    refresh_ledger(cur)
+
+
+def _m014_idempotency_key(cur):
+    """Clave de idempotencia opcional que el cliente envía con cada movimiento. El índice
+    único (sólo sobre las filas que la tienen) hace que un reintento devuelva el movimiento
+    ya guardado en lugar de duplicarlo."""
+    if "idempotency_key" not in _columns(cur, "movements"):
+        cur.execute("ALTER TABLE movements ADD COLUMN idempotency_key TEXT")
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_movements_idempotency_key
+        ON movements(idempotency_key) WHERE idempotency_key IS NOT NULL
+    """)
+
+
+def _m015_archive_version(cur):
+    """`data_version.archives` cambia con cada alta o baja en `archived_years`. Cada conexión
+    recuerda la versión con la que adjuntó los archivos y sólo vuelve a sincronizarlos
+    cuando cambia."""
+    if "archives" not in _columns(cur, "data_version"):
+        cur.execute("ALTER TABLE data_version ADD COLUMN archives INTEGER NOT NULL DEFAULT 0")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_archived_years_version_{event.lower()} AFTER {event} ON archived_years
+            BEGIN
+                UPDATE data_version SET archives = archives + 1 WHERE id = 1;
+            END
+        """)
+
+
+def _m016_fx_missing(cur):
+    """Movimientos en otra moneda guardados sin `fx_rate` (antes de que fuera obligatoria): la
+    migración 8 les dio `amount_base = amount`, como si fueran COP. Se anotan en `fx_missing`
+    y su `amount_base` pasa a 0, fuera de los totales en moneda base, hasta que se les asigne
+    una tasa (`set_fx_rate`, `finance fx-missing`). No hay tasa histórica con qué convertirlos."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS fx_missing (
+            movement_id INTEGER PRIMARY KEY,
+            currency TEXT NOT NULL
+        )
+    """)
+    cur.execute(f"INSERT OR IGNORE INTO fx_missing (movement_id, currency) {FX_MISSING_SELECT_SQL.format(schema='main')}")
+    # Los triggers descuentan los rollups y marcan el ledger desde el primer día afectado
+    cur.execute("UPDATE movements SET amount_base = 0 WHERE id IN (SELECT movement_id FROM fx_missing) AND amount_base <> 0")
+    if cur.rowcount:
+        refresh_ledger(cur)
+        cur.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+
+
+def _m017_deferred_fts(cur):
+    """`data_version.fts_deferred` = 1 apaga el trigger FTS de inserción: `save_many` lo pone
+    dentro de su transacción (ninguna otra conexión lo ve) e indexa las filas nuevas con un
+    solo INSERT ... SELECT al final, en lugar de una inserción en el índice por fila."""
+    if "fts_deferred" not in _columns(cur, "data_version"):
+        cur.execute("ALTER TABLE data_version ADD COLUMN fts_deferred INTEGER NOT NULL DEFAULT 0")
+    cur.execute("DROP TRIGGER IF EXISTS trg_movements_fts_insert")
+    cur.execute(FTS_INSERT_TRIGGER_SQL)
+
+
+# Movimientos en otra moneda sin tasa en `{schema}` (filas anteriores a la migración 16)
+FX_MISSING_SELECT_SQL = "SELECT id, upper(currency) FROM {schema}.movements WHERE upper(currency) <> 'COP' AND fx_rate IS NULL"
+
+
+# ---------------------------------------------------------------------------
+# Esquema vigente de las estructuras derivadas (rollups y búsqueda)
+# ---------------------------------------------------------------------------
+
+# Los triggers mantienen los rollups dentro de la misma transacción que la escritura
+# del movimiento (save, importaciones, updates y deletes). `total` suma el monto en su
+# moneda original; `total_base`, el monto en moneda base que usan los reportes.
+ROLLUP_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_movements_rollup_insert AFTER INSERT ON movements
+    BEGIN
+        INSERT INTO movement_rollups (day, type, category_id, currency, total, count, total_base)
+        VALUES (NEW.date, NEW.type, NEW.category_id, NEW.currency, NEW.amount, 1, NEW.amount_base)
+        ON CONFLICT(day, type, category_id, currency) DO UPDATE SET
+            total = total + excluded.total, count = count + 1, total_base = total_base + excluded.total_base;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_movements_rollup_delete AFTER DELETE ON movements
+    BEGIN
+        UPDATE movement_rollups SET total = total - OLD.amount, count = count - 1, total_base = total_base - OLD.amount_base
+        WHERE day = OLD.date AND type = OLD.type AND category_id = OLD.category_id AND currency = OLD.currency;
+        DELETE FROM movement_rollups
+        WHERE day = OLD.date AND type = OLD.type AND category_id = OLD.category_id AND currency = OLD.currency AND count <= 0;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_movements_rollup_update
+    AFTER UPDATE OF date, type, amount, amount_base, category_id, currency ON movements
+    BEGIN
+        UPDATE movement_rollups SET total = total - OLD.amount, count = count - 1, total_base = total_base - OLD.amount_base
+        WHERE day = OLD.date AND type = OLD.type AND category_id = OLD.category_id AND currency = OLD.currency;
+        DELETE FROM movement_rollups
+        WHERE day = OLD.date AND type = OLD.type AND category_id = OLD.category_id AND currency = OLD.currency AND count <= 0;
+        INSERT INTO movement_rollups (day, type, category_id, currency, total, count, total_base)
+        VALUES (NEW.date, NEW.type, NEW.category_id, NEW.currency, NEW.amount, 1, NEW.amount_base)
+        ON CONFLICT(day, type, category_id, currency) DO UPDATE SET
+            total = total + excluded.total, count = count + 1, total_base = total_base + excluded.total_base;
+    END;
+    """,
+]
+
+REBUILD_ROLLUPS_SQL = [
+    "DELETE FROM movement_rollups",
+    """
+    INSERT INTO movement_rollups (day, type, category_id, currency, total, count, total_base)
+    SELECT date, type, category_id, currency, SUM(amount), COUNT(*), SUM(amount_base)
+    FROM movements GROUP BY date, type, category_id, currency
+    """,
+]
+
+REBUILD_ROLLUPS_RANGE_SQL = [
+    "DELETE FROM movement_rollups WHERE day >= ? AND day < ?",
+    """
+    INSERT INTO movement_rollups (day, type, category_id, currency, total, count, total_base)
+    SELECT date, type, category_id, currency, SUM(amount), COUNT(*), SUM(amount_base)
+    FROM movements WHERE date >= ? AND date < ? GROUP BY date, type, category_id, currency
+    """,
+]
+
+
+def rebuild_rollups(cur, date_from: str = None, date_to: str = None):
+    """Recalcula `movement_rollups` a partir de `movements`: entera, o sólo los días
+    en [date_from, date_to) si se da el rango."""
+    if date_from is None:
+        for sql in REBUILD_ROLLUPS_SQL:
+            cur.execute(sql)
+        return
+    for sql in REBUILD_ROLLUPS_RANGE_SQL:
+        cur.execute(sql, (date_from, date_to))
+
+
+# `balance_ledger` guarda por día el neto (ingresos - gastos en moneda base) y el saldo
+# acumulado de todo el historial hasta ese día. Cualquier cambio en los rollups (escrituras,
+# rebuild, archivo de años) baja `ledger_from` al día tocado; `refresh_ledger` rehace
+# desde ahí partiendo del saldo del día anterior. Una inserción con la fecha más reciente
+# sólo recalcula ese día; una fuera de orden, los días posteriores.
+LEDGER_TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_rollups_ledger_{name} AFTER {event} ON movement_rollups
+    BEGIN
+        UPDATE data_version SET ledger_from = {row}.day
+        WHERE id = 1 AND (ledger_from IS NULL OR ledger_from > {row}.day);
+    END;
+    """
+    for name, event, row in (("insert", "INSERT", "NEW"), ("update", "UPDATE OF total_base", "NEW"), ("delete", "DELETE", "OLD"))
+]
+
+REFRESH_LEDGER_SQL = [
+    "DELETE FROM balance_ledger WHERE day >= :day",
+    """
+    INSERT INTO balance_ledger (day, net, balance)
+    SELECT day, net, SUM(net) OVER (ORDER BY day) + COALESCE(
+        (SELECT balance FROM balance_ledger WHERE day < :day ORDER BY day DESC LIMIT 1), 0)
+    FROM (
+        SELECT day, SUM(CASE type WHEN 'Ingreso' THEN total_base ELSE -total_base END) AS net
+        FROM movement_rollups WHERE day >= :day GROUP BY day
+    )
+    """,
+]
+
+
+def refresh_ledger(cur) -> bool:
+    """Pone `balance_ledger` al día desde `data_version.ledger_from`; sin cambios pendientes
+    no hace nada. Devuelve True si hubo que recalcular."""
+    cur.execute("SELECT ledger_from FROM data_version WHERE id = 1")
+    day = cur.fetchone()[0]
+    if day is None:
+        return False
+    for sql in REFRESH_LEDGER_SQL:
+        cur.execute(sql, {"day": day})
+    cur.execute("UPDATE data_version SET ledger_from = NULL WHERE id = 1")
+    return True
+
+
+# El índice FTS lee su contenido de esta vista (el nombre de la categoría vive en
+# categories), así no se duplica el texto de los movimientos.
+CREATE_SEARCH_VIEW_SQL = """
+CREATE VIEW IF NOT EXISTS movements_search AS
+SELECT m.id AS id, m.description AS description, c.name AS category
+FROM movements m JOIN categories c ON c.id = m.category_id;
+"""
+
+CREATE_FTS_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS movements_fts USING fts5(
+    description, category,
+    content='movements_search', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+FTS_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_movements_fts_insert AFTER INSERT ON movements
+    BEGIN
+        INSERT INTO movements_fts (rowid, description, category)
+        VALUES (NEW.id, NEW.description, (SELECT name FROM categories WHERE id = NEW.category_id));
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_movements_fts_delete AFTER DELETE ON movements
+    BEGIN
+        INSERT INTO movements_fts (movements_fts, rowid, description, category)
+        VALUES ('delete', OLD.id, OLD.description, (SELECT name FROM categories WHERE id = OLD.category_id));
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_movements_fts_update AFTER UPDATE OF description, category_id ON movements
+    BEGIN
+        INSERT INTO movements_fts (movements_fts, rowid, description, category)
+        VALUES ('delete', OLD.id, OLD.description, (SELECT name FROM categories WHERE id = OLD.category_id));
+        INSERT INTO movements_fts (rowid, description, category)
+        VALUES (NEW.id, NEW.description, (SELECT name FROM categories WHERE id = NEW.category_id));
+    END;
+    """,
+    # Renombrar una categoría reindexa sus movimientos con el nombre nuevo
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_categories_fts_rename AFTER UPDATE OF name ON categories
+    BEGIN
+        INSERT INTO movements_fts (movements_fts, rowid, description, category)
+        SELECT 'delete', id, description, OLD.name FROM movements WHERE category_id = NEW.id;
+        INSERT INTO movements_fts (rowid, description, category)
+        SELECT id, description, NEW.name FROM movements WHERE category_id = NEW.id;
+    END;
+    """,
+]
+
+# Trigger de inserción vigente (migración 17): no indexa mientras `fts_deferred` = 1
+FTS_INSERT_TRIGGER_SQL = """
+CREATE TRIGGER IF NOT EXISTS trg_movements_fts_insert AFTER INSERT ON movements
+WHEN (SELECT fts_deferred FROM data_version WHERE id = 1) = 0
+BEGIN
+    INSERT INTO movements_fts (rowid, description, category)
+    VALUES (NEW.id, NEW.description, (SELECT name FROM categories WHERE id = NEW.category_id));
+END;
+"""
+
+# Indexa de una vez las filas insertadas con el trigger apagado (id > ?)
+FTS_INDEX_NEW_ROWS_SQL = """
+INSERT INTO movements_fts (rowid, description, category)
+SELECT m.id, m.description, c.name FROM movements m JOIN categories c ON c.id = m.category_id
+WHERE m.id > ? ORDER BY m.id
+"""
+
+
+# (versión, paso) en orden estrictamente creciente. Nunca modificar un paso ya publicado:
+# añadir uno nuevo al final.
+MIGRATIONS = [
+    (1, _m001_base_schema),
+    (2, _m002_report_indexes),
+    (3, _m003_rollups),
+    (4, _m004_listing_index),
+    (5, _m005_fulltext_search),
+    (6, _m006_category_foreign_key),
+    (7, _m007_fx_rates),
+    (8, _m008_amount_base),
+    (9, _m009_data_version),
+    (10, _m010_rewrite_counter),
+    (11, _m011_category_version),
+    (12, _m012_archived_years),
+    (13, _m013_balance_ledger),
+    (14, _m014_idempotency_key),
+    (15, _m015_archive_version),
+    (16, _m016_fx_missing),
+    (17, _m017_deferred_fts),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, target: int = LATEST_VERSION):
+    """Aplica las migraciones pendientes hasta `target` y devuelve las versiones aplicadas."""
+    if get_schema_version(conn) >= target:
+        return []
+    applied = []
+    cur = conn.cursor()
+    # BEGIN IMMEDIATE toma el lock de escritura: si otro proceso migra a la vez,
+    # esperamos y releemos la versión en lugar de aplicar los pasos dos veces.
+    if conn.in_transaction:
+        conn.commit()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        version = get_schema_version(conn)
+        for step_version, step in MIGRATIONS:
+            if step_version <= version or step_version > target:
+                continue
+            step(cur)
+            cur.execute(f"PRAGMA user_version = {int(step_version)}")
+            applied.append(step_version)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return applied
@@ -1,134 +1,504 @@
+import json
+import logging
+import math
+import os
+import re
 import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date
 from pathlib import Path
 from typing import Optional
 
+from src.core.domain.exceptions import CategoryInUseError, InvalidFxRateError
 from src.core.ports.repository import MovementRepositoryInterface
+from src.infrastructure.database.connection_pool import ConnectionPool
+from src.infrastructure.database.instrumentation import InstrumentedConnection
+from src.infrastructure.database.migrations import (FTS_INDEX_NEW_ROWS_SQL, FX_MISSING_SELECT_SQL, migrate, rebuild_rollups,
+                                                   refresh_ledger)
+from src.infrastructure.database.pragmas import apply_profile
+from src.infrastructure.metrics import pool_acquire_duration, pool_connections, registry
 
 DB_FILENAME = Path.cwd() / "finance_app.db"
 
-CREATE_TABLE_SQL = """
-CREATE TABLE IF NOT EXISTS movements (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    date TEXT NOT NULL,
-    type TEXT NOT NULL CHECK(type IN ('Ingreso','Gasto')),
-    amount REAL NOT NULL,
-    currency TEXT NOT NULL DEFAULT 'COP',
-    fx_rate REAL,
-    category TEXT NOT NULL,
-    description TEXT
-);
-"""
-
-CREATE_CATEGORIES_SQL = """
-CREATE TABLE IF NOT EXISTS categories (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    type TEXT NOT NULL CHECK(type IN ('Ingreso','Gasto')),
-    name TEXT NOT NULL UNIQUE,
-    icon TEXT
-);
-"""
+# Tamaño y expiración por defecto del pool de conexiones por proceso
+POOL_MAX_SIZE = 5
+POOL_IDLE_TIMEOUT = 300.0
+
+# Cada año archivado se adjunta a las conexiones con el esquema `archive_<año>`
+ARCHIVE_SCHEMA_PREFIX = "archive_"
+MOVEMENT_COLUMNS = "id, date, type, amount, currency, fx_rate, category_id, description, amount_base, idempotency_key"
+
+# Esquema de un archivo de año: los movimientos con sus ids originales y el resumen
+# congelado (rollups) del año, que también queda en la DB principal.
+ARCHIVE_SCHEMA_SQL = [
+    """
+    CREATE TABLE {schema}.movements (
+        id INTEGER PRIMARY KEY,
+        date TEXT NOT NULL,
+        type TEXT NOT NULL,
+        amount REAL NOT NULL,
+        currency TEXT NOT NULL,
+        fx_rate REAL,
+        category_id INTEGER NOT NULL,
+        description TEXT,
+        amount_base REAL NOT NULL,
+        idempotency_key TEXT
+    )
+    """,
+    "CREATE INDEX {schema}.idx_movements_date_id ON movements(date, id)",
+    "CREATE UNIQUE INDEX {schema}.idx_movements_idempotency_key ON movements(idempotency_key) WHERE idempotency_key IS NOT NULL",
+    """
+    CREATE TABLE {schema}.movement_rollups (
+        day TEXT NOT NULL,
+        type TEXT NOT NULL,
+        category_id INTEGER NOT NULL,
+        currency TEXT NOT NULL,
+        total REAL NOT NULL,
+        count INTEGER NOT NULL,
+        total_base REAL NOT NULL,
+        PRIMARY KEY (day, type, category_id, currency)
+    ) WITHOUT ROWID
+    """,
+]
+
+logger = logging.getLogger("finanzas.archive")
+
+
+def _month_range(month: str, year: str):
+    """Rango semiabierto [inicio, fin) de fechas 'YYYY-MM-DD' para el mes dado.
+
+    Comparar `date` contra un rango (en lugar de strftime por fila) permite usar los índices.
+    """
+    y, m = int(year), int(month)
+    start = f"{y:04d}-{m:02d}-01"
+    end = f"{y + 1:04d}-01-01" if m == 12 else f"{y:04d}-{m + 1:02d}-01"
+    return start, end
+
+
+def _year_range(year: str):
+    y = int(year)
+    return f"{y:04d}-01-01", f"{y + 1:04d}-01-01"
+
+
+def _fts_query(text: str):
+    """Traduce texto libre a una consulta FTS5 segura: cada palabra como prefijo, todas requeridas.
+
+    Las comillas evitan que el usuario inyecte operadores de FTS (AND, NEAR, column:...).
+    """
+    tokens = re.findall(r"\w+", text or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def init_schema(conn: sqlite3.Connection):
+    """Deja el esquema de `conn` en la última versión (ver `migrations.py`)."""
+    migrate(conn)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _observe_acquire(seconds: float):
+    pool_acquire_duration.observe((), seconds)
+
+
+def _collect_pool_stats():
+    # Estado de los pools de este proceso, leído al exportar /metrics
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [(path, name, pool) for (owner, path, name), pool in _pools.items() if owner == pid and not pool.closed]
+    for path, name, pool in pools:
+        stats = pool.stats()
+        for state in ("open", "idle", "in_use"):
+            pool_connections.set((Path(path).name, name, state), stats[state])
+
+
+registry.add_collector(_collect_pool_stats)
+
+
+def get_pool(db_path: Optional[Path] = None, name: str = "main", max_size: int = POOL_MAX_SIZE) -> ConnectionPool:
+    """Devuelve el pool de conexiones `name` de este proceso para `db_path`.
+
+    El esquema se inicializa una sola vez, al abrir la primera conexión del pool.
+    La clave incluye el pid para que un proceso hijo (fork de gunicorn) nunca
+    reutilice conexiones heredadas del padre. Un pool con otro `name` (p. ej. las
+    lecturas paralelas de reportes) no compite por conexiones con el principal.
+    `max_size` sólo se usa al crear el pool.
+    """
+    path = Path(db_path) if db_path else DB_FILENAME
+    key = (os.getpid(), str(path.resolve()), name)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            pool = ConnectionPool(path, max_size=max_size, idle_timeout=POOL_IDLE_TIMEOUT, initializer=init_schema,
+                                  on_connect=apply_profile, factory=InstrumentedConnection, on_acquire=_observe_acquire)
+            _pools[key] = pool
+        return pool
 
 
 class SQLiteMovementRepository(MovementRepositoryInterface):
-    def __init__(self, db_path: Optional[Path] = None):
-        self.db_path = Path(db_path) if db_path else DB_FILENAME
-        self.conn = sqlite3.connect(str(self.db_path))
-        self._init_db()
+    def __init__(self, db_path: Optional[Path] = None, pool: Optional[ConnectionPool] = None):
+        """Con `pool`, toma prestada una conexión (ya inicializada) que `close()` devuelve.
+        Sin `pool`, abre una conexión propia sobre `db_path` e inicializa el esquema.
+        """
+        self._pool = pool
+        if pool is not None:
+            self.db_path = pool.db_path
+            self.conn = pool.acquire()
+        else:
+            self.db_path = Path(db_path) if db_path else DB_FILENAME
+            self.conn = sqlite3.connect(str(self.db_path))
+            apply_profile(self.conn)
+            self._init_db()
+        self._sync_archives()
 
     def _init_db(self):
+        init_schema(self.conn)
+
+    def _archive_path(self, year: str) -> Path:
+        return self.db_path.with_name(f"{self.db_path.stem}.{year}.db")
+
+    def _archive_state(self) -> dict:
+        # Estado de los archivos adjuntos a la conexión: vive en la propia conexión (las del
+        # pool tienen __dict__) para que lo compartan todos los repositorios que la usen.
+        try:
+            return vars(self.conn).setdefault("archive_state", {})
+        except TypeError:
+            # sqlite3.Connection sin atributos: la conexión propia sólo la usa este repositorio
+            return self.__dict__.setdefault("_own_archive_state", {})
+
+    def _sync_archives(self):
+        """Adjunta a la conexión los años del catálogo `archived_years` (y suelta los ya
+        restaurados) y deja en la vista temporal `movements_all` la unión de todas las
+        particiones. Sólo rehace algo si `data_version.archives` cambió desde la última vez
+        en esta conexión; si no, cuesta una lectura.
+        """
+        cur = self.conn.cursor()
+        cur.execute("SELECT archives FROM data_version WHERE id = 1")
+        version = cur.fetchone()[0]
+        state = self._archive_state()
+        if state.get("version") == version:
+            self._archived_years = state["years"]
+            return
+        cur.execute("SELECT year, path FROM archived_years ORDER BY year")
+        catalog = dict(cur.fetchall())
+        cur.execute("PRAGMA database_list")
+        attached = {name[len(ARCHIVE_SCHEMA_PREFIX):] for _, name, _ in cur.fetchall()
+                    if name.startswith(ARCHIVE_SCHEMA_PREFIX)}
+        for year in attached - set(catalog):
+            cur.execute(f"DETACH DATABASE {ARCHIVE_SCHEMA_PREFIX}{year}")
+        for year in sorted(set(catalog) - attached):
+            path = self.db_path.parent / catalog[year]
+            if not path.exists():
+                # ATTACH crearía un archivo vacío: mejor dejar el año sin movimientos visibles
+                logger.warning("Falta el archivo %s del año archivado %s", path, year)
+                del catalog[year]
+                continue
+            schema = f"{ARCHIVE_SCHEMA_PREFIX}{year}"
+            cur.execute(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+            cur.execute(f"PRAGMA {schema}.table_info(movements)")
+            if "idempotency_key" not in [r[1] for r in cur.fetchall()]:
+                # Archivo escrito antes de guardar las claves de idempotencia
+                cur.execute(f"ALTER TABLE {schema}.movements ADD COLUMN idempotency_key TEXT")
+                cur.execute(ARCHIVE_SCHEMA_SQL[2].format(schema=schema))
+        self._archived_years = sorted(catalog)
+        selects = [f"SELECT {MOVEMENT_COLUMNS} FROM main.movements"]
+        selects += [f"SELECT {MOVEMENT_COLUMNS} FROM {ARCHIVE_SCHEMA_PREFIX}{y}.movements" for y in self._archived_years]
+        cur.execute("DROP VIEW IF EXISTS temp.movements_all")
+        cur.execute("CREATE TEMP VIEW movements_all AS " + " UNION ALL ".join(selects))
+        state.update(version=version, years=self._archived_years)
+
+    def _movements_source(self, date_from: str = None, date_to: str = None) -> str:
+        """Tabla (con alias m) de la que leer movimientos con fecha en [date_from, date_to]:
+        `movements` si ningún año archivado toca el rango; si no, la unión de `movements`
+        con sólo esos años."""
+        years = [y for y in self._archived_years
+                 if (not date_from or y >= date_from[:4]) and (not date_to or y <= date_to[:4])]
+        if not years:
+            return "movements m"
+        selects = [f"SELECT {MOVEMENT_COLUMNS} FROM main.movements"]
+        selects += [f"SELECT {MOVEMENT_COLUMNS} FROM {ARCHIVE_SCHEMA_PREFIX}{y}.movements" for y in years]
+        return "(" + " UNION ALL ".join(selects) + ") m"
+
+    def _category_id(self, cur, name: str, type: str, cache=None):
+        """Id de la categoría `name`; si no existe se crea con el tipo del movimiento."""
+        if cache is not None and name in cache:
+            return cache[name]
+        cur.execute("SELECT id FROM categories WHERE name = ?", (name,))
+        r = cur.fetchone()
+        if r:
+            cid = r[0]
+        else:
+            cur.execute("INSERT INTO categories (type, name) VALUES (?, ?)", (type, name))
+            cid = cur.lastrowid
+        if cache is not None:
+            cache[name] = cid
+        return cid
+
+    def _bump_data_version(self, cur):
+        # Dentro de la transacción de la escritura: quien lea la versión nueva ve también los datos
+        # (incluido el saldo acumulado, que se pone al día aquí mismo)
+        refresh_ledger(cur)
+        cur.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+
+    def get_data_version(self) -> int:
         cur = self.conn.cursor()
-        cur.execute(CREATE_TABLE_SQL)
-        cur.execute(CREATE_CATEGORIES_SQL)
-        # Ensure icon column exists for older DBs (simple migration)
+        cur.execute("SELECT version FROM data_version WHERE id = 1")
+        return cur.fetchone()[0]
+
+    def get_category_version(self) -> int:
+        cur = self.conn.cursor()
+        cur.execute("SELECT categories FROM data_version WHERE id = 1")
+        return cur.fetchone()[0]
+
+    def save(self, movement):
+        return self.save_all([movement])[0][0]
+
+    def save_all(self, movements):
+        """Inserta una lista de Movement en una sola transacción (un solo commit) y devuelve,
+        en el mismo orden, (id, creado).
+
+        Una `idempotency_key` ya guardada (un reintento del cliente, o repetida dentro del
+        mismo lote) no inserta nada: devuelve el id existente con creado=False. La clave se
+        busca en todas las particiones (`movements_all`, también los años archivados) con el
+        índice único de cada una, y el lock de escritura se toma al empezar, así que dos
+        reintentos simultáneos no pueden insertar ambos.
+        """
+        sql = ("INSERT INTO movements (date, type, amount, currency, fx_rate, category_id, description, amount_base, idempotency_key) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+        cur = self.conn.cursor()
+        results = []
+        category_ids = {}
         try:
-            cur.execute("PRAGMA table_info(categories)")
-            cols = [r[1] for r in cur.fetchall()]
-            if 'icon' not in cols:
-                cur.execute("ALTER TABLE categories ADD COLUMN icon TEXT")
+            cur.execute("BEGIN IMMEDIATE")
+            for m in movements:
+                if m.idempotency_key is not None:
+                    cur.execute("SELECT id FROM movements_all WHERE idempotency_key = ?", (m.idempotency_key,))
+                    r = cur.fetchone()
+                    if r:
+                        results.append((r[0], False))
+                        continue
+                category_id = self._category_id(cur, m.category, m.type, category_ids)
+                cur.execute(sql, (m.date, m.type, m.amount, m.currency, m.fx_rate, category_id, m.description, m.amount_base,
+                                  m.idempotency_key))
+                results.append((cur.lastrowid, True))
+            if any(created for _, created in results):
+                self._bump_data_version(cur)
+            self.conn.commit()
         except Exception:
-            pass
-        # Ensure movements table has currency and fx_rate columns for older DBs
+            self.conn.rollback()
+            raise
+        return results
+
+    def save_many(self, movements, batch_size: int = 5000):
+        """Inserta un iterable de Movement con executemany por lotes, todo en una transacción.
+
+        El iterable se consume en streaming; devuelve el número de filas insertadas. El índice
+        de búsqueda no se actualiza fila a fila (`fts_deferred`): las filas nuevas se indexan
+        con una sola consulta antes del commit.
+        """
+        sql = "INSERT INTO movements (date, type, amount, currency, fx_rate, category_id, description, amount_base) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        cur = self.conn.cursor()
+        inserted = 0
+        batch = []
+        category_ids = {}
         try:
-            cur.execute("PRAGMA table_info(movements)")
-            mcols = [r[1] for r in cur.fetchall()]
-            if 'currency' not in mcols:
-                cur.execute("ALTER TABLE movements ADD COLUMN currency TEXT NOT NULL DEFAULT 'COP'")
-            if 'fx_rate' not in mcols:
-                cur.execute("ALTER TABLE movements ADD COLUMN fx_rate REAL")
+            cur.execute("BEGIN IMMEDIATE")
+            # Con el lock de escritura tomado, las filas de esta importación son las de id mayor
+            cur.execute("SELECT COALESCE(MAX(id), 0) FROM movements")
+            last_id = cur.fetchone()[0]
+            cur.execute("UPDATE data_version SET fts_deferred = 1 WHERE id = 1")
+            for m in movements:
+                category_id = self._category_id(cur, m.category, m.type, category_ids)
+                batch.append((m.date, m.type, m.amount, m.currency, m.fx_rate, category_id, m.description, m.amount_base))
+                if len(batch) >= batch_size:
+                    cur.executemany(sql, batch)
+                    inserted += len(batch)
+                    batch = []
+            if batch:
+                cur.executemany(sql, batch)
+                inserted += len(batch)
+            if inserted:
+                cur.execute(FTS_INDEX_NEW_ROWS_SQL, (last_id,))
+            cur.execute("UPDATE data_version SET fts_deferred = 0 WHERE id = 1")
+            if inserted:
+                self._bump_data_version(cur)
+            self.conn.commit()
         except Exception:
-            pass
-        self.conn.commit()
+            self.conn.rollback()
+            raise
+        return inserted
 
-    def save(self, movement):
-        cur = self.conn.cursor()
-        cur.execute(
-            "INSERT INTO movements (date, type, amount, currency, fx_rate, category, description) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (movement.date, movement.type, movement.amount, movement.currency, movement.fx_rate, movement.category, movement.description),
-        )
-        self.conn.commit()
-        return cur.lastrowid
+    def find_by_criteria(self, date_from=None, date_to=None, category=None, after=None, limit=None, q=None):
+        return list(self.iter_by_criteria(date_from=date_from, date_to=date_to, category=category, after=after, limit=limit, q=q))
 
-    def find_by_criteria(self, date_from=None, date_to=None, category=None):
-        cur = self.conn.cursor()
-        sql = "SELECT id, date, type, amount, currency, fx_rate, category, description FROM movements WHERE 1=1"
+    def _criteria_query(self, columns: str, date_from=None, date_to=None, category=None, after=None, limit=None, q=None):
+        """(sql, params) del listado filtrado, o None si `q` no tiene palabras buscables.
+        `columns` puede usar los alias m (movements), c (categories) y, con `q`, f (FTS)."""
         params = []
+        if q:
+            match = _fts_query(q)
+            if match is None:
+                return None
+            sql = (
+                f"SELECT {columns} FROM movements_fts f JOIN movements m ON m.id = f.rowid "
+                "JOIN categories c ON c.id = m.category_id WHERE movements_fts MATCH ?"
+            )
+            params.append(match)
+        else:
+            source = self._movements_source(date_from, date_to)
+            sql = f"SELECT {columns} FROM {source} JOIN categories c ON c.id = m.category_id WHERE 1=1"
         if date_from:
-            sql += " AND date >= ?"
+            sql += " AND m.date >= ?"
             params.append(date_from)
         if date_to:
-            sql += " AND date <= ?"
+            sql += " AND m.date <= ?"
             params.append(date_to)
         if category:
-            sql += " AND category LIKE ?"
+            sql += " AND c.name LIKE ?"
             params.append(f"%{category}%")
+        if q:
+            if after:
+                sql += " AND (f.rank, m.id) > (?, ?)"
+                params.extend([float(after[0]), int(after[1])])
+            sql += " ORDER BY f.rank, m.id"
+        else:
+            if after:
+                sql += " AND (m.date, m.id) < (?, ?)"
+                params.extend([after[0], int(after[1])])
+            sql += " ORDER BY m.date DESC, m.id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return sql, params
 
-        sql += " ORDER BY date DESC"
-        cur.execute(sql, params)
-        rows = cur.fetchall()
-        # Map rows to dictionaries
-        results = []
-        for r in rows:
-            results.append({
-                "id": r[0],
-                "date": r[1],
-                "type": r[2],
-                "amount": r[3],
-                "currency": r[4],
-                "fx_rate": r[5],
-                "category": r[6],
-                "description": r[7],
-            })
-        return results
+    def iter_by_criteria(self, date_from=None, date_to=None, category=None, after=None, limit=None, q=None, fetch_size: int = 500):
+        """Genera los movimientos en orden (date DESC, id DESC) leyendo el cursor por bloques.
+
+        `after` es un cursor (date, id): sólo se devuelven filas posteriores en ese orden
+        (paginación keyset, sin OFFSET). La memoria usada no depende del tamaño del historial.
+
+        Con `q` se busca en description y category (FTS5): los resultados incluyen `rank`
+        (bm25, menor = más relevante), se ordenan por (rank, id) y `after` es (rank, id).
+        La búsqueda sólo cubre los años no archivados (el índice FTS vive en la DB principal).
+        """
+        columns = "m.id, m.date, m.type, m.amount, m.currency, m.fx_rate, c.name, m.description"
+        query = self._criteria_query(columns + (", f.rank" if q else ""), date_from, date_to, category, after, limit, q)
+        if query is None:
+            return
+        cur = self.conn.cursor()
+        cur.execute(*query)
+        try:
+            while True:
+                rows = cur.fetchmany(fetch_size)
+                if not rows:
+                    break
+                # Map rows to dictionaries
+                for r in rows:
+                    item = {
+                        "id": r[0],
+                        "date": r[1],
+                        "type": r[2],
+                        "amount": r[3],
+                        "currency": r[4],
+                        "fx_rate": r[5],
+                        "category": r[6],
+                        "description": r[7],
+                    }
+                    if q:
+                        item["rank"] = r[8]
+                    yield item
+        finally:
+            cur.close()
+
+    def iter_json_by_criteria(self, date_from=None, date_to=None, category=None, after=None, limit=None, q=None, fetch_size: int = 500):
+        """Como `iter_by_criteria`, pero cada movimiento llega ya como texto JSON (json_object de SQLite).
+
+        Para los listados en streaming: no se crea un dict por fila ni se llama a json.dumps.
+        SQLite escribe los REAL con 15 dígitos significativos, suficiente para importes; en
+        búsquedas (`q`) se serializa en Python porque `rank` debe conservarse exacto para
+        usarlo como cursor.
+        """
+        if q:
+            rows = self.iter_by_criteria(date_from, date_to, category, after, limit, q, fetch_size)
+            yield from (json.dumps(row, ensure_ascii=False) for row in rows)
+            return
+        fields = "'id', m.id, 'date', m.date, 'type', m.type, 'amount', m.amount, 'currency', m.currency, " \
+                 "'fx_rate', m.fx_rate, 'category', c.name, 'description', m.description"
+        query = self._criteria_query(f"json_object({fields})", date_from, date_to, category, after, limit)
+        if query is None:
+            return
+        cur = self.conn.cursor()
+        cur.execute(*query)
+        try:
+            while True:
+                rows = cur.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for (text,) in rows:
+                    yield text
+        finally:
+            cur.close()
 
     def get_monthly_aggregates(self, month: str, year: str):
         cur = self.conn.cursor()
-        sql = "SELECT type, SUM(amount) as total FROM movements WHERE strftime('%m', date) = ? AND strftime('%Y', date) = ? GROUP BY type"
-        cur.execute(sql, (month, year))
+        sql = "SELECT type, SUM(total_base) as total FROM movement_rollups WHERE day >= ? AND day < ? GROUP BY type"
+        cur.execute(sql, _month_range(month, year))
         rows = cur.fetchall()
         # return dict type -> total
         return {r[0]: r[1] for r in rows}
 
     
 
+    def get_monthly_carryover(self, month: str, year: str):
+        cur_start, cur_end = _month_range(month, year)
+        m, y = int(month), int(year)
+        prev_start, _ = _month_range(12, y - 1) if m == 1 else _month_range(m - 1, y)
+        year_start, _ = _year_range(year)
+        # Totales del mes desde los rollups; netos del mes anterior y del año como diferencias
+        # de saldos del ledger (cuatro búsquedas en su índice), todo en la misma consulta
+        before = f"COALESCE((SELECT balance FROM {self._ledger_source()} WHERE day < ? ORDER BY day DESC LIMIT 1), 0)"
+        cur = self.conn.cursor()
+        cur.execute(
+            "SELECT COALESCE(SUM(CASE WHEN type = 'Ingreso' THEN total_base END), 0), "
+            "COALESCE(SUM(CASE WHEN type = 'Gasto' THEN total_base END), 0), "
+            f"{before} - {before}, {before} - {before} "
+            "FROM movement_rollups WHERE day >= ? AND day < ?",
+            (cur_start, prev_start, cur_end, year_start, cur_start, cur_end),
+        )
+        ingresos, gastos, previous_net, cumulative_net = cur.fetchone()
+        return {
+            'ingresos': ingresos,
+            'gastos': gastos,
+            'previous_net': previous_net,
+            'cumulative_net': cumulative_net,
+        }
+
     def get_expenses_by_category(self, year: str = None, month: str = None):
         cur = self.conn.cursor()
+        # Agrupa por el id entero y resuelve el nombre con un join sobre el resultado agregado
+        base = (
+            "SELECT c.name, t.total FROM ("
+            "SELECT category_id, SUM(total_base) as total FROM movement_rollups WHERE type = 'Gasto'{where} GROUP BY category_id"
+            ") t JOIN categories c ON c.id = t.category_id ORDER BY t.total DESC"
+        )
         if year and month:
-            sql = "SELECT category, SUM(amount) as total FROM movements WHERE type = 'Gasto' AND strftime('%Y', date) = ? AND strftime('%m', date) = ? GROUP BY category ORDER BY total DESC"
-            cur.execute(sql, (year, month))
+            cur.execute(base.format(where=" AND day >= ? AND day < ?"), _month_range(month, year))
         elif year:
-            sql = "SELECT category, SUM(amount) as total FROM movements WHERE type = 'Gasto' AND strftime('%Y', date) = ? GROUP BY category ORDER BY total DESC"
-            cur.execute(sql, (year,))
+            cur.execute(base.format(where=" AND day >= ? AND day < ?"), _year_range(year))
         else:
-            sql = "SELECT category, SUM(amount) as total FROM movements WHERE type = 'Gasto' GROUP BY category ORDER BY total DESC"
-            cur.execute(sql)
+            cur.execute(base.format(where=""))
         rows = cur.fetchall()
         return [{"category": r[0], "total": r[1]} for r in rows]
 
     def get_yearly_aggregates(self, year: str):
         cur = self.conn.cursor()
-        # We want totals per month and per type. Use strftime to extract month.
-        sql = "SELECT strftime('%m', date) as m, type, SUM(amount) as total FROM movements WHERE strftime('%Y', date) = ? GROUP BY m, type"
-        cur.execute(sql, (year,))
+        # We want totals per month and per type. Days are 'YYYY-MM-DD', so the month is substr(day, 6, 2).
+        sql = "SELECT substr(day, 6, 2) as m, type, SUM(total_base) as total FROM movement_rollups WHERE day >= ? AND day < ? GROUP BY m, type"
+        cur.execute(sql, _year_range(year))
         rows = cur.fetchall()
         # Build dict: month -> { 'Ingreso': x, 'Gasto': y }
         result = {}
@@ -146,11 +516,16 @@ class SQLiteMovementRepository(MovementRepositoryInterface):
                 result[key].setdefault('Gasto', 0.0)
         return result
 
+    def get_years(self):
+        cur = self.conn.cursor()
+        cur.execute("SELECT DISTINCT substr(day, 1, 4) as y FROM movement_rollups ORDER BY y DESC")
+        return [r[0] for r in cur.fetchall() if r[0]]
+
     def get_daily_aggregates(self, month: str, year: str):
         cur = self.conn.cursor()
-        # Extract day with strftime('%d', date)
-        sql = "SELECT strftime('%d', date) as d, type, SUM(amount) as total FROM movements WHERE strftime('%m', date) = ? AND strftime('%Y', date) = ? GROUP BY d, type"
-        cur.execute(sql, (month, year))
+        # Extract day with substr(day, 9, 2)
+        sql = "SELECT substr(day, 9, 2) as d, type, SUM(total_base) as total FROM movement_rollups WHERE day >= ? AND day < ? GROUP BY d, type"
+        cur.execute(sql, _month_range(month, year))
         rows = cur.fetchall()
         result = {}
         for d, t, total in rows:
@@ -171,18 +546,81 @@ class SQLiteMovementRepository(MovementRepositoryInterface):
                 result[key].setdefault('Gasto', 0.0)
         return result
 
+    # Clave de periodo de cada día de los rollups; la semana se identifica por su lunes
+    _SERIES_PERIOD_SQL = {
+        "day": "day",
+        "week": "date(day, '-6 days', 'weekday 1')",
+        "month": "substr(day, 1, 7)",
+        "year": "substr(day, 1, 4)",
+    }
+
+    def get_series(self, date_from: str, date_to: str, granularity: str = "month"):
+        """Filas (periodo, ingresos, gastos) ordenadas por periodo para [date_from, date_to),
+        en una sola consulta agrupada; sólo aparecen los periodos con datos."""
+        period = self._SERIES_PERIOD_SQL[granularity]
+        cur = self.conn.cursor()
+        cur.execute(
+            f"SELECT {period} AS p, "
+            "COALESCE(SUM(CASE WHEN type = 'Ingreso' THEN total_base END), 0), "
+            "COALESCE(SUM(CASE WHEN type = 'Gasto' THEN total_base END), 0) "
+            "FROM movement_rollups WHERE day >= ? AND day < ? GROUP BY p ORDER BY p",
+            (date_from, date_to),
+        )
+        return cur.fetchall()
+
+    # Saldo acumulado calculado desde los rollups, para lecturas dentro de una transacción
+    # mientras el ledger tiene cambios sin reflejar (no se puede escribir en ella)
+    _LEDGER_FALLBACK_SQL = (
+        "(SELECT day, SUM(net) OVER (ORDER BY day) AS balance FROM ("
+        "SELECT day, SUM(CASE type WHEN 'Ingreso' THEN total_base ELSE -total_base END) AS net "
+        "FROM movement_rollups GROUP BY day))"
+    )
+
+    def _ledger_source(self) -> str:
+        """`balance_ledger`, o el saldo calculado desde los rollups si una escritura hecha fuera
+        del adaptador (SQL directo) lo dejó pendiente (`ledger_from`). Las lecturas nunca lo
+        rehacen (no toman el lock de escritura): lo pone al día la siguiente escritura."""
+        cur = self.conn.cursor()
+        cur.execute("SELECT ledger_from FROM data_version WHERE id = 1")
+        return "balance_ledger" if cur.fetchone()[0] is None else self._LEDGER_FALLBACK_SQL
+
+    def get_balance_at(self, date: str) -> float:
+        """Saldo acumulado (ingresos - gastos, moneda base) de todo el historial hasta `date`
+        inclusive: una búsqueda en el índice de `balance_ledger`."""
+        cur = self.conn.cursor()
+        cur.execute(f"SELECT balance FROM {self._ledger_source()} WHERE day <= ? ORDER BY day DESC LIMIT 1", (date,))
+        r = cur.fetchone()
+        return r[0] if r else 0.0
+
+    def get_balance_series(self, date_from: str = None, date_to: str = None, granularity: str = "month"):
+        """Filas (periodo, saldo al último día con movimientos del periodo) ordenadas, para
+        los días en [date_from, date_to) (extremos opcionales); sin agregar movimientos."""
+        period = self._SERIES_PERIOD_SQL[granularity]
+        sql = f"SELECT {period} AS p, balance, MAX(day) FROM {self._ledger_source()} WHERE 1=1"
+        params = []
+        if date_from:
+            sql += " AND day >= ?"
+            params.append(date_from)
+        if date_to:
+            sql += " AND day < ?"
+            params.append(date_to)
+        cur = self.conn.cursor()
+        # Con MAX(day), SQLite toma `balance` de la fila del último día de cada grupo
+        cur.execute(sql + " GROUP BY p ORDER BY p", params)
+        return [(p, balance) for p, balance, _ in cur.fetchall()]
+
     def get_top_expenses(self, month: str, year: str, limit: int = 5, category: str = None):
         cur = self.conn.cursor()
+        params = list(_month_range(month, year))
         sql = (
-            "SELECT category, description, amount, date "
-            "FROM movements "
-            "WHERE type = 'Gasto' AND strftime('%m', date) = ? AND strftime('%Y', date) = ? "
+            "SELECT c.name, m.description, m.amount_base, m.date "
+            f"FROM {self._movements_source(params[0], params[0])} JOIN categories c ON c.id = m.category_id "
+            "WHERE m.type = 'Gasto' AND m.date >= ? AND m.date < ? "
         )
-        params = [month, year]
         if category:
-            sql += " AND category = ?"
+            sql += " AND c.name = ?"
             params.append(category)
-        sql += " ORDER BY amount DESC LIMIT ?"
+        sql += " ORDER BY m.amount_base DESC LIMIT ?"
         params.append(limit)
         cur.execute(sql, tuple(params))
         rows = cur.fetchall()
@@ -191,8 +629,212 @@ class SQLiteMovementRepository(MovementRepositoryInterface):
             for r in rows
         ]
 
+    @contextmanager
+    def snapshot(self):
+        """Agrupa lecturas en una transacción: todas ven la misma versión de la DB.
+
+        Sólo para lecturas; si ya hay una transacción abierta se reutiliza.
+        """
+        if self.conn.in_transaction:
+            yield
+            return
+        self.conn.execute("BEGIN")
+        try:
+            yield
+        except Exception:
+            self.conn.rollback()
+            raise
+        else:
+            self.conn.commit()
+
+    def rebuild_rollups(self):
+        """Recalcula la tabla de rollups desde `movements` (backfill / reparación).
+
+        Los años archivados conservan su resumen congelado: se vuelve a sumar desde su archivo.
+        """
+        cur = self.conn.cursor()
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            rebuild_rollups(cur)
+            for year in self._archived_years:
+                self._merge_archived_rollups(cur, year)
+            self._bump_data_version(cur)
+            cur.execute("SELECT COUNT(*) FROM movement_rollups")
+            n = cur.fetchone()[0]
+            self.conn.commit()
+            return n
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def _merge_archived_rollups(self, cur, year: str):
+        # Suma (no reemplaza): el año puede tener también movimientos nuevos en main
+        cur.execute(
+            "INSERT INTO main.movement_rollups (day, type, category_id, currency, total, count, total_base) "
+            f"SELECT day, type, category_id, currency, total, count, total_base FROM {ARCHIVE_SCHEMA_PREFIX}{year}.movement_rollups "
+            "WHERE true ON CONFLICT(day, type, category_id, currency) DO UPDATE SET "
+            "total = total + excluded.total, count = count + excluded.count, total_base = total_base + excluded.total_base"
+        )
+
+    # Yearly partitions
+    def list_archived_years(self):
+        """Años archivados con su archivo, número de movimientos y fecha de archivo."""
+        cur = self.conn.cursor()
+        cur.execute("SELECT year, path, rows, archived_at FROM archived_years ORDER BY year")
+        return [{"year": r[0], "path": r[1], "rows": r[2], "archived_at": r[3]} for r in cur.fetchall()]
+
+    def _check_year(self, year) -> str:
+        year = str(year)
+        if not re.fullmatch(r"\d{4}", year):
+            raise ValueError("El año debe tener formato AAAA")
+        return year
+
+    def archive_year(self, year) -> int:
+        """Mueve los movimientos de un año cerrado a su propio archivo `<db>.<año>.db`.
+
+        Los rollups del año se quedan en la DB principal (resumen congelado), así que los
+        reportes agregados no leen el archivo; los listados lo leen sólo si su rango toca
+        el año. Primero se escribe y confirma el archivo; después, en una transacción de
+        la DB principal, se comprueba que el año no cambió entretanto, se borran sus filas
+        y se registra en `archived_years`. Si el proceso se interrumpe entre ambos pasos
+        queda un archivo fuera del catálogo que se ignora y se reemplaza en el siguiente
+        intento. Devuelve el número de movimientos archivados.
+        """
+        year = self._check_year(year)
+        if int(year) >= date.today().year:
+            raise ValueError("Sólo se pueden archivar años cerrados (anteriores al actual)")
+        self._sync_archives()
+        if year in self._archived_years:
+            raise ValueError(f"El año {year} ya está archivado")
+        if len(self._archived_years) >= self.conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED):
+            raise ValueError("Se alcanzó el máximo de bases adjuntas de SQLite; restaure algún año antes")
+        start, end = _year_range(year)
+        schema = f"{ARCHIVE_SCHEMA_PREFIX}{year}"
+        path = self._archive_path(year)
+        cur = self.conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM main.movements WHERE date >= ? AND date < ?", (start, end))
+        rows = cur.fetchone()[0]
+        if not rows:
+            raise ValueError(f"No hay movimientos en {year}")
+        cur.execute("SELECT rewrites FROM data_version WHERE id = 1")
+        rewrites = cur.fetchone()[0]
+        path.unlink(missing_ok=True)
+        cur.execute(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+        archived = False
+        try:
+            cur.execute("BEGIN")
+            for sql in ARCHIVE_SCHEMA_SQL:
+                cur.execute(sql.format(schema=schema))
+            cur.execute(f"INSERT INTO {schema}.movements ({MOVEMENT_COLUMNS}) "
+                        f"SELECT {MOVEMENT_COLUMNS} FROM main.movements WHERE date >= ? AND date < ?", (start, end))
+            cur.execute(f"INSERT INTO {schema}.movement_rollups SELECT day, type, category_id, currency, total, count, total_base "
+                        "FROM main.movement_rollups WHERE day >= ? AND day < ?", (start, end))
+            self.conn.commit()
+
+            cur.execute("BEGIN IMMEDIATE")
+            cur.execute("SELECT rewrites FROM data_version WHERE id = 1")
+            changed = cur.fetchone()[0] != rewrites
+            cur.execute("SELECT COUNT(*) FROM main.movements WHERE date >= ? AND date < ?", (start, end))
+            if changed or cur.fetchone()[0] != rows:
+                raise ValueError(f"Los movimientos de {year} cambiaron mientras se archivaban; vuelva a intentarlo")
+            # Los triggers descuentan los rollups y el índice FTS de cada fila borrada
+            cur.execute("DELETE FROM main.movements WHERE date >= ? AND date < ?", (start, end))
+            self._merge_archived_rollups(cur, year)
+            cur.execute("INSERT INTO archived_years (year, path, rows, archived_at) VALUES (?, ?, ?, datetime('now'))",
+                        (year, path.name, rows))
+            self._bump_data_version(cur)
+            self.conn.commit()
+            archived = True
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cur.execute(f"DETACH DATABASE {schema}")
+            if not archived:
+                path.unlink(missing_ok=True)
+        self._sync_archives()
+        return rows
+
+    def restore_year(self, year) -> int:
+        """Devuelve a `movements` los movimientos de un año archivado, recalcula sus rollups
+        desde las filas y borra el archivo. Devuelve el número de movimientos restaurados."""
+        year = self._check_year(year)
+        self._sync_archives()
+        if year not in self._archived_years:
+            raise ValueError(f"El año {year} no está archivado")
+        start, end = _year_range(year)
+        schema = f"{ARCHIVE_SCHEMA_PREFIX}{year}"
+        cur = self.conn.cursor()
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            cur.execute(f"INSERT INTO main.movements ({MOVEMENT_COLUMNS}) SELECT {MOVEMENT_COLUMNS} FROM {schema}.movements")
+            rows = cur.rowcount
+            # Un archivo anterior a la migración 16 puede traer filas en otra moneda sin tasa
+            cur.execute(f"INSERT OR IGNORE INTO fx_missing (movement_id, currency) {FX_MISSING_SELECT_SQL.format(schema=schema)}")
+            if cur.rowcount:
+                cur.execute("UPDATE main.movements SET amount_base = 0 WHERE id IN (SELECT movement_id FROM fx_missing) AND date >= ? AND date < ?",
+                            (start, end))
+            # Los triggers ya sumaron las filas sobre el resumen congelado: se rehace el año
+            rebuild_rollups(cur, start, end)
+            cur.execute("DELETE FROM archived_years WHERE year = ?", (year,))
+            # Vuelven ids anteriores al último: quien copie movimientos debe recargarlos
+            cur.execute("UPDATE data_version SET rewrites = rewrites + 1 WHERE id = 1")
+            self._bump_data_version(cur)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        cur.execute(f"DETACH DATABASE {schema}")
+        self._archive_path(year).unlink(missing_ok=True)
+        self._sync_archives()
+        return rows
+
+    def list_missing_fx_rates(self):
+        """Movimientos en otra moneda guardados sin tasa de cambio (ver migración 16). No cuentan
+        en los totales en moneda base hasta que se les asigna con `set_fx_rate`."""
+        cur = self.conn.cursor()
+        cur.execute(
+            "SELECT m.id, m.date, m.type, m.amount, m.currency, c.name, m.description "
+            "FROM fx_missing f JOIN movements m ON m.id = f.movement_id JOIN categories c ON c.id = m.category_id "
+            "ORDER BY m.date, m.id"
+        )
+        return [
+            {"id": r[0], "date": r[1], "type": r[2], "amount": r[3], "currency": r[4], "category": r[5], "description": r[6]}
+            for r in cur.fetchall()
+        ]
+
+    def set_fx_rate(self, movement_id: int, fx_rate) -> None:
+        """Asigna la tasa a un movimiento de `list_missing_fx_rates` y recalcula su `amount_base`
+        (los triggers actualizan rollups y saldo acumulado en la misma transacción)."""
+        try:
+            rate = float(fx_rate)
+        except (TypeError, ValueError):
+            raise InvalidFxRateError("La tasa de cambio debe ser un número mayor a cero")
+        if not math.isfinite(rate) or rate <= 0:
+            raise InvalidFxRateError("La tasa de cambio debe ser un número mayor a cero")
+        cur = self.conn.cursor()
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            cur.execute("DELETE FROM fx_missing WHERE movement_id = ?", (movement_id,))
+            if not cur.rowcount:
+                raise ValueError(f"El movimiento {movement_id} no está pendiente de tasa de cambio")
+            cur.execute("UPDATE movements SET fx_rate = ?, amount_base = amount * ? WHERE id = ?", (rate, rate, movement_id))
+            if not cur.rowcount:
+                raise ValueError(f"El movimiento {movement_id} está en un año archivado; restáurelo antes")
+            self._bump_data_version(cur)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
     def close(self):
-        self.conn.close()
+        if self.conn is None:
+            return
+        conn, self.conn = self.conn, None
+        if self._pool is not None:
+            self._pool.release(conn)
+        else:
+            conn.close()
 
     # Categories support
     def get_categories_by_type(self, type: str):
@@ -206,9 +848,13 @@ class SQLiteMovementRepository(MovementRepositoryInterface):
         cur = self.conn.cursor()
         try:
             cur.execute("INSERT INTO categories (type, name, icon) VALUES (?, ?, ?)", (type, name, icon))
+            category_id = cur.lastrowid
+            self._bump_data_version(cur)
             self.conn.commit()
-            return cur.lastrowid
+            return category_id
         except Exception:
+            # The failed insert must not leave its transaction open on a pooled connection
+            self.conn.rollback()
             # If exists, return existing id
             cur.execute("SELECT id FROM categories WHERE name = ? AND type = ?", (name, type))
             r = cur.fetchone()
@@ -222,17 +868,30 @@ class SQLiteMovementRepository(MovementRepositoryInterface):
 
     def delete_category(self, category_id: int):
         cur = self.conn.cursor()
+        cur.execute("SELECT 1 FROM movements_all WHERE category_id = ? LIMIT 1", (category_id,))
+        if cur.fetchone():
+            # Los movimientos referencian la categoría por id: no se puede dejar huérfanos
+            raise CategoryInUseError("La categoría tiene movimientos asociados y no se puede eliminar")
         cur.execute("DELETE FROM categories WHERE id = ?", (category_id,))
+        deleted = cur.rowcount > 0
+        if deleted:
+            self._bump_data_version(cur)
         self.conn.commit()
-        return cur.rowcount > 0
+        return deleted
 
-    def update_category(self, category_id: int, new_name: str):
+    def update_category(self, category_id: int, new_name: str, icon: str = None):
         cur = self.conn.cursor()
         try:
-            # If icon provided in new_name (via signature change), handle new signature
-            # The interface may pass icon separately; we'll accept new_name and ignore icon here
-            cur.execute("UPDATE categories SET name = ? WHERE id = ?", (new_name, category_id))
+            # Movements reference the id, so a rename is visible everywhere (reports, search) at once
+            if icon is not None:
+                cur.execute("UPDATE categories SET name = ?, icon = ? WHERE id = ?", (new_name, icon, category_id))
+            else:
+                cur.execute("UPDATE categories SET name = ? WHERE id = ?", (new_name, category_id))
+            updated = cur.rowcount > 0
+            if updated:
+                self._bump_data_version(cur)
             self.conn.commit()
-            return cur.rowcount > 0
+            return updated
         except Exception:
+            self.conn.rollback()
             return False
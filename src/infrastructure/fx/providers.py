@@ -0,0 +1,79 @@
+"""Proveedores HTTP de tasas de cambio.
+
+Sólo usan la librería estándar. El timeout es corto porque `FxService` nunca
+llama al proveedor en el camino de una petición si tiene una tasa (aunque esté
+vencida): los refrescos ocurren en segundo plano.
+"""
+import json
+import time
+import urllib.request
+
+from src.core.domain.fx import FxQuote
+from src.core.ports.fx import FxProviderInterface
+
+DEFAULT_TIMEOUT = 5.0
+
+
+def _get_json(url: str, timeout: float):
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        return json.load(resp)
+
+
+def _clean_rates(rates):
+    out = {}
+    for symbol, value in (rates or {}).items():
+        try:
+            out[str(symbol)] = float(value)
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+class ExchangeRateHostProvider(FxProviderInterface):
+    """api.exchangerate.host"""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+
+    def fetch_latest(self, base: str) -> FxQuote:
+        data = _get_json(f"https://api.exchangerate.host/latest?base={base}", self.timeout)
+        # exchangerate.host puede responder {'success': False, 'error': {...}}
+        rates = _clean_rates(data.get("rates"))
+        if not data.get("success", True) or not rates:
+            raise ValueError(f"exchangerate.host sin tasas para {base}")
+        return FxQuote(base=data.get("base", base), rates=rates, date=data.get("date"), fetched_at=time.time())
+
+
+class OpenErApiProvider(FxProviderInterface):
+    """open.er-api.com"""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+
+    def fetch_latest(self, base: str) -> FxQuote:
+        data = _get_json(f"https://open.er-api.com/v6/latest/{base}", self.timeout)
+        rates = _clean_rates(data.get("rates"))
+        if not rates:
+            raise ValueError(f"open.er-api.com sin tasas para {base}")
+        date = data.get("time_last_update_utc") or data.get("time_last_update_iso")
+        return FxQuote(base=base, rates=rates, date=date, fetched_at=time.time())
+
+
+class FallbackProvider(FxProviderInterface):
+    """Prueba cada proveedor en orden y devuelve la primera respuesta válida."""
+
+    def __init__(self, *providers):
+        self.providers = providers
+
+    def fetch_latest(self, base: str) -> FxQuote:
+        error = None
+        for provider in self.providers:
+            try:
+                return provider.fetch_latest(base)
+            except Exception as e:
+                error = e
+        raise error or ValueError("No hay proveedores de tasas configurados")
+
+
+def default_provider(timeout: float = DEFAULT_TIMEOUT) -> FxProviderInterface:
+    return FallbackProvider(ExchangeRateHostProvider(timeout), OpenErApiProvider(timeout))
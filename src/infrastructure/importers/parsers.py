@@ -0,0 +1,191 @@
+"""Lectores en streaming de extractos (CSV, JSON/NDJSON y OFX).
+
+Cada parser recibe un archivo de texto abierto y produce tuplas
+(número_de_registro, dict) con las claves de la API: date, type, amount,
+category, description, currency, fx_rate. La validación de negocio la hace
+`ImportService` con las reglas de `Movement`; aquí sólo se traduce el formato.
+Un registro que no se puede decodificar llega como (número, RowError) en lugar
+del dict, para que no aborte el resto de la importación.
+"""
+import csv
+import json
+import re
+from pathlib import Path
+
+from src.core.domain.imports import RowError
+
+FIELDS = ("date", "type", "amount", "category", "description", "currency", "fx_rate")
+
+# Categoría asignada a las transacciones OFX (el formato no trae categoría)
+OFX_DEFAULT_CATEGORY = "Importado"
+
+
+def parse_csv(fp):
+    """CSV con cabecera; columnas reconocidas: date,type,amount,category,description,currency,fx_rate."""
+    reader = csv.DictReader(fp)
+    for n, row in enumerate(reader, start=1):
+        yield n, {k: (row.get(k) or "").strip() or None for k in FIELDS}
+
+
+def _iter_json_array(fp, chunk_size=65536):
+    # Decodifica los elementos de un array JSON de uno en uno, sin cargar el archivo completo
+    decoder = json.JSONDecoder()
+    buf = fp.read(chunk_size).lstrip()
+    if not buf.startswith("["):
+        raise ValueError("Se esperaba un array JSON")
+    buf = buf[1:]
+    eof = False
+    while True:
+        buf = buf.lstrip().lstrip(",").lstrip()
+        if buf.startswith("]"):
+            return
+        try:
+            obj, end = decoder.raw_decode(buf)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more = fp.read(chunk_size)
+            eof = not more
+            buf += more
+            continue
+        yield obj
+        buf = buf[end:]
+        if len(buf) < chunk_size and not eof:
+            more = fp.read(chunk_size)
+            eof = not more
+            buf += more
+
+
+def parse_json(fp):
+    """Array JSON de objetos o NDJSON (un objeto por línea)."""
+    first = fp.read(1)
+    while first and first.isspace():
+        first = fp.read(1)
+    if not first:
+        return
+    if first == "[":
+        items = _iter_json_array(_Prefixed(first, fp))
+    else:
+        items = _iter_ndjson(_lines_with_prefix(first, fp))
+    n = 0
+    try:
+        for n, obj in enumerate(items, start=1):
+            if isinstance(obj, RowError):
+                yield n, RowError(row=n, error=obj.error)
+            elif not isinstance(obj, dict):
+                yield n, RowError(row=n, error="Se esperaba un objeto JSON")
+            else:
+                yield n, {k: obj.get(k) for k in FIELDS}
+    except json.JSONDecodeError as e:
+        # En un array no se puede saber dónde empieza el siguiente elemento: se conserva lo leído
+        yield n + 1, RowError(row=n + 1, error=f"JSON inválido ({e.msg}); se ignoró el resto del archivo")
+
+
+def _iter_ndjson(lines):
+    # Cada línea es independiente: una línea inválida es un error de esa fila, no del archivo
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield RowError(row=0, error=f"JSON inválido ({e.msg})")
+
+
+class _Prefixed:
+    """Archivo al que se le devuelve por delante lo ya leído."""
+
+    def __init__(self, prefix, fp):
+        self._prefix = prefix
+        self._fp = fp
+
+    def read(self, size=-1):
+        data, self._prefix = self._prefix, ""
+        return data + self._fp.read(size)
+
+
+def _lines_with_prefix(prefix, fp):
+    first_line = prefix + fp.readline()
+    yield first_line
+    for line in fp:
+        yield line
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Z0-9.]+)>([^<\r\n]*)")
+
+
+def parse_ofx(fp, category: str = OFX_DEFAULT_CATEGORY):
+    """OFX 1.x (SGML) o 2.x (XML). Cada <STMTTRN> es un movimiento: el signo de TRNAMT
+    determina el tipo (positivo = Ingreso, negativo = Gasto)."""
+    currency = "COP"
+    current = None
+    n = 0
+    for line in fp:
+        for closing, tag, value in _OFX_TAG.findall(line):
+            value = value.strip()
+            if tag == "CURDEF" and not closing and value:
+                currency = value
+            elif tag == "STMTTRN":
+                if closing:
+                    if current is not None:
+                        n += 1
+                        yield n, _ofx_to_row(current, currency, category)
+                    current = None
+                else:
+                    if current is not None:
+                        # SGML sin cierre explícito
+                        n += 1
+                        yield n, _ofx_to_row(current, currency, category)
+                    current = {}
+            elif current is not None and not closing and value:
+                current[tag] = value
+    if current is not None:
+        n += 1
+        yield n, _ofx_to_row(current, currency, category)
+
+
+def _ofx_to_row(trn, currency, category):
+    posted = trn.get("DTPOSTED", "")
+    date = f"{posted[0:4]}-{posted[4:6]}-{posted[6:8]}" if len(posted) >= 8 else posted
+    raw = trn.get("TRNAMT", "").replace(",", ".")
+    try:
+        value = float(raw)
+        type_ = "Ingreso" if value > 0 else "Gasto"
+        amount = abs(value)
+    except ValueError:
+        type_, amount = None, raw
+    description = trn.get("NAME") or trn.get("MEMO")
+    if trn.get("NAME") and trn.get("MEMO"):
+        description = f"{trn['NAME']} - {trn['MEMO']}"
+    return {
+        "date": date,
+        "type": type_,
+        "amount": amount,
+        "category": category,
+        "description": description,
+        "currency": currency,
+        "fx_rate": None,
+    }
+
+
+PARSERS = {
+    "csv": parse_csv,
+    "json": parse_json,
+    "ndjson": parse_json,
+    "ofx": parse_ofx,
+    "qfx": parse_ofx,
+}
+
+
+def detect_format(filename) -> str:
+    ext = Path(str(filename)).suffix.lower().lstrip(".")
+    if ext not in PARSERS:
+        raise ValueError(f"Formato no soportado: '{ext}'. Use csv, json, ndjson u ofx")
+    return ext
+
+
+def get_parser(fmt: str):
+    try:
+        return PARSERS[fmt.lower()]
+    except KeyError:
+        raise ValueError(f"Formato no soportado: '{fmt}'. Use csv, json, ndjson u ofx")
@@ -0,0 +1,163 @@
+"""Métricas en memoria del proceso, exportables en formato de texto de Prometheus.
+
+Cada worker tiene su propio registro (`registry`); Prometheus agrega por instancia.
+Todas las operaciones son seguras entre hilos.
+"""
+import threading
+
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(value) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = list(self._series.items())
+        for labels, value in sorted(series):
+            lines.extend(self._render_series(labels, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels=(), amount: float = 1.0):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0.0) + amount
+
+    def value(self, labels=()):
+        return self._series.get(tuple(labels), 0.0)
+
+    def _render_series(self, labels, value):
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}"]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, labels=(), value: float = 0.0):
+        with self._lock:
+            self._series[labels] = value
+
+
+class Histogram(_Metric):
+    """Histograma de cubetas fijas (acumulativas al exportar, como espera Prometheus)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=REQUEST_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels=(), value: float = 0.0):
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            counts = s[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            s[1] += value
+            s[2] += 1
+
+    def count(self, labels=()):
+        s = self._series.get(tuple(labels))
+        return s[2] if s else 0
+
+    def _render_series(self, labels, value):
+        counts, total, n = value
+        lines, acc = [], 0
+        for bound, c in zip(self.buckets, counts):
+            acc += c
+            le = 'le="%s"' % _fmt(bound)
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {acc}")
+        inf = 'le="+Inf"'
+        lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, inf)} {n}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(total)}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {n}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+        self._collectors = []
+
+    def _add(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=REQUEST_BUCKETS):
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, fn):
+        """`fn()` se llama antes de exportar (p. ej. para leer el estado del pool en gauges)."""
+        with self._lock:
+            self._collectors.append(fn)
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics)
+        for fn in collectors:
+            fn()
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP por ruta.", ("route", "method", "status"))
+sql_query_duration = registry.histogram(
+    "sqlite_query_duration_seconds", "Tiempo de execute() por sentencia SQL (hasta la primera fila en SELECT).",
+    ("query",), QUERY_BUCKETS)
+sql_fetch_seconds = registry.counter(
+    "sqlite_query_fetch_seconds_total", "Tiempo total leyendo filas (fetch*) por sentencia SQL.", ("query",))
+sql_rows = registry.counter(
+    "sqlite_query_rows_total", "Filas leídas o modificadas por sentencia SQL.", ("query",))
+sql_slow_queries = registry.counter(
+    "sqlite_slow_queries_total", "Sentencias que superaron el umbral de consulta lenta.", ("query",))
+pool_acquire_duration = registry.histogram(
+    "db_pool_acquire_seconds", "Espera para obtener una conexión del pool.", (), QUERY_BUCKETS)
+pool_connections = registry.gauge(
+    "db_pool_connections", "Conexiones de cada pool por base y estado (open, idle, in_use).", ("db", "pool", "state"))
@@ -0,0 +1,60 @@
+from src.core.domain.entities import Movement
+from src.core.services.report_service import ReportService
+from src.infrastructure.analytics.columnar import INGRESO, ColumnarSnapshot
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+
+
+def _seed(repo):
+    repo.save(Movement(date="2024-01-05", type="Gasto", amount=10, category="Super"))
+    repo.save(Movement(date="2024-01-20", type="Ingreso", amount=500, category="Sueldo"))
+    repo.save(Movement(date="2024-02-03", type="Gasto", amount=30, category="Taxi"))
+    repo.save(Movement(date="2024-03-09", type="Gasto", amount=20, category="Super", currency="USD", fx_rate=2))
+
+
+def test_snapshot_appends_new_rows_and_reloads_on_rewrites(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "a.db")
+    _seed(repo)
+    snap = ColumnarSnapshot().refresh(repo.conn)
+    assert len(snap) == 4 and snap.reloads == 1
+    assert snap.group_sum("2024-01-01", "2024-04-01", "year") == {"2024": 80.0}
+    assert snap.group_sum("2024-01-01", "2024-04-01", "year", kind=INGRESO) == {"2024": 500.0}
+
+    # in-order insert: appended without reloading
+    repo.save(Movement(date="2024-03-10", type="Gasto", amount=5, category="Taxi"))
+    snap.refresh(repo.conn)
+    assert len(snap) == 5 and snap.reloads == 1
+    # an older date or a delete forces a full reload
+    repo.save(Movement(date="2023-12-31", type="Gasto", amount=1, category="Taxi"))
+    snap.refresh(repo.conn)
+    assert snap.reloads == 2 and snap.days[0] < snap.days[1]
+    repo.conn.execute("DELETE FROM movements WHERE amount = 1")
+    repo.conn.commit()
+    snap.refresh(repo.conn)
+    assert len(snap) == 5 and snap.reloads == 3
+
+    # same answers as the SQL adapter
+    for granularity in ("day", "week", "month", "year"):
+        assert snap.group_sum("2024-01-01", "2025-01-01", granularity) == {
+            p: g for p, _, g in repo.get_series("2024-01-01", "2025-01-01", granularity) if g
+        }
+    assert snap.group_sum("2024-03-01", "2024-04-01", "month", by_category=True) == {
+        ("2024-03", r["category"]): r["total"] for r in repo.get_expenses_by_category(year="2024", month="03")
+    }
+    assert sorted(snap.values("2024-01-01", "2025-01-01")) == [5.0, 10.0, 30.0, 40.0]
+    repo.close()
+
+
+def test_trends_on_columnar_snapshot(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "t.db")
+    _seed(repo)
+    snap = ColumnarSnapshot()
+    rs = ReportService(repo, analytics=lambda: snap.refresh(repo.conn))
+
+    data = rs.trends("2024-01", "2024-04", window=2, percentiles=(50, 100))
+    assert data["periods"] == ["2024-01", "2024-02", "2024-03", "2024-04"]
+    assert data["gastos"] == rs.series("2024-01", "2024-04")["gastos"] == [10.0, 30.0, 40.0, 0.0]
+    assert data["rolling_gastos"] == [10.0, 20.0, 35.0, 20.0]
+    assert data["categories"] == {"Super": [10.0, 0.0, 40.0, 0.0], "Taxi": [0.0, 30.0, 0.0, 0.0]}
+    assert data["percentiles"] == {"p50": 30.0, "p100": 40.0}
+    assert rs.trends("2024-01", "2024-01", "week")["periods"][0] == "2024-01-01"
+    repo.close()
@@ -0,0 +1,144 @@
+import pytest
+
+from src import cli
+from src.core.domain.entities import Movement
+from src.core.services.report_service import ReportService
+from src.infrastructure.analytics.columnar import ColumnarSnapshot
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+
+
+def _fill(repo):
+    repo.save_many([
+        Movement(date="2019-03-01", type="Gasto", amount=10, category="Super", description="mercado viejo"),
+        Movement(date="2019-03-15", type="Gasto", amount=40, category="Arriendo"),
+        Movement(date="2019-12-31", type="Ingreso", amount=100, category="Sueldo"),
+        Movement(date="2020-01-05", type="Gasto", amount=7, category="Super", description="mercado nuevo"),
+        Movement(date="2020-02-01", type="Ingreso", amount=90, category="Sueldo"),
+    ])
+
+
+def _state(repo):
+    return (
+        repo.get_yearly_aggregates("2019"),
+        repo.get_monthly_carryover("03", "2019"),
+        repo.get_expenses_by_category(year="2019"),
+        repo.get_years(),
+        repo.find_by_criteria(),
+        repo.find_by_criteria(date_from="2019-03-01", date_to="2019-03-31"),
+        repo.find_by_criteria(limit=2, after=("2019-12-31", 3)),
+        repo.get_top_expenses("03", "2019"),
+    )
+
+
+def test_archive_keeps_reports_and_listings_and_restore_brings_rows_back(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "a.db")
+    _fill(repo)
+    before = _state(repo)
+
+    assert repo.archive_year("2019") == 3
+    assert (tmp_path / "a.2019.db").exists()
+    assert repo.conn.execute("SELECT COUNT(*) FROM main.movements").fetchone()[0] == 2
+    assert _state(repo) == before
+    assert [r["year"] for r in repo.list_archived_years()] == ["2019"]
+    # La búsqueda de texto sólo cubre los años vivos
+    assert [r["description"] for r in repo.find_by_criteria(q="mercado")] == ["mercado nuevo"]
+
+    # Otra conexión adjunta el archivo al abrirse
+    other = SQLiteMovementRepository(db_path=tmp_path / "a.db")
+    assert _state(other) == before
+    other.close()
+
+    assert repo.restore_year("2019") == 3
+    assert not (tmp_path / "a.2019.db").exists()
+    assert repo.list_archived_years() == []
+    assert _state(repo) == before
+    assert len(repo.find_by_criteria(q="mercado")) == 2
+    repo.close()
+
+
+def test_archived_years_survive_rollup_rebuild_and_feed_the_columnar_copy(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "a.db")
+    _fill(repo)
+    expected = repo.get_yearly_aggregates("2019")
+    snap = ColumnarSnapshot().refresh(repo.conn)
+    assert len(snap) == 5
+    repo.archive_year("2019")
+    repo.rebuild_rollups()
+    assert repo.get_yearly_aggregates("2019") == expected
+    assert len(snap.refresh(repo.conn)) == 5
+
+    rs = ReportService(repo)
+    assert rs.yearly_summary("2019") == ReportService(repo, analytics=lambda: snap.refresh(repo.conn)).yearly_summary("2019")
+    repo.close()
+
+
+def test_archive_rejects_open_archived_or_empty_years(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "a.db")
+    _fill(repo)
+    with pytest.raises(ValueError):
+        repo.archive_year("9999")
+    with pytest.raises(ValueError):
+        repo.archive_year("2018")
+    with pytest.raises(ValueError):
+        repo.restore_year("2019")
+    repo.archive_year("2019")
+    with pytest.raises(ValueError):
+        repo.archive_year("2019")
+    repo.close()
+
+
+def test_cli_archive_list_and_restore(tmp_path, capsys):
+    db_file = tmp_path / "a.db"
+    repo = SQLiteMovementRepository(db_path=db_file)
+    _fill(repo)
+    repo.close()
+
+    assert cli.archive_main(["2019", "--db", str(db_file)]) == 0
+    assert cli.archive_main(["2019", "--db", str(db_file)]) == 1
+    assert cli.archives_main(["--db", str(db_file)]) == 0
+    assert "a.2019.db" in capsys.readouterr().out
+    assert cli.restore_main(["2019", "--db", str(db_file)]) == 0
+    assert "restaurado: 3 movimientos" in capsys.readouterr().out
+
+
+def test_pooled_connections_resync_only_when_the_archive_list_changes(tmp_path):
+    from src.infrastructure.database.sqlite_adapter import get_pool
+
+    db_file = tmp_path / "a.db"
+    repo = SQLiteMovementRepository(db_path=db_file)
+    _fill(repo)
+    pool = get_pool(db_file, "archive-test", 1)
+
+    def pooled_rows():
+        r = SQLiteMovementRepository(pool=pool)
+        try:
+            return (r._archive_state()["version"], len(r.find_by_criteria()),
+                    r.conn.execute("SELECT COUNT(*) FROM movements_all").fetchone()[0])
+        finally:
+            r.close()
+
+    v0, *counts = pooled_rows()
+    assert counts == [5, 5]
+    repo.archive_year("2019")
+    v1, *counts = pooled_rows()
+    assert v1 != v0 and counts == [5, 5]
+    assert pooled_rows()[0] == v1
+    # Tras restaurar, la vista de la conexión del pool deja de leer el archivo borrado
+    repo.restore_year("2019")
+    assert pooled_rows()[1:] == (5, 5)
+    assert repo.conn.execute("SELECT COUNT(*) FROM movements_all").fetchone()[0] == 5
+    pool.close()
+    repo.close()
+
+
+def test_idempotency_keys_follow_archived_rows(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "a.db")
+    _fill(repo)
+    [(kept, created)] = repo.save_all([Movement(date="2019-06-01", type="Gasto", amount=3, category="Super", idempotency_key="k-2019")])
+    repo.archive_year("2019")
+    retry = Movement(date="2019-06-01", type="Gasto", amount=3, category="Super", idempotency_key="k-2019")
+    assert repo.save_all([retry]) == [(kept, False)]
+    repo.restore_year("2019")
+    assert repo.conn.execute("SELECT id FROM movements WHERE idempotency_key = 'k-2019'").fetchone() == (kept,)
+    assert repo.save_all([retry]) == [(kept, False)]
+    repo.close()
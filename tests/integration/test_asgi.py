@@ -0,0 +1,163 @@
+import asyncio
+import json
+import threading
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks import load_test
+from src.app import app
+from src.asgi import _PENDING_CHUNKS, ASGIApp
+
+
+def _request(asgi, method, path, body=b"", headers=()):
+    """Ejecuta una petición contra la app ASGI; devuelve (status, headers, cuerpo, nº de trozos)."""
+    path, _, query = path.partition("?")
+    scope = {"type": "http", "method": method, "path": path, "query_string": query.encode(),
+             "headers": [(k.lower().encode(), v.encode()) for k, v in headers], "http_version": "1.1"}
+    messages = [{"type": "http.request", "body": body[:3], "more_body": True},
+                {"type": "http.request", "body": body[3:], "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi(scope, receive, send))
+    start = sent[0]
+    chunks = [m["body"] for m in sent[1:]]
+    assert sent[-1]["more_body"] is False
+    return start["status"], dict(start["headers"]), b"".join(chunks), len(chunks)
+
+
+def test_asgi_serves_reports_writes_and_streams(tmp_path):
+    app.config.update(DB_PATH=tmp_path / "asgi.db")
+    asgi = ASGIApp(app, db_threads=2, fx_threads=1)
+    try:
+        body = json.dumps({"date": "2024-03-01", "type": "Gasto", "amount": 10, "category": "Super"}).encode()
+        status, _, _, _ = _request(asgi, "POST", "/movements", body, [("Content-Type", "application/json")])
+        assert status == 201
+
+        status, headers, data, _ = _request(asgi, "GET", "/reports/balance?month=03&year=2024")
+        assert status == 200 and json.loads(data)["gastos"] == 10.0
+        status, _, _, _ = _request(asgi, "GET", "/reports/balance?month=03&year=2024",
+                                   headers=[("If-None-Match", headers[b"etag"].decode())])
+        assert status == 304
+
+        status, _, data, chunks = _request(asgi, "GET", "/movements?from=2024-01-01&to=2024-12-31")
+        assert status == 200 and [m["amount"] for m in json.loads(data)] == [10.0]
+        assert chunks > 1  # la respuesta en streaming se envía por trozos
+    finally:
+        asgi.close()
+        app.config.pop("DB_PATH", None)
+
+
+def test_asgi_concurrent_requests_share_bounded_pool(tmp_path):
+    app.config.update(DB_PATH=tmp_path / "asgi_many.db")
+    asgi = ASGIApp(app, db_threads=2, fx_threads=1)
+
+    async def many():
+        async def one():
+            sent = []
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                sent.append(message)
+
+            scope = {"type": "http", "method": "GET", "path": "/reports/years", "query_string": b"", "headers": []}
+            await asgi(scope, receive, send)
+            return sent[0]["status"]
+
+        return await asyncio.gather(*(one() for _ in range(50)))
+
+    try:
+        assert asyncio.run(many()) == [200] * 50
+        assert asgi.executors["db"]._max_workers == 2
+    finally:
+        asgi.close()
+        app.config.pop("DB_PATH", None)
+
+
+def test_asgi_cancelled_request_stops_the_view_and_leaves_no_pending_tasks():
+    finished = threading.Event()
+
+    def endless(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        try:
+            for _ in range(10 ** 6):
+                yield b"x"
+        finally:
+            finished.set()
+
+    def broken(environ, start_response):
+        raise RuntimeError("vista rota")
+
+    async def scenario():
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def stalled_send(message):
+            await asyncio.Event().wait()  # un cliente que nunca lee
+
+        scope = {"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": []}
+        task = asyncio.ensure_future(ASGIApp(endless, db_threads=1, fx_threads=1)(scope, receive, stalled_send))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+        # La vista termina con la cola llena y el envío falla (cliente desconectado):
+        # antes quedaba pendiente la tarea que encolaba el fin
+        async def failing_send(message):
+            await asyncio.sleep(0.05)
+            raise OSError("desconectado")
+
+        short = lambda environ, start_response: (start_response("200 OK", []), [b"x"] * _PENDING_CHUNKS)[1]
+        try:
+            await ASGIApp(short, db_threads=1, fx_threads=1)(scope, receive, failing_send)
+        except OSError:
+            pass
+        await asyncio.sleep(0.01)
+        pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+        async def send(message):
+            pass
+
+        try:
+            await ASGIApp(broken, db_threads=1, fx_threads=1)(scope, receive, send)
+        except RuntimeError as e:
+            return pending, str(e)
+
+    pending, error = asyncio.run(scenario())
+    assert finished.wait(2)
+    assert pending == []
+    assert error == "vista rota"
+
+
+class _ThreadingServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def test_load_test_smoke(tmp_path):
+    app.config.update(DB_PATH=tmp_path / "load.db")
+    server = make_server("127.0.0.1", 0, app, server_class=_ThreadingServer, handler_class=_QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        result = asyncio.run(load_test.run_level(f"http://127.0.0.1:{server.server_port}", 5, 0.3, ["/reports/years"]))
+        assert result["requests"] > 0 and result["errors"] == 0
+        assert result["p50_ms"] is not None
+    finally:
+        server.shutdown()
+        server.server_close()
+        app.config.pop("DB_PATH", None)
@@ -0,0 +1,20 @@
+import json
+
+from benchmarks import suite
+
+
+def test_benchmark_suite_smoke(tmp_path):
+    from src.app import app
+
+    out = tmp_path / "bench.json"
+    try:
+        assert suite.main(["--sizes", "300", "--repeat", "1", "--out", str(out)]) == 0
+        report = json.loads(out.read_text(encoding="utf-8"))
+        names = {r["name"] for r in report["results"]}
+        assert {"save", "import_rows", "get_monthly_carryover", "route.dashboard", "route.dashboard.304"} <= names
+
+        # the same run compared against itself with a huge threshold has no regressions
+        assert suite.main(["--sizes", "300", "--repeat", "1", "--out", str(tmp_path / "b.json"),
+                           "--compare", str(out), "--threshold", "1000"]) == 0
+    finally:
+        app.config.pop("DB_PATH", None)
@@ -0,0 +1,44 @@
+from src.app import _category_cache, app
+from src.core.domain.entities import Movement
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+
+
+def test_category_cache_uses_shared_version(tmp_path):
+    db = tmp_path / "cats.db"
+    app.config.update(DB_PATH=db)
+    try:
+        client = app.test_client()
+        client.post("/categories", json={"type": "Gasto", "name": "Super"})
+        names = lambda: [c["name"] for c in client.get("/categories?type=Gasto").get_json()]
+        assert names() == ["Super"]
+        hits = _category_cache.hits
+        assert names() == ["Super"]
+        assert _category_cache.hits == hits + 1
+
+        # another process (own connection) writes: the version stamp invalidates this worker's cache
+        other = SQLiteMovementRepository(db_path=db)
+        version = other.get_category_version()
+        other.save(Movement(date="2024-01-01", type="Gasto", amount=5, category="Super"))
+        assert other.get_category_version() == version  # movements alone do not touch categories
+        other.add_category("Gasto", "Arriendo")
+        assert names() == ["Arriendo", "Super"]
+        # categories created implicitly by a movement also count
+        other.save(Movement(date="2024-01-02", type="Gasto", amount=5, category="Ocio"))
+        cats = other.list_all_categories()
+        other.update_category(cats[0]["id"], "Vivienda")
+        other.close()
+        assert names() == ["Ocio", "Super", "Vivienda"]
+        assert [c["name"] for c in client.get("/categories/all", headers={"Accept": "application/json"}).get_json()] == ["Ocio", "Super", "Vivienda"]
+    finally:
+        app.config.pop("DB_PATH", None)
+
+
+def test_index_inlines_categories(tmp_path):
+    app.config.update(DB_PATH=tmp_path / "inline.db")
+    try:
+        client = app.test_client()
+        client.post("/categories", json={"type": "Ingreso", "name": "Honorarios"})
+        html = client.get("/").get_data(as_text=True)
+        assert '"name": "Honorarios"' in html and '"type": "Ingreso"' in html
+    finally:
+        app.config.pop("DB_PATH", None)
@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from src.infrastructure.database.connection_pool import ConnectionPool, PoolTimeoutError
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository, get_pool, init_schema
+from src.core.domain.entities import Movement
+
+
+def test_pool_reuses_connections_and_initializes_once(tmp_path):
+    calls = []
+
+    def initializer(conn):
+        calls.append(conn)
+        init_schema(conn)
+
+    pool = ConnectionPool(tmp_path / "pool.db", max_size=2, initializer=initializer)
+    c1 = pool.acquire()
+    pool.release(c1)
+    c2 = pool.acquire()
+    assert c2 is c1
+    c3 = pool.acquire()
+    assert c3 is not c1
+    pool.release(c2)
+    pool.release(c3)
+    assert len(calls) == 1
+    assert pool.stats()["open"] == 2
+    pool.close()
+
+
+def test_pool_max_size_times_out(tmp_path):
+    pool = ConnectionPool(tmp_path / "pool.db", max_size=1, acquire_timeout=0.05)
+    c1 = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    # releasing from another thread wakes up a waiter
+    pool.acquire_timeout = 2.0
+    t = threading.Timer(0.05, pool.release, args=(c1,))
+    t.start()
+    c2 = pool.acquire()
+    assert c2 is c1
+    pool.release(c2)
+    pool.close()
+
+
+def test_pool_evicts_idle_connections(tmp_path):
+    pool = ConnectionPool(tmp_path / "pool.db", max_size=2, idle_timeout=0.0)
+    c1 = pool.acquire()
+    pool.release(c1)
+    assert pool.stats()["open"] == 0
+    pool.close()
+
+
+def test_repository_with_pool_returns_connection_on_close(tmp_path):
+    pool = get_pool(tmp_path / "repo.db")
+    repo = SQLiteMovementRepository(pool=pool)
+    mid = repo.save(Movement(date="2024-01-15", type="Ingreso", amount=10, category="Sueldo"))
+    repo.close()
+    repo.close()  # idempotent
+    assert pool.stats() == {"open": 1, "idle": 1, "in_use": 0, "max_size": pool.max_size}
+
+    repo2 = SQLiteMovementRepository(pool=get_pool(tmp_path / "repo.db"))
+    assert [r["id"] for r in repo2.find_by_criteria()] == [mid]
+    repo2.close()
+    pool.close()
@@ -0,0 +1,98 @@
+import time
+
+from src.app import app, _fx_services
+from src.core.domain.fx import FxQuote
+from src.core.ports.fx import FxProviderInterface
+from src.core.services.fx_service import FxService
+from src.infrastructure.database.fx_store import SQLiteFxRateStore
+from src.infrastructure.database.sqlite_adapter import get_pool
+
+
+class StubProvider(FxProviderInterface):
+    def __init__(self):
+        self.calls = 0
+
+    def fetch_latest(self, base):
+        self.calls += 1
+        return FxQuote(base=base, rates={"USD": 0.00025, "EUR": 0.00023}, date="2024-03-01")
+
+
+class DownProvider(FxProviderInterface):
+    def fetch_latest(self, base):
+        raise OSError("down")
+
+
+def test_fx_latest_endpoint_caches_and_persists(tmp_path):
+    db_file = tmp_path / "fx.db"
+    provider = StubProvider()
+    app.config.update(DB_PATH=db_file, FX_PROVIDER=provider)
+    try:
+        client = app.test_client()
+        for _ in range(3):
+            resp = client.get("/fx/latest?base=COP&symbols=USD")
+            assert resp.status_code == 200
+            assert resp.get_json() == {"base": "COP", "date": "2024-03-01", "rates": {"USD": 0.00025}, "stale": False}
+        assert provider.calls == 1
+    finally:
+        _fx_services.pop(db_file, None)
+        app.config.pop("FX_PROVIDER", None)
+        app.config.pop("DB_PATH", None)
+
+    # A restarted worker with the provider down still answers from the stored rates
+    fx = FxService(DownProvider(), store=SQLiteFxRateStore(get_pool(db_file)))
+    assert fx.latest("COP", ["EUR"]).rates == {"EUR": 0.00023}
+
+
+def test_fx_latest_rejects_unsupported_base_without_calling_the_provider(tmp_path):
+    db_file = tmp_path / "fx.db"
+    provider = StubProvider()
+    app.config.update(DB_PATH=db_file, FX_PROVIDER=provider)
+    try:
+        client = app.test_client()
+        # Lowercase codes are normalized, not rejected
+        assert client.get("/fx/latest?base=cop&symbols=USD").status_code == 200
+        for base in ("XYZ", "cop1", "%27%3B%20DROP"):
+            resp = client.get(f"/fx/latest?base={base}&symbols=USD")
+            assert resp.status_code == 400
+            assert "no soportada" in resp.get_json()["error"]
+        assert provider.calls == 1
+        assert _fx_services[db_file].breaker.state == "closed"
+    finally:
+        _fx_services.pop(db_file, None)
+        app.config.pop("FX_PROVIDER", None)
+        app.config.pop("DB_PATH", None)
+
+
+def test_post_movement_in_foreign_currency_takes_the_current_rate(tmp_path):
+    db_file = tmp_path / "fx.db"
+    app.config.update(DB_PATH=db_file, FX_PROVIDER=StubProvider())
+    try:
+        client = app.test_client()
+        resp = client.post("/movements", json={"date": "2024-03-01", "type": "Gasto", "amount": 10, "category": "Viaje", "currency": "USD"})
+        assert resp.status_code == 201
+        resp = client.post("/movements", json={"date": "2024-03-01", "type": "Gasto", "amount": 10, "category": "Viaje", "currency": "XXX"})
+        assert resp.status_code == 400
+        assert resp.get_json()["error"] == "La tasa de cambio es requerida para movimientos en XXX"
+        rows = client.get("/movements").get_json()
+        assert [(r["currency"], r["fx_rate"]) for r in rows] == [("USD", 4000.0)]
+    finally:
+        _fx_services.pop(db_file, None)
+        app.config.pop("FX_PROVIDER", None)
+        app.config.pop("DB_PATH", None)
+
+
+def test_rate_lookup_does_not_wait_for_the_request_pool(tmp_path):
+    # A single-connection request pool: the rate store must not borrow a second one from it
+    db_file = tmp_path / "fx_pool.db"
+    get_pool(db_file, "main", 1).acquire_timeout = 1.0
+    app.config.update(DB_PATH=db_file, FX_PROVIDER=StubProvider())
+    try:
+        started = time.perf_counter()
+        resp = app.test_client().post("/movements", json={"date": "2024-03-02", "type": "Gasto", "amount": 1, "category": "Viaje", "currency": "EUR"})
+        assert resp.status_code == 201
+        assert time.perf_counter() - started < 1.0
+        assert SQLiteFxRateStore(get_pool(db_file, "fx", 1)).load("COP") is not None
+    finally:
+        _fx_services.pop(db_file, None)
+        app.config.pop("FX_PROVIDER", None)
+        app.config.pop("DB_PATH", None)
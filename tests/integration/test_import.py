@@ -0,0 +1,77 @@
+import io
+
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+from src.infrastructure.importers.parsers import parse_csv, parse_json
+from src.core.services.import_service import ImportService
+from src import cli
+
+
+CSV = """date,type,amount,category,description,currency,fx_rate
+2024-01-15,Gasto,20,Super,Mercado,,
+15/01/2024,Gasto,20,Super,,,
+2024-01-16,Ingreso,0,Sueldo,,,
+2024-01-17,Gasto,30,,,,
+2024-02-01,Ingreso,100,Sueldo,,USD,4000
+"""
+
+
+def test_import_reports_row_errors_and_inserts_valid_rows(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "imp.db")
+    result = ImportService(repo).import_rows(parse_csv(io.StringIO(CSV)), batch_size=2)
+    assert result.inserted == 2
+    assert [e.row for e in result.errors] == [2, 3, 4]
+    assert result.errors[0].error == "Formato de fecha incorrecto. Use AAAA-MM-DD"
+    rows = repo.find_by_criteria()
+    assert [(r["date"], r["currency"], r["fx_rate"]) for r in rows] == [("2024-02-01", "USD", 4000.0), ("2024-01-15", "COP", None)]
+    # rollups are maintained by the same transaction
+    assert repo.get_monthly_aggregates("01", "2024") == {"Gasto": 20.0}
+    repo.close()
+
+
+def test_import_keeps_valid_ndjson_lines_around_bad_lines_and_non_finite_amounts(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "imp.db")
+    ndjson = "\n".join([
+        '{"date": "2024-01-15", "type": "Gasto", "amount": 20, "category": "Super"}',
+        '{"date": "2024-01-16", "type": "Gasto", "amount": 5,',
+        '{"date": "2024-01-17", "type": "Gasto", "amount": NaN, "category": "Super"}',
+        '{"date": "2024-01-18", "type": "Gasto", "amount": "inf", "category": "Super"}',
+        '{"date": "2024-01-19", "type": "Gasto", "amount": 7, "category": ["Super"]}',
+        '{"date": "2024-01-20", "type": "Gasto", "amount": 9, "category": "Super"}',
+    ])
+    result = ImportService(repo).import_rows(parse_json(io.StringIO(ndjson)))
+    assert result.inserted == 2
+    assert [e.row for e in result.errors] == [2, 3, 4, 5]
+    assert [r["amount"] for r in repo.find_by_criteria()] == [9.0, 20.0]
+    repo.close()
+
+
+def test_import_resolves_fx_rates_before_the_write_transaction(tmp_path):
+    from src.core.domain.fx import FxQuote
+    from src.core.services.fx_service import FxService
+    from src.infrastructure.database.fx_store import SQLiteFxRateStore
+    from src.infrastructure.database.sqlite_adapter import get_pool
+
+    class Provider:
+        def fetch_latest(self, base):
+            return FxQuote(base=base, rates={"USD": 0.00025}, date="2024-03-01")
+
+    db_file = tmp_path / "imp_fx.db"
+    repo = SQLiteMovementRepository(db_path=db_file)
+    store = SQLiteFxRateStore(get_pool(db_file, "fx", 1))
+    csv = "date,type,amount,category,currency\n2024-03-01,Gasto,10,Viaje,usd\n2024-03-02,Gasto,10,Viaje,XXX\n"
+    result = ImportService(repo, fx_service=FxService(Provider(), store=store)).import_rows(parse_csv(io.StringIO(csv)))
+    assert result.inserted == 1
+    assert [e.row for e in result.errors] == [2]
+    assert [r["fx_rate"] for r in repo.find_by_criteria()] == [4000.0]
+    # the quote was stored: saving it did not wait for the import's write lock
+    assert store.load("COP").rates == {"USD": 0.00025}
+    repo.close()
+
+
+def test_cli_import(tmp_path, capsys):
+    csv_file = tmp_path / "mov.csv"
+    csv_file.write_text(CSV, encoding="utf-8")
+    db_file = tmp_path / "cli.db"
+    assert cli.import_main([str(csv_file), "--db", str(db_file)]) == 1
+    out = capsys.readouterr().out
+    assert "Movimientos importados: 2  Filas con error: 3" in out
@@ -0,0 +1,92 @@
+import pytest
+
+from src.app import app
+from src.core.domain.entities import Movement
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+
+
+def _expected_balance(repo, day):
+    return repo.conn.execute(
+        "SELECT COALESCE(SUM(CASE type WHEN 'Ingreso' THEN amount_base ELSE -amount_base END), 0) "
+        "FROM movements WHERE date <= ?", (day,)
+    ).fetchone()[0]
+
+
+def _ledger(repo):
+    return repo.conn.execute("SELECT day, net, balance FROM balance_ledger ORDER BY day").fetchall()
+
+
+def test_ledger_follows_in_order_and_out_of_order_writes(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "l.db")
+    repo.save(Movement(date="2023-05-01", type="Ingreso", amount=100, category="Sueldo"))
+    repo.save(Movement(date="2024-02-10", type="Gasto", amount=30, category="Super"))
+    assert _ledger(repo) == [("2023-05-01", 100.0, 100.0), ("2024-02-10", -30.0, 70.0)]
+
+    # Fuera de orden: los días posteriores se recalculan en la misma escritura
+    repo.save_many([Movement(date="2022-12-31", type="Ingreso", amount=5, category="Sueldo"),
+                    Movement(date="2024-02-10", type="Gasto", amount=10, category="Super")])
+    assert _ledger(repo) == [("2022-12-31", 5.0, 5.0), ("2023-05-01", 100.0, 105.0), ("2024-02-10", -40.0, 65.0)]
+    for day in ("2022-01-01", "2022-12-31", "2023-06-30", "2024-02-10", "2030-01-01"):
+        assert repo.get_balance_at(day) == _expected_balance(repo, day)
+
+    # SQL directo: el trigger marca el ledger; las lecturas lo calculan desde los rollups
+    # sin escribir y la siguiente escritura lo pone al día
+    repo.conn.execute("DELETE FROM movements WHERE date = '2023-05-01'")
+    repo.conn.commit()
+    assert repo.get_balance_at("2024-12-31") == -35.0
+    assert repo.get_monthly_carryover("02", "2024")["cumulative_net"] == -40.0
+    assert repo.get_balance_series(granularity="year") == [("2022", 5.0), ("2024", -35.0)]
+    assert not repo.conn.in_transaction
+    assert repo.conn.execute("SELECT ledger_from FROM data_version").fetchone()[0] is not None
+    repo.save(Movement(date="2025-01-01", type="Gasto", amount=1, category="Super"))
+    assert repo.conn.execute("SELECT ledger_from FROM data_version").fetchone()[0] is None
+    assert repo.get_balance_at("2024-12-31") == -35.0
+    repo.close()
+
+
+def test_carryover_from_ledger_matches_aggregates_and_survives_archive(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "l.db")
+    repo.save_many([
+        Movement(date="2019-11-20", type="Ingreso", amount=50, category="Sueldo"),
+        Movement(date="2020-01-15", type="Ingreso", amount=100, category="Sueldo"),
+        Movement(date="2020-02-03", type="Gasto", amount=30, category="Super"),
+        Movement(date="2020-03-09", type="Gasto", amount=20, category="Super"),
+    ])
+    assert repo.get_monthly_carryover("03", "2020") == {
+        "ingresos": 0, "gastos": 20.0, "previous_net": -30.0, "cumulative_net": 50.0,
+    }
+    assert repo.get_monthly_carryover("01", "2020")["previous_net"] == 0.0
+    before = _ledger(repo)
+    repo.archive_year("2019")
+    assert _ledger(repo) == before
+    assert repo.get_balance_at("2020-01-31") == 150.0
+    repo.close()
+
+
+@pytest.fixture
+def client(tmp_path):
+    app.config.update(DB_PATH=tmp_path / "api.db")
+    try:
+        yield app.test_client()
+    finally:
+        app.config.pop("DB_PATH", None)
+
+
+def test_balance_endpoints(client):
+    client.post("/movements", json={"date": "2023-12-01", "type": "Ingreso", "amount": 100, "category": "Sueldo"})
+    client.post("/movements", json={"date": "2024-02-01", "type": "Gasto", "amount": 40, "category": "Super"})
+
+    assert client.get("/reports/balance-at?date=2024-01-31").get_json() == {"date": "2024-01-31", "balance": 100.0}
+    assert client.get("/reports/balance-at?date=2024-02-01").get_json()["balance"] == 60.0
+    assert client.get("/reports/balance-at").status_code == 400
+    assert client.get("/reports/balance-at?date=2024-2-1").status_code == 400
+
+    series = client.get("/reports/balance-series").get_json()
+    assert series["periods"] == ["2023-12", "2024-01", "2024-02"]
+    assert series["balances"] == [100.0, 100.0, 60.0]
+    assert client.get("/reports/balance-series?granularity=year").get_json()["balances"] == [100.0, 60.0]
+
+    # The dashboard reads the same ledger-backed balance as /reports/balance
+    dashboard = client.get("/reports/dashboard?month=02&year=2024").get_json()["balance"]
+    assert dashboard == client.get("/reports/balance?month=02&year=2024").get_json()
+    assert dashboard["cumulative_net"] == -40.0
@@ -0,0 +1,41 @@
+import logging
+
+from src.app import app
+from src.infrastructure.database import instrumentation
+from src.infrastructure.metrics import http_request_duration
+
+
+def test_metrics_endpoint_reports_routes_sql_and_pool(tmp_path):
+    app.config.update(DB_PATH=tmp_path / "metrics.db")
+    try:
+        client = app.test_client()
+        client.post("/movements", json={"date": "2024-03-01", "type": "Gasto", "amount": 10, "category": "Super"})
+        # rutas sin coincidencia comparten una sola serie, no una por URL
+        before = http_request_duration.count(("unmatched", "GET", "404"))
+        client.get("/no-existe/1")
+        client.get("/no-existe/2")
+        assert http_request_duration.count(("unmatched", "GET", "404")) == before + 2
+
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/plain"
+        text = resp.get_data(as_text=True)
+        assert 'http_request_duration_seconds_count{route="/movements",method="POST",status="201"}' in text
+        assert "sqlite_query_duration_seconds_bucket{query=\"INSERT INTO movements" in text
+        assert "db_pool_acquire_seconds_count" in text
+        assert 'db_pool_connections{db="metrics.db",pool="main",state="open"}' in text
+    finally:
+        app.config.pop("DB_PATH", None)
+
+
+def test_slow_query_log(tmp_path, caplog):
+    app.config.update(DB_PATH=tmp_path / "slow.db")
+    previous = instrumentation.SLOW_QUERY_SECONDS
+    instrumentation.set_slow_query_threshold(0.000001)
+    try:
+        with caplog.at_level(logging.WARNING, logger="finanzas.sql"):
+            app.test_client().get("/reports/years")
+        assert any("Consulta lenta" in r.getMessage() for r in caplog.records)
+    finally:
+        instrumentation.SLOW_QUERY_SECONDS = previous
+        app.config.pop("DB_PATH", None)
@@ -0,0 +1,99 @@
+import sqlite3
+
+from src.infrastructure.database.migrations import LATEST_VERSION, get_schema_version, migrate
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+from src.core.domain.entities import Movement
+from src import cli
+
+
+def test_fresh_db_is_migrated_to_latest(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "m.db"))
+    applied = migrate(conn)
+    assert applied == list(range(1, LATEST_VERSION + 1))
+    assert get_schema_version(conn) == LATEST_VERSION
+    # already current: nothing to do
+    assert migrate(conn) == []
+    conn.close()
+
+
+def test_legacy_db_gets_missing_columns(tmp_path):
+    db_file = tmp_path / "legacy.db"
+    conn = sqlite3.connect(str(db_file))
+    conn.execute("CREATE TABLE movements (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, type TEXT NOT NULL, amount REAL NOT NULL, category TEXT NOT NULL, description TEXT)")
+    conn.execute("CREATE TABLE categories (id INTEGER PRIMARY KEY AUTOINCREMENT, type TEXT NOT NULL, name TEXT NOT NULL UNIQUE)")
+    conn.execute("INSERT INTO movements (date, type, amount, category) VALUES ('2023-05-01', 'Gasto', 10, 'Super')")
+    conn.commit()
+    conn.close()
+
+    repo = SQLiteMovementRepository(db_path=db_file)
+    repo.save(Movement(date="2024-01-15", type="Gasto", amount=5, category="Super", currency="USD", fx_rate=4000))
+    rows = repo.find_by_criteria()
+    assert {r["currency"] for r in rows} == {"COP", "USD"}
+    assert get_schema_version(repo.conn) == LATEST_VERSION
+    repo.close()
+
+
+def test_cli_migrate(tmp_path, capsys):
+    db_file = tmp_path / "cli.db"
+    assert cli.migrate_main(["--db", str(db_file)]) == 0
+    assert f"Versión del esquema: {LATEST_VERSION}" in capsys.readouterr().out
+
+
+def test_category_text_is_backfilled_to_foreign_key(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "fk.db"))
+    migrate(conn, target=5)
+    conn.execute("INSERT INTO categories (type, name) VALUES ('Gasto', 'Super')")
+    conn.execute("INSERT INTO movements (date, type, amount, category) VALUES ('2024-03-01', 'Gasto', 10, 'Super')")
+    conn.execute("INSERT INTO movements (date, type, amount, category) VALUES ('2024-03-02', 'Gasto', 4, 'Taxi')")
+    conn.execute("INSERT INTO movements (date, type, amount, category) VALUES ('2024-03-03', 'Ingreso', 90, 'Sueldo')")
+    conn.commit()
+
+    assert migrate(conn, target=6) == [6]
+    rows = conn.execute(
+        "SELECT m.amount, c.name, c.type FROM movements m JOIN categories c ON c.id = m.category_id ORDER BY m.id"
+    ).fetchall()
+    assert rows == [(10.0, "Super", "Gasto"), (4.0, "Taxi", "Gasto"), (90.0, "Sueldo", "Ingreso")]
+    columns = [r[1] for r in conn.execute("PRAGMA table_info(movements)")]
+    assert "category" not in columns
+    # rollups and search are rebuilt over the new schema
+    assert conn.execute("SELECT SUM(total) FROM movement_rollups WHERE type = 'Gasto'").fetchone()[0] == 14.0
+    assert conn.execute("SELECT rowid FROM movements_fts WHERE movements_fts MATCH 'taxi'").fetchall() == [(2,)]
+    conn.close()
+
+
+def test_amount_base_is_backfilled_from_fx_rate(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "base.db"))
+    migrate(conn, target=7)
+    conn.execute("INSERT INTO categories (type, name) VALUES ('Gasto', 'Viaje')")
+    conn.execute("INSERT INTO movements (date, type, amount, currency, fx_rate, category_id) VALUES ('2024-03-01', 'Gasto', 20, 'EUR', 4500, 1)")
+    conn.execute("INSERT INTO movements (date, type, amount, currency, fx_rate, category_id) VALUES ('2024-03-02', 'Gasto', 7, 'COP', NULL, 1)")
+    conn.commit()
+
+    migrate(conn)
+    assert conn.execute("SELECT amount_base FROM movements ORDER BY id").fetchall() == [(90000.0,), (7.0,)]
+    assert conn.execute("SELECT SUM(total_base) FROM movement_rollups").fetchone()[0] == 90007.0
+    conn.close()
+
+
+def test_legacy_foreign_rows_without_rate_are_flagged_until_a_rate_is_set(tmp_path, capsys):
+    db_file = tmp_path / "fx.db"
+    conn = sqlite3.connect(str(db_file))
+    migrate(conn, target=15)
+    conn.execute("INSERT INTO categories (type, name) VALUES ('Gasto', 'Viaje')")
+    conn.execute("INSERT INTO movements (date, type, amount, currency, fx_rate, category_id, amount_base) VALUES ('2024-03-01', 'Gasto', 20, 'USD', NULL, 1, 20)")
+    conn.execute("INSERT INTO movements (date, type, amount, currency, fx_rate, category_id, amount_base) VALUES ('2024-03-02', 'Gasto', 7, 'COP', NULL, 1, 7)")
+    conn.commit()
+    conn.close()
+
+    repo = SQLiteMovementRepository(db_path=db_file)
+    assert [(r["id"], r["currency"]) for r in repo.list_missing_fx_rates()] == [(1, "USD")]
+    assert repo.get_monthly_aggregates("03", "2024") == {"Gasto": 7.0}
+    assert repo.get_balance_at("2024-03-31") == -7.0
+
+    assert cli.fx_missing_main(["--set", "1", "4000", "--db", str(db_file)]) == 0
+    assert repo.list_missing_fx_rates() == []
+    assert repo.get_monthly_aggregates("03", "2024") == {"Gasto": 80007.0}
+    assert repo.get_balance_at("2024-03-31") == -80007.0
+    assert cli.fx_missing_main(["--set", "1", "4000", "--db", str(db_file)]) == 1
+    assert "no está pendiente" in capsys.readouterr().out
+    repo.close()
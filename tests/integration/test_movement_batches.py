@@ -0,0 +1,92 @@
+import pytest
+
+from src.app import app
+from src.core.domain.entities import Movement
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+
+
+@pytest.fixture
+def client(tmp_path):
+    app.config.update(DB_PATH=tmp_path / "batch.db")
+    try:
+        yield app.test_client()
+    finally:
+        app.config.pop("DB_PATH", None)
+
+
+def _count(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "batch.db")
+    try:
+        return repo.conn.execute("SELECT COUNT(*) FROM movements").fetchone()[0]
+    finally:
+        repo.close()
+
+
+def test_batch_returns_ids_and_errors_per_item(client, tmp_path):
+    batch = [
+        {"date": "2024-03-01", "type": "Gasto", "amount": 10, "category": "Super", "idempotency_key": "k1"},
+        {"date": "2024-3-1", "type": "Gasto", "amount": 10, "category": "Super"},
+        {"date": "2024-03-02", "type": "Ingreso", "amount": 50, "category": "Sueldo", "idempotency_key": "k2"},
+        {"date": "2024-03-02", "type": "Ingreso", "amount": 50, "category": "Sueldo", "idempotency_key": "k2"},
+        "no es un objeto",
+    ]
+    resp = client.post("/movements", json=batch)
+    assert resp.status_code == 201
+    body = resp.get_json()
+    assert [i["status"] for i in body["items"]] == ["created", "error", "created", "duplicate", "error"]
+    assert body["items"][1]["error"] == "Formato de fecha incorrecto. Use AAAA-MM-DD"
+    assert body["items"][3]["id"] == body["items"][2]["id"]
+    assert (body["created"], body["duplicates"], body["errors"]) == (2, 1, 2)
+
+    # Reintento completo tras un timeout: nada nuevo
+    retry = client.post("/movements", json=[batch[0], batch[2]])
+    assert retry.status_code == 200
+    assert [i["id"] for i in retry.get_json()["items"]] == [body["items"][0]["id"], body["items"][2]["id"]]
+    assert _count(tmp_path) == 2
+    assert client.get("/reports/balance?month=03&year=2024").get_json()["gastos"] == 10.0
+
+    assert client.post("/movements", json=[batch[1]]).status_code == 400
+    assert client.post("/movements", json=[{}] * 1001).status_code == 400
+
+
+def test_bad_items_are_reported_without_failing_the_batch(client, tmp_path):
+    ok = {"date": "2024-03-01", "type": "Gasto", "amount": 10, "category": "Super"}
+    resp = client.post("/movements", json=[
+        dict(ok, amount="NaN"),
+        dict(ok, fx_rate={}, currency="USD"),
+        dict(ok, category=["x"]),
+        ok,
+    ])
+    assert resp.status_code == 201
+    items = resp.get_json()["items"]
+    assert [i["status"] for i in items] == ["error", "error", "error", "created"]
+    assert items[0]["error"] == "El monto debe ser un valor numérico mayor a cero"
+    assert items[1]["error"] == "La tasa de cambio debe ser un número mayor a cero"
+    assert items[2]["error"] == "La categoría es requerida"
+    assert _count(tmp_path) == 1
+
+
+def test_single_movement_with_idempotency_header(client, tmp_path):
+    item = {"date": "2024-03-01", "type": "Gasto", "amount": 10, "category": "Super"}
+    first = client.post("/movements", json=item, headers={"Idempotency-Key": "abc"})
+    assert first.status_code == 201 and first.get_json()["status"] == "created"
+    again = client.post("/movements", json=item, headers={"Idempotency-Key": "abc"})
+    assert again.status_code == 200 and again.get_json() == {"id": first.get_json()["id"], "status": "duplicate"}
+    assert client.post("/movements", json=item).status_code == 201
+    assert _count(tmp_path) == 2
+
+    bad = client.post("/movements", json=dict(item, amount=-1))
+    assert bad.status_code == 400 and bad.get_json() == {"error": "El monto debe ser un valor numérico mayor a cero"}
+
+
+def test_save_all_commits_once_and_rejects_key_reuse_at_the_index(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "r.db")
+    results = repo.save_all([Movement(date="2024-01-0%d" % d, type="Gasto", amount=d, category="Super",
+                                      idempotency_key=f"m{d}") for d in range(1, 4)])
+    assert [created for _, created in results] == [True, True, True]
+    assert repo.get_data_version() == 1
+    assert repo.save_all([Movement(date="2024-01-09", type="Gasto", amount=1, category="Super", idempotency_key="m2")]) == [(results[1][0], False)]
+    assert repo.get_data_version() == 1
+    with pytest.raises(Exception):
+        repo.conn.execute("UPDATE movements SET idempotency_key = 'm1' WHERE idempotency_key = 'm3'")
+    repo.close()
@@ -0,0 +1,103 @@
+import sqlite3
+import threading
+
+import pytest
+
+from src.core.domain.entities import Movement
+from src.infrastructure.database.connection_pool import ConnectionPool
+from src.infrastructure.database.pragmas import apply_profile, profile_name
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository, init_schema
+
+
+def _pragma(conn, name):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_profile_from_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv("SQLITE_PROFILE", "durable")
+    repo = SQLiteMovementRepository(db_path=tmp_path / "p.db")
+    assert _pragma(repo.conn, "journal_mode") == "wal"
+    assert _pragma(repo.conn, "synchronous") == 2  # FULL
+    assert _pragma(repo.conn, "busy_timeout") == 5000
+    assert _pragma(repo.conn, "temp_store") == 2  # MEMORY
+    repo.close()
+
+    monkeypatch.setenv("SQLITE_PROFILE", "nope")
+    with pytest.raises(ValueError):
+        profile_name()
+
+
+def test_profile_applied_to_every_pooled_connection(tmp_path):
+    pool = ConnectionPool(tmp_path / "pool.db", max_size=2, initializer=init_schema,
+                          on_connect=lambda conn: apply_profile(conn, "balanced"))
+    c1, c2 = pool.acquire(), pool.acquire()
+    for conn in (c1, c2):
+        assert _pragma(conn, "journal_mode") == "wal"
+        assert _pragma(conn, "synchronous") == 1  # NORMAL
+        assert _pragma(conn, "cache_size") == -16000
+    pool.release(c1)
+    pool.release(c2)
+    pool.close()
+
+
+def _reader(path):
+    # Sin busy_timeout: si hubiera que esperar un lock, falla en el acto
+    return sqlite3.connect(str(path), timeout=0)
+
+
+def test_reads_not_blocked_during_bulk_write_in_wal(tmp_path):
+    path = tmp_path / "wal.db"
+    setup = SQLiteMovementRepository(db_path=path)  # perfil por defecto: balanced
+    setup.save(Movement(date="2024-01-01", type="Gasto", amount=1, category="Super"))
+    setup.close()
+    in_transaction, reader_done = threading.Event(), threading.Event()
+
+    def rows():
+        for i in range(5000):
+            yield Movement(date="2024-01-02", type="Gasto", amount=i + 1, category="Super")
+        in_transaction.set()  # el lote ya está escrito y la transacción sigue abierta
+        reader_done.wait(5)
+        yield Movement(date="2024-01-03", type="Gasto", amount=1, category="Super")
+
+    def bulk_write():
+        writer = SQLiteMovementRepository(db_path=path)
+        try:
+            writer.save_many(rows(), batch_size=1000)
+        finally:
+            writer.close()
+
+    t = threading.Thread(target=bulk_write)
+    t.start()
+    try:
+        assert in_transaction.wait(5)
+        reader = _reader(path)
+        # Sin esperar ni fallar por lock: ve la última foto confirmada
+        assert reader.execute("SELECT COUNT(*) FROM movements").fetchone()[0] == 1
+        reader.close()
+    finally:
+        reader_done.set()
+        t.join(5)
+    reader = _reader(path)
+    assert reader.execute("SELECT COUNT(*) FROM movements").fetchone()[0] == 5002
+    reader.close()
+
+
+@pytest.mark.parametrize("profile, blocked", [("legacy", True), ("balanced", False)])
+def test_exclusive_writer_blocks_readers_only_without_wal(tmp_path, profile, blocked):
+    path = tmp_path / f"{profile}.db"
+    writer = SQLiteMovementRepository(db_path=path)
+    apply_profile(writer.conn, profile)
+    # El escritor en su fase de commit (lock EXCLUSIVE en modo rollback)
+    writer.conn.execute("BEGIN EXCLUSIVE")
+    writer.conn.execute("UPDATE data_version SET version = version + 1")
+    reader = _reader(path)
+    try:
+        if blocked:
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                reader.execute("SELECT version FROM data_version").fetchone()
+        else:
+            assert reader.execute("SELECT version FROM data_version").fetchone()[0] == 0
+    finally:
+        reader.close()
+        writer.conn.rollback()
+        writer.close()
@@ -1,5 +1,8 @@
+import pytest
+
 from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
 from src.core.domain.entities import Movement
+from src.core.domain.exceptions import CategoryInUseError
 
 
 def test_find_by_date_range_and_category(tmp_path):
@@ -22,3 +25,133 @@ def test_find_by_date_range_and_category(tmp_path):
     assert len(res2) == 2
 
     repo.close()
+
+
+def test_aggregates_use_date_ranges_and_indexes(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "test_idx.db")
+    repo.save(Movement(date="2023-12-31", type="Gasto", amount=7, category="Super"))
+    repo.save(Movement(date="2024-12-01", type="Ingreso", amount=100, category="Sueldo"))
+    repo.save(Movement(date="2024-12-31", type="Gasto", amount=30, category="Super"))
+    repo.save(Movement(date="2025-01-01", type="Gasto", amount=9, category="Super"))
+
+    assert repo.get_monthly_aggregates("12", "2024") == {"Ingreso": 100.0, "Gasto": 30.0}
+    assert repo.get_yearly_aggregates("2024")["12"] == {"Ingreso": 100.0, "Gasto": 30.0}
+    assert repo.get_daily_aggregates("12", "2024")["31"] == {"Gasto": 30.0, "Ingreso": 0.0}
+    assert repo.get_expenses_by_category("2024") == [{"category": "Super", "total": 30.0}]
+    assert [r["amount"] for r in repo.get_top_expenses("12", "2024")] == [30.0]
+
+    # Plans of the statements the reports actually run (the trace gets them with bound values)
+    statements = []
+    repo.conn.set_trace_callback(statements.append)
+    repo.get_monthly_aggregates("12", "2024")
+    repo.get_yearly_aggregates("2024")
+    repo.get_daily_aggregates("12", "2024")
+    repo.get_expenses_by_category("2024", "12")
+    repo.get_top_expenses("12", "2024")
+    repo.conn.set_trace_callback(None)
+    plans = [" ".join(r[3] for r in repo.conn.execute("EXPLAIN QUERY PLAN " + sql)) for sql in statements]
+    assert len(plans) == 5
+    for plan in plans[:4]:
+        assert "SEARCH movement_rollups USING PRIMARY KEY (day>? AND day<?)" in plan
+    assert "SEARCH m USING INDEX idx_movements_date_id (date>? AND date<?)" in plans[4]
+    assert not any("SCAN movement" in plan for plan in plans)
+
+    # Dropped on purpose by migration 6: by-category totals come from the rollups
+    indexes = {r[0] for r in repo.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "idx_movements_type_category_date" not in indexes
+    repo.close()
+
+
+def test_keyset_pagination_walks_all_rows_once(tmp_path):
+    from src.core.services.query_service import MovementQueryService
+
+    repo = SQLiteMovementRepository(db_path=tmp_path / "test_page.db")
+    ids = [repo.save(Movement(date=f"2024-01-{d:02d}", type="Gasto", amount=d, category="Super")) for d in (3, 1, 2, 2, 3)]
+    qs = MovementQueryService(repo)
+    seen, cursor = [], None
+    while True:
+        page = qs.page(after=cursor, limit=2)
+        seen.extend(r["id"] for r in page["items"])
+        cursor = page["next"]
+        if cursor is None:
+            break
+    assert seen == [r["id"] for r in repo.find_by_criteria()]
+    assert sorted(seen) == sorted(ids)
+    assert [r["id"] for r in qs.iter(after="2024-01-02,3")] == [ids[1]]
+    repo.close()
+
+
+def test_full_text_search_over_description_and_category(tmp_path):
+    from src.core.services.query_service import MovementQueryService
+
+    repo = SQLiteMovementRepository(db_path=tmp_path / "test_fts.db")
+    a = repo.save(Movement(date="2024-01-10", type="Gasto", amount=5, category="Cafetería", description="Tinto"))
+    b = repo.save(Movement(date="2024-01-11", type="Gasto", amount=8, category="Comida", description="Café con pan"))
+    repo.save(Movement(date="2024-01-12", type="Gasto", amount=9, category="Transporte", description="Bus"))
+    repo.conn.execute("UPDATE movements SET description = 'Taxi' WHERE description = 'Bus'")
+    repo.conn.commit()
+
+    qs = MovementQueryService(repo)
+    assert {r["id"] for r in qs.find(q="cafe")} == {a, b}
+    assert [r["id"] for r in qs.find(q="cafe pan")] == [b]
+    assert [r["description"] for r in qs.find(q="taxi")] == ["Taxi"]
+    assert qs.find(q="bus") == []
+    assert qs.find(q='"NEAR(') == []
+
+    first = qs.page(q="cafe", limit=1)
+    second = qs.page(q="cafe", limit=1, after=first["next"])
+    assert first["next"].startswith("r:")
+    assert {first["items"][0]["id"], second["items"][0]["id"]} == {a, b}
+    assert second["next"] is None
+    repo.close()
+
+
+def test_bulk_insert_indexes_new_rows_once_and_leaves_the_trigger_on(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "test_fts_bulk.db")
+    repo.save(Movement(date="2024-01-01", type="Gasto", amount=1, category="Super", description="pan viejo"))
+    repo.save_many([Movement(date="2024-01-%02d" % d, type="Gasto", amount=d, category="Super", description=f"pan {d}")
+                    for d in range(2, 12)], batch_size=3)
+
+    def broken():
+        yield Movement(date="2024-02-01", type="Gasto", amount=1, category="Super", description="pan perdido")
+        raise RuntimeError("corte")
+
+    with pytest.raises(RuntimeError):
+        repo.save_many(broken())
+    assert len(repo.find_by_criteria(q="pan")) == 11
+    assert repo.conn.execute("SELECT fts_deferred FROM data_version").fetchone() == (0,)
+    repo.save(Movement(date="2024-03-01", type="Gasto", amount=1, category="Super", description="pan nuevo"))
+    assert len(repo.find_by_criteria(q="pan")) == 12
+    # raises if the index and the rows disagree
+    repo.conn.execute("INSERT INTO movements_fts (movements_fts) VALUES ('integrity-check')")
+    repo.close()
+
+
+def test_category_rename_propagates_and_used_category_cannot_be_deleted(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "cat.db")
+    repo.save(Movement(date="2024-03-01", type="Gasto", amount=10, category="Super", description="Leche"))
+    cid = next(c["id"] for c in repo.list_all_categories() if c["name"] == "Super")
+
+    assert repo.update_category(cid, "Mercado", icon="🛒")
+    assert [r["category"] for r in repo.find_by_criteria()] == ["Mercado"]
+    assert [r["category"] for r in repo.find_by_criteria(q="mercado")] == ["Mercado"]
+    assert repo.find_by_criteria(q="super") == []
+    assert repo.get_expenses_by_category(year="2024", month="03") == [{"category": "Mercado", "total": 10.0}]
+
+    with pytest.raises(CategoryInUseError):
+        repo.delete_category(cid)
+    assert any(c["name"] == "Mercado" and c["icon"] == "🛒" for c in repo.list_all_categories())
+    repo.close()
+
+
+def test_json_rows_match_dict_rows(tmp_path):
+    import json
+
+    repo = SQLiteMovementRepository(db_path=tmp_path / "test_json.db")
+    repo.save(Movement(date="2024-01-02", type="Gasto", amount=12.34, category="Café", description='pan "integral"'))
+    repo.save(Movement(date="2024-01-03", type="Ingreso", amount=50, category="Sueldo", currency="USD", fx_rate=4000))
+    repo.save(Movement(date="2024-01-04", type="Gasto", amount=7.5, category="Super"))
+    for criteria in ({}, {"category": "caf"}, {"after": ("2024-01-04", 10 ** 9), "limit": 2}, {"q": "integral"}):
+        as_json = [json.loads(text) for text in repo.iter_json_by_criteria(**criteria)]
+        assert as_json == list(repo.iter_by_criteria(**criteria))
+    repo.close()
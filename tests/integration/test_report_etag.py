@@ -0,0 +1,54 @@
+from src.app import app
+
+
+def test_report_etag_and_write_invalidation(tmp_path):
+    app.config.update(DB_PATH=tmp_path / "cache.db")
+    try:
+        client = app.test_client()
+        client.post("/movements", json={"date": "2024-03-01", "type": "Gasto", "amount": 10, "category": "Super"})
+
+        first = client.get("/reports/balance?month=03&year=2024")
+        assert first.status_code == 200 and first.get_json()["gastos"] == 10.0
+        etag = first.headers["ETag"]
+
+        again = client.get("/reports/balance?month=03&year=2024", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        other = client.get("/reports/balance?month=04&year=2024", headers={"If-None-Match": etag})
+        assert other.status_code == 200
+
+        client.post("/movements", json={"date": "2024-03-02", "type": "Gasto", "amount": 5, "category": "Super"})
+        fresh = client.get("/reports/balance?month=03&year=2024", headers={"If-None-Match": etag})
+        assert fresh.status_code == 200 and fresh.get_json()["gastos"] == 15.0
+        assert fresh.headers["ETag"] != etag
+
+        # category writes also invalidate
+        cats = client.get("/categories/all").get_json()
+        client.put(f"/categories/{cats[0]['id']}", json={"name": "Mercado"})
+        resp = client.get("/reports/categories?month=03&year=2024")
+        assert resp.get_json() == [{"category": "Mercado", "total": 15.0}]
+    finally:
+        app.config.pop("DB_PATH", None)
+
+
+def test_dashboard_parallel_matches_sequential(tmp_path):
+    from src.app import _report_cache
+
+    app.config.update(DB_PATH=tmp_path / "parallel.db")
+    try:
+        client = app.test_client()
+        for d, t, amount, cat in [("2023-12-20", "Ingreso", 500, "Sueldo"), ("2024-01-05", "Gasto", 40, "Super"),
+                                  ("2024-01-09", "Gasto", 60, "Salud"), ("2024-02-01", "Ingreso", 300, "Sueldo")]:
+            client.post("/movements", json={"date": d, "type": t, "amount": amount, "category": cat})
+        results = []
+        for threads in (0, 4):
+            app.config["REPORT_THREADS"] = threads
+            _report_cache.clear()
+            results.append((client.get("/reports/dashboard?month=01&year=2024").get_json(),
+                            client.get("/reports/yearly?year=2024").get_json()))
+        assert results[0] == results[1]
+        dashboard = results[1][0]
+        assert dashboard["balance"]["previous_net"] == 500.0
+        assert [c["category"] for c in dashboard["expenses_by_category"]] == ["Salud", "Super"]
+    finally:
+        app.config.pop("REPORT_THREADS", None)
+        app.config.pop("DB_PATH", None)
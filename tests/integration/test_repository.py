@@ -20,7 +20,7 @@ def test_db_creation_and_save(tmp_path):
 
     conn = sqlite3.connect(str(db_file))
     cur = conn.cursor()
-    cur.execute("SELECT date, type, amount, category, description FROM movements WHERE id=?", (rowid,))
+    cur.execute("SELECT m.date, m.type, m.amount, c.name, m.description FROM movements m JOIN categories c ON c.id = m.category_id WHERE m.id=?", (rowid,))
     row = cur.fetchone()
     conn.close()
     assert row[0] == "2024-01-15"
@@ -0,0 +1,137 @@
+from src.infrastructure.database.sqlite_adapter import SQLiteMovementRepository
+from src.core.domain.entities import Movement
+from src.core.services.report_service import ReportService
+from src import cli
+
+
+def _rollups(repo):
+    cur = repo.conn.cursor()
+    cur.execute(
+        "SELECT r.day, r.type, c.name, r.currency, r.total, r.count FROM movement_rollups r "
+        "JOIN categories c ON c.id = r.category_id ORDER BY r.day, r.type, c.name, r.currency"
+    )
+    return cur.fetchall()
+
+
+def test_rollups_follow_inserts_updates_and_deletes(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "r.db")
+    a = repo.save(Movement(date="2024-03-01", type="Gasto", amount=10, category="Super"))
+    repo.save(Movement(date="2024-03-01", type="Gasto", amount=5, category="Super"))
+    repo.save(Movement(date="2024-03-02", type="Ingreso", amount=100, category="Sueldo"))
+    assert _rollups(repo) == [
+        ("2024-03-01", "Gasto", "Super", "COP", 15.0, 2),
+        ("2024-03-02", "Ingreso", "Sueldo", "COP", 100.0, 1),
+    ]
+
+    repo.conn.execute("UPDATE movements SET date = '2024-04-01' WHERE id = ?", (a,))
+    repo.conn.execute("DELETE FROM movements WHERE type = 'Ingreso'")
+    repo.conn.commit()
+    assert _rollups(repo) == [
+        ("2024-03-01", "Gasto", "Super", "COP", 5.0, 1),
+        ("2024-04-01", "Gasto", "Super", "COP", 10.0, 1),
+    ]
+
+    rs = ReportService(repo)
+    assert rs.monthly_balance("04", "2024").total_gastos == 10.0
+    repo.close()
+
+
+def test_rebuild_rollups_matches_trigger_maintained_state(tmp_path):
+    db_file = tmp_path / "r.db"
+    repo = SQLiteMovementRepository(db_path=db_file)
+    repo.save(Movement(date="2024-03-01", type="Gasto", amount=10, category="Super"))
+    repo.save(Movement(date="2024-03-09", type="Gasto", amount=20, category="Super", currency="USD", fx_rate=4000))
+    expected = _rollups(repo)
+    repo.conn.execute("DELETE FROM movement_rollups")
+    repo.conn.commit()
+    repo.close()
+
+    assert cli.rebuild_rollups_main(["--db", str(db_file)]) == 0
+    repo = SQLiteMovementRepository(db_path=db_file)
+    assert _rollups(repo) == expected
+    repo.close()
+
+
+def test_monthly_carryover_single_query_matches_fallback(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "c.db")
+    repo.save(Movement(date="2023-12-20", type="Ingreso", amount=300, category="Sueldo"))
+    repo.save(Movement(date="2023-12-21", type="Gasto", amount=20, category="Super"))
+    repo.save(Movement(date="2024-01-05", type="Gasto", amount=40, category="Super"))
+    repo.save(Movement(date="2024-02-10", type="Ingreso", amount=100, category="Sueldo"))
+    repo.save(Movement(date="2024-03-01", type="Gasto", amount=7, category="Super"))
+    rs = ReportService(repo)
+    for month, year in [("01", "2024"), ("02", "2024"), ("03", "2024"), ("04", "2024"), ("12", "2023")]:
+        assert rs.monthly_with_carryover(month, year) == rs._monthly_with_carryover_fallback(month, year)
+    assert rs.monthly_with_carryover("01", "2024")["previous_net"] == 280.0
+    assert rs.monthly_with_carryover("04", "2024")["cumulative_net"] == 53.0
+    repo.close()
+
+
+def test_dashboard_matches_individual_reports(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "d.db")
+    category_id = repo.add_category("Gasto", "Super")
+    # a duplicate returns the existing id and leaves no transaction open
+    assert repo.add_category("Gasto", "Super") == category_id
+    assert not repo.conn.in_transaction
+    repo.save(Movement(date="2023-12-20", type="Ingreso", amount=300, category="Sueldo"))
+    repo.save(Movement(date="2024-01-05", type="Gasto", amount=40, category="Super", description="Mercado"))
+    repo.save(Movement(date="2024-02-10", type="Ingreso", amount=100, category="Sueldo"))
+    rs = ReportService(repo)
+
+    dash = rs.dashboard("01")
+    assert dash["year"] == "2024"
+    assert dash["years"] == ["2024", "2023"]
+    assert [c["name"] for c in dash["categories"]] == ["Super"]
+    assert dash["balance"] == rs.monthly_with_carryover("01", "2024")
+    assert dash["top_expenses"] == rs.top_expenses("01", "2024")
+    assert dash["daily"] == rs.daily_series("01", "2024")
+    assert dash["yearly"] == rs.yearly_summary("2024")
+    assert dash["expenses_by_category"] == [{"category": "Super", "total": 40.0}]
+    assert not repo.conn.in_transaction
+    repo.close()
+
+
+def test_reports_sum_amounts_in_base_currency(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "fx.db")
+    repo.save(Movement(date="2024-03-01", type="Ingreso", amount=100, category="Sueldo", currency="USD", fx_rate=4000))
+    repo.save(Movement(date="2024-03-02", type="Gasto", amount=50000, category="Super"))
+    repo.save(Movement(date="2024-03-03", type="Gasto", amount=20, category="Viaje", currency="EUR", fx_rate=4500))
+
+    assert repo.get_monthly_aggregates("03", "2024") == {"Ingreso": 400000.0, "Gasto": 140000.0}
+    assert repo.get_expenses_by_category(year="2024", month="03") == [
+        {"category": "Viaje", "total": 90000.0},
+        {"category": "Super", "total": 50000.0},
+    ]
+    assert [r["amount"] for r in repo.get_top_expenses("03", "2024")] == [90000.0, 50000.0]
+
+    # reporting in another currency scales the base totals once
+    rs = ReportService(repo, rate=1 / 4000)
+    assert rs.monthly_with_carryover("03", "2024")["ingresos"] == 100.0
+    repo.close()
+
+
+def test_series_is_dense_and_matches_single_period_reports(tmp_path):
+    repo = SQLiteMovementRepository(db_path=tmp_path / "s.db")
+    repo.save(Movement(date="2023-12-31", type="Gasto", amount=5, category="Super"))
+    repo.save(Movement(date="2024-01-01", type="Ingreso", amount=100, category="Sueldo"))
+    repo.save(Movement(date="2024-01-03", type="Gasto", amount=20, category="Super"))
+    repo.save(Movement(date="2024-03-15", type="Gasto", amount=7, category="Super"))
+    rs = ReportService(repo)
+
+    monthly = rs.series("2023-12", "2024-04", "month")
+    assert monthly["periods"] == ["2023-12", "2024-01", "2024-02", "2024-03", "2024-04"]
+    assert monthly["ingresos"] == [0.0, 100.0, 0.0, 0.0, 0.0]
+    assert monthly["gastos"] == [5.0, 20.0, 0.0, 7.0, 0.0]
+    assert monthly["netos"][1] == 80.0
+    assert rs.series("2024-01", "2024-12", "month")["gastos"] == rs.yearly_series("2024")["gastos"]
+
+    daily = rs.series("2024-01", "2024-01", "day")
+    assert daily["gastos"] == rs.daily_series("01", "2024")["gastos"]
+
+    weekly = rs.series("2024-01", "2024-01", "week")
+    assert weekly["periods"][:2] == ["2024-01-01", "2024-01-08"]
+    assert weekly["gastos"][0] == 20.0  # 2023-12-31 is outside the range
+
+    yearly = rs.series("2023-01", "2024-12", "year")
+    assert yearly["periods"] == ["2023", "2024"] and yearly["gastos"] == [5.0, 27.0]
+    repo.close()
@@ -1,6 +1,6 @@
 import pytest
 from src.core.domain.entities import Movement
-from src.core.domain.exceptions import InvalidAmountError, InvalidDateFormatError, InvalidTypeError
+from src.core.domain.exceptions import InvalidAmountError, InvalidDateFormatError, InvalidFxRateError, InvalidIdempotencyKeyError, InvalidTypeError
 
 
 def test_movement_valid():
@@ -27,3 +27,49 @@ def test_movement_invalid_date_format():
 def test_movement_invalid_type():
     with pytest.raises(InvalidTypeError):
         Movement(date="2024-01-15", type="Transferencia", amount=10, category="Otros")
+
+
+@pytest.mark.parametrize("value, ok", [
+    ("2024-02-29", True), ("2023-02-29", False), ("1900-02-29", False), ("2000-02-29", True),
+    ("2024-04-31", False), ("2024-12-31", True), ("2024-13-01", False), ("2024-00-10", False),
+    ("2024-1-5", False), ("2024/01/05", False), ("0000-01-01", False), ("２０２４-01-01", False), (None, False),
+])
+def test_is_valid_date(value, ok):
+    from src.core.domain.entities import is_valid_date
+
+    assert is_valid_date(value) is ok
+
+
+def test_movement_is_slotted():
+    m = Movement(date="2024-01-15", type="Gasto", amount=10, category="Super")
+    assert not hasattr(m, "__dict__")
+    with pytest.raises(AttributeError):
+        m.unknown = 1
+
+
+def test_idempotency_key_is_optional_text():
+    assert Movement(date="2024-01-01", type="Gasto", amount=1, category="x").idempotency_key is None
+    assert Movement(date="2024-01-01", type="Gasto", amount=1, category="x", idempotency_key="a-1").idempotency_key == "a-1"
+    for bad in ("", 5, "x" * 201):
+        with pytest.raises(InvalidIdempotencyKeyError):
+            Movement(date="2024-01-01", type="Gasto", amount=1, category="x", idempotency_key=bad)
+
+
+@pytest.mark.parametrize("field, value", [
+    ("amount", "NaN"), ("amount", float("inf")), ("amount", {}),
+    ("fx_rate", {}), ("fx_rate", "inf"), ("fx_rate", 0),
+    ("category", ["x"]), ("category", ""), ("currency", 5), ("description", {"a": 1}),
+])
+def test_movement_rejects_non_finite_or_wrongly_typed_fields(field, value):
+    data = dict(date="2024-01-01", type="Gasto", amount=1, category="x")
+    data[field] = value
+    with pytest.raises(ValueError):
+        Movement(**data)
+
+
+def test_foreign_currency_requires_fx_rate():
+    with pytest.raises(InvalidFxRateError):
+        Movement(date="2024-01-01", type="Gasto", amount=10, category="x", currency="USD")
+    m = Movement(date="2024-01-01", type="Gasto", amount=10, category="x", currency="usd", fx_rate=4000)
+    assert (m.currency, m.amount_base) == ("USD", 40000.0)
+    assert Movement(date="2024-01-01", type="Gasto", amount=10, category="x", currency="cop").amount_base == 10.0
@@ -0,0 +1,106 @@
+import pytest
+
+from src.core.domain.fx import FxQuote
+from src.core.ports.fx import FxProviderInterface
+from src.core.services.fx_service import CircuitBreaker, CircuitOpenError, FxService, FxUnavailableError, fill_fx_rate
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class StubProvider(FxProviderInterface):
+    def __init__(self, rates=None):
+        self.rates = rates or {"USD": 0.00025, "EUR": 0.00023}
+        self.calls = 0
+        self.fail = False
+
+    def fetch_latest(self, base):
+        self.calls += 1
+        if self.fail:
+            raise OSError("timeout")
+        return FxQuote(base=base, rates=dict(self.rates), date="2024-03-01")
+
+
+def test_cache_hit_does_not_call_provider():
+    provider = StubProvider()
+    clock = Clock()
+    fx = FxService(provider, ttl=60, clock=clock, spawn=lambda fn: fn())
+    assert fx.latest("cop", ["USD"]).rates == {"USD": 0.00025}
+    clock.now += 30
+    quote = fx.latest("COP", ["USD", "EUR", "XXX"])
+    assert quote.rates == {"USD": 0.00025, "EUR": 0.00023}
+    assert not quote.stale
+    assert provider.calls == 1
+
+
+def test_stale_rate_is_served_while_refreshing():
+    provider = StubProvider()
+    clock = Clock()
+    pending = []
+    fx = FxService(provider, ttl=60, clock=clock, spawn=pending.append)
+    fx.latest("COP")
+    provider.rates["USD"] = 0.0003
+    clock.now += 61
+
+    quote = fx.latest("COP", ["USD"])
+    assert quote.stale and quote.rates == {"USD": 0.00025}
+    fx.latest("COP")
+    assert len(pending) == 1  # a single refresh in flight per base
+
+    pending.pop()()
+    quote = fx.latest("COP", ["USD"])
+    assert not quote.stale and quote.rates == {"USD": 0.0003}
+
+
+def test_circuit_breaker_opens_and_recovers():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    def boom():
+        raise OSError("down")
+
+    for _ in range(2):
+        with pytest.raises(OSError):
+            breaker.call(boom)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: 1)
+
+    clock.now += 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(OSError):
+        breaker.call(boom)
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 10
+    assert breaker.call(lambda: 1) == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cold_start_without_provider_raises_unavailable():
+    provider = StubProvider()
+    provider.fail = True
+    fx = FxService(provider, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    with pytest.raises(FxUnavailableError):
+        fx.latest("COP")
+    with pytest.raises(FxUnavailableError):
+        fx.latest("COP")
+    assert provider.calls == 1  # the open circuit stops further calls
+
+
+def test_fill_fx_rate_inverts_the_quote_only_when_missing():
+    fx = FxService(StubProvider())
+    assert fill_fx_rate(fx, "usd", None) == 4000.0
+    assert fill_fx_rate(fx, "USD", 3900) == 3900
+    assert fill_fx_rate(fx, "COP", None) is None
+    assert fill_fx_rate(fx, "XXX", None) is None
+    assert fill_fx_rate(None, "USD", None) is None
+
+
+def test_rates_to_base_inverts_every_quoted_currency():
+    fx = FxService(StubProvider({"USD": 0.00025, "COP": 1.0}))
+    assert fx.rates_to_base() == {"USD": 4000.0}
@@ -0,0 +1,60 @@
+import io
+
+import pytest
+
+from src.core.domain.imports import RowError
+from src.infrastructure.importers.parsers import detect_format, parse_csv, parse_json, parse_ofx
+
+
+def test_parse_csv_maps_columns_and_blanks_to_none():
+    fp = io.StringIO("date,type,amount,category,description\n2024-01-15,Gasto,20,Super,\n")
+    rows = list(parse_csv(fp))
+    assert rows == [(1, {"date": "2024-01-15", "type": "Gasto", "amount": "20", "category": "Super", "description": None, "currency": None, "fx_rate": None})]
+
+
+def test_parse_json_array_streams_across_chunks():
+    items = ",".join('{"date": "2024-01-%02d", "type": "Gasto", "amount": %d, "category": "Super"}' % (d, d) for d in range(1, 29))
+    rows = list(parse_json(io.StringIO(" [" + items + "] ")))
+    assert len(rows) == 28
+    assert rows[-1][1]["amount"] == 28
+
+
+def test_parse_ndjson():
+    fp = io.StringIO('{"date": "2024-01-01", "type": "Ingreso", "amount": 5, "category": "Sueldo"}\n\n[1]\n')
+    rows = list(parse_json(fp))
+    assert rows[0][1]["type"] == "Ingreso"
+    assert rows[1] == (2, RowError(row=2, error="Se esperaba un objeto JSON"))
+
+
+def test_parse_ndjson_reports_bad_lines_and_keeps_going():
+    fp = io.StringIO('{"amount": 1}\n{"amount": 2,\n{"amount": 3}\n')
+    rows = list(parse_json(fp))
+    assert [r[0] for r in rows] == [1, 2, 3]
+    assert isinstance(rows[1][1], RowError) and rows[1][1].row == 2
+    assert rows[2][1]["amount"] == 3
+
+
+def test_parse_json_array_stops_at_a_broken_element():
+    rows = list(parse_json(io.StringIO('[{"amount": 1}, {"amount": ]')))
+    assert rows[0][1]["amount"] == 1
+    assert rows[1][0] == 2 and "resto del archivo" in rows[1][1].error
+
+
+def test_parse_ofx_sgml():
+    ofx = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>USD
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240115120000<TRNAMT>-12.50<NAME>Cafe
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240131<TRNAMT>1000<NAME>Nomina<MEMO>Enero
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+    rows = [r for _, r in parse_ofx(io.StringIO(ofx), category="Banco")]
+    assert rows[0] == {"date": "2024-01-15", "type": "Gasto", "amount": 12.5, "category": "Banco", "description": "Cafe", "currency": "USD", "fx_rate": None}
+    assert rows[1]["type"] == "Ingreso"
+    assert rows[1]["description"] == "Nomina - Enero"
+
+
+def test_detect_format():
+    assert detect_format("extracto.OFX") == "ofx"
+    with pytest.raises(ValueError):
+        detect_format("extracto.xls")
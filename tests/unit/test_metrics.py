@@ -0,0 +1,28 @@
+from src.infrastructure.metrics import MetricsRegistry
+
+
+def test_render_prometheus_text():
+    reg = MetricsRegistry()
+    hits = reg.counter("hits_total", "Aciertos.", ("route",))
+    latency = reg.histogram("latency_seconds", "Latencia.", ("route",), buckets=(0.1, 1.0))
+    hits.inc(("/a",))
+    hits.inc(("/a",), 2)
+    latency.observe(("/a",), 0.05)
+    latency.observe(("/a",), 0.5)
+    latency.observe(("/a",), 3)
+
+    text = reg.render()
+    assert "# TYPE hits_total counter" in text
+    assert 'hits_total{route="/a"} 3' in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+    assert 'latency_seconds_sum{route="/a"} 3.55' in text
+
+
+def test_collectors_run_before_render_and_labels_are_escaped():
+    reg = MetricsRegistry()
+    gauge = reg.gauge("conns", "Conexiones.", ("q",))
+    reg.add_collector(lambda: gauge.set(('say "hi"',), 4))
+    assert 'conns{q="say \\"hi\\""} 4' in reg.render()
@@ -0,0 +1,33 @@
+from src.core.services.report_cache import CachedReportService, ReportCache
+
+
+class CountingService:
+    def __init__(self):
+        self.calls = 0
+
+    def years(self):
+        self.calls += 1
+        return ["2024"]
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ReportCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_results_are_cached_per_namespace():
+    service, cache = CountingService(), ReportCache()
+    assert CachedReportService(service, cache, ("db", 1, 1.0)).years() == ["2024"]
+    CachedReportService(service, cache, ("db", 1, 1.0)).years()
+    assert service.calls == 1
+    # a new data version misses; no version means no caching at all
+    CachedReportService(service, cache, ("db", 2, 1.0)).years()
+    CachedReportService(service, cache, None).years()
+    CachedReportService(service, cache, None).years()
+    assert service.calls == 4
@@ -26,3 +26,81 @@ def test_expenses_by_category():
     assert len(rows) == 2
     assert rows[0].category == "Super"
     assert rows[0].total == 120.0
+
+
+class YearlyDummyRepo(DummyRepo):
+    def get_yearly_aggregates(self, year):
+        data = {str(i).zfill(2): {"Ingreso": 0.0, "Gasto": 0.0} for i in range(1, 13)}
+        if year == "2024":
+            data["01"] = {"Ingreso": 200.0, "Gasto": 50.0}
+        return data
+
+
+def test_monthly_with_carryover_falls_back_without_single_query_support():
+    rs = ReportService(YearlyDummyRepo())
+    bal = rs.monthly_with_carryover("02", "2024")
+    assert bal["neto"] == 0.0
+    assert bal["previous_net"] == 150.0
+    assert bal["cumulative_net"] == 150.0
+
+
+class VersionedRepo(YearlyDummyRepo):
+    def __init__(self, version=1):
+        self.version = version
+        self.closed = False
+
+    def get_data_version(self):
+        return self.version
+
+    def close(self):
+        self.closed = True
+
+
+def test_yearly_summary_fans_out_with_one_repository_per_task():
+    from concurrent.futures import ThreadPoolExecutor
+
+    opened = []
+
+    def factory():
+        opened.append(VersionedRepo())
+        return opened[-1]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        rs = ReportService(YearlyDummyRepo(), executor=executor, repository_factory=factory)
+        summary = rs.yearly_summary("2024")
+    assert summary["total_ingresos"] == 200.0 and summary["total_neto"] == 150.0
+    assert [c["category"] for c in summary["expenses_by_category"]] == ["Super", "Transporte"]
+    assert len(opened) == 2 and all(r.closed for r in opened)
+
+
+def test_fan_out_retries_sequentially_when_versions_differ():
+    from concurrent.futures import ThreadPoolExecutor
+
+    versions = iter(range(100))
+    main = YearlyDummyRepo()
+    main.get_yearly_aggregates = lambda year: {str(i).zfill(2): {"Ingreso": 1.0, "Gasto": 0.0} for i in range(1, 13)}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # every parallel read sees a different version (a write slipped in between)
+        rs = ReportService(main, executor=executor, repository_factory=lambda: VersionedRepo(next(versions)))
+        summary = rs.yearly_summary("2024")
+    assert summary["total_ingresos"] == 12.0  # recomputed on the request's own repository
+
+
+class LedgerDummyRepo:
+    # Saldos al cierre de los periodos con movimientos; nada antes de 2024-01
+    rows = [("2024-01", 100.0), ("2024-03", 70.0)]
+
+    def get_balance_series(self, date_from, date_to, granularity):
+        return [r for r in self.rows if (not date_from or r[0] >= date_from[:7]) and (not date_to or r[0] < date_to[:7])]
+
+    def get_balance_at(self, day):
+        return 100.0 if day >= "2024-01-31" else 0.0
+
+
+def test_balance_series_carries_the_balance_through_empty_periods():
+    rs = ReportService(LedgerDummyRepo())
+    assert rs.balance_series() == {"granularity": "month", "periods": ["2024-01", "2024-02", "2024-03"],
+                                   "balances": [100.0, 100.0, 70.0]}
+    # El primer periodo sin movimientos parte del saldo previo a 'from'
+    assert rs.balance_series("2024-02", "2024-04")["balances"] == [100.0, 70.0, 70.0]